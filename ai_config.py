@@ -13,7 +13,7 @@ class AIConfig:
     DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
     
     # URLs de base
-    OPENAI_BASE_URL = "https://api.openai.com/v1"
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
     DEEPSEEK_BASE_URL = os.getenv('DEEPSEEK_BASE_URL', 'https://api.deepseek.com/v1')
     
     # Modèles disponibles (OFFICIELS 2025)
@@ -47,6 +47,39 @@ class AIConfig:
     DEFAULT_MODEL = os.getenv('DEFAULT_AI_MODEL', 'gpt-4.1-nano')
     DEFAULT_MAX_TOKENS = 1000
     DEFAULT_TEMPERATURE = 0.7
+    DEFAULT_DEEPSEEK_MODEL = os.getenv('DEFAULT_DEEPSEEK_MODEL', 'deepseek-chat')
+    
+    # Appels simultanés maximum de appeler_ia_parallele
+    CONCURRENCE_IA = int(os.getenv('FIA_IA_CONCURRENCE', 8))
+    
+    # Connexions HTTP persistantes par plateforme (keep-alive) et délais, en secondes
+    TAILLE_POOL_IA = int(os.getenv('FIA_IA_POOL', 10))
+    KEEPALIVE_IA = float(os.getenv('FIA_IA_KEEPALIVE', 60))
+    TIMEOUT_IA = float(os.getenv('FIA_IA_TIMEOUT', 30))
+    TIMEOUT_CONNEXION_IA = float(os.getenv('FIA_IA_TIMEOUT_CONNEXION', 5))
+    
+    # Débit maximal côté client, par plateforme ou par 'plateforme/modele' (None = illimité) ;
+    # FIA_IA_REQUETES_MINUTE et FIA_IA_JETONS_MINUTE remplacent ces valeurs (0 = illimité)
+    LIMITES_DEBIT = {
+        'openai': {'requetes_minute': 500, 'jetons_minute': 200000},
+        'deepseek': {'requetes_minute': None, 'jetons_minute': None},
+    }
+    
+    # Réessais des erreurs 429, 5xx et réseau : délai exponentiel aléatoire (ou Retry-After)
+    REESSAIS_IA = int(os.getenv('FIA_IA_REESSAIS', 5))
+    ATTENTE_BASE_IA = float(os.getenv('FIA_IA_ATTENTE_BASE', 1))
+    ATTENTE_MAX_IA = float(os.getenv('FIA_IA_ATTENTE_MAX', 60))
+    
+    # Cache des réponses : FIA_CACHE_IA=0 le désactive, FIA_CACHE_IA_FICHIER ajoute une base
+    # SQLite partagée entre exécutions ; durée de vie en secondes (0 = sans expiration)
+    CACHE_IA = os.getenv('FIA_CACHE_IA', '1') != '0'
+    # Seuls les appels de température inférieure ou égale sont mis en cache : au-dessus de 0,
+    # une réponse figée servie à tous les utilisateurs changerait le comportement des scripts
+    CACHE_IA_TEMPERATURE_MAX = float(os.getenv('FIA_CACHE_IA_TEMPERATURE_MAX', 0))
+    CACHE_IA_TAILLE = int(os.getenv('FIA_CACHE_IA_TAILLE', 1000))
+    CACHE_IA_TTL = float(os.getenv('FIA_CACHE_IA_TTL', 24 * 3600)) or None
+    CACHE_IA_FICHIER = os.getenv('FIA_CACHE_IA_FICHIER')
+    CACHE_IA_DISQUE_MAX = int(os.getenv('FIA_CACHE_IA_DISQUE_MAX', 10000))
     
     # Contexte window par modèle (en tokens)
     MODEL_CONTEXT_LIMITS = {
@@ -82,6 +115,20 @@ class AIConfig:
             providers.append('deepseek')
         return providers
     
+    @classmethod
+    def get_default_model(cls, plateforme):
+        """Retourne le modèle par défaut d'une plateforme"""
+        return cls.DEFAULT_DEEPSEEK_MODEL if plateforme == 'deepseek' else cls.DEFAULT_MODEL
+    
+    @classmethod
+    def get_rate_limits(cls, plateforme, modele):
+        """Retourne les limites de débit (requetes_minute, jetons_minute) d'un modèle"""
+        limites = dict(cls.LIMITES_DEBIT.get(f"{plateforme}/{modele}") or cls.LIMITES_DEBIT.get(plateforme, {}))
+        for cle, variable in (('requetes_minute', 'FIA_IA_REQUETES_MINUTE'), ('jetons_minute', 'FIA_IA_JETONS_MINUTE')):
+            if os.getenv(variable) is not None:
+                limites[cle] = float(os.getenv(variable)) or None
+        return limites
+    
     @classmethod
     def get_model_context_limit(cls, model_name):
         """Retourne la limite de contexte pour un modèle"""
@@ -1,9 +1,273 @@
 # ai_integration.py
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import closing
 import openai
-import requests
+import httpx
 import json
 from ai_config import AIConfig
 from errors import RuntimeError
+from lru import CacheLRU
+from limiteur import (
+    STATUTS_REESSAYABLES, ReessaiNecessaire, attente_reessai, estimer_jetons, lire_retry_after,
+    obtenir_limiteur, stats_limiteurs,
+)
+
+class CompteurConnexions:
+    """Requêtes HTTP d'une plateforme et connexions TCP ouvertes pour elles"""
+    
+    def __init__(self):
+        self.requetes = 0
+        self.connexions = 0
+        self._verrou = threading.Lock()
+    
+    def compter_requete(self):
+        with self._verrou:
+            self.requetes += 1
+    
+    def sur_requete(self, requete):
+        """Crochet httpx 'request' : compte la requête et suit l'ouverture de connexion"""
+        self.compter_requete()
+        requete.extensions['trace'] = self.tracer
+    
+    def tracer(self, evenement, infos):
+        if evenement == 'connection.connect_tcp.complete':
+            with self._verrou:
+                self.connexions += 1
+    
+    async def sur_requete_async(self, requete):
+        """Crochet 'request' d'un httpx.AsyncClient"""
+        self.compter_requete()
+        requete.extensions['trace'] = self.tracer_async
+    
+    async def tracer_async(self, evenement, infos):
+        self.tracer(evenement, infos)
+    
+    def stats(self):
+        with self._verrou:
+            return {
+                'requetes': self.requetes,
+                'connexions': self.connexions,
+                'reutilisations': max(0, self.requetes - self.connexions),
+            }
+
+class FluxIA:
+    """Réponse IA reçue morceau par morceau (appeler_ia_flux)
+    
+    Itérable une seule fois, par exemple avec pour...dans ; garde le texte déjà reçu.
+    """
+    
+    def __init__(self, morceaux):
+        self._morceaux = morceaux
+        self._recus = []
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        morceau = next(self._morceaux)
+        self._recus.append(morceau)
+        return morceau
+    
+    def texte(self):
+        """Lit les morceaux restants et retourne la réponse complète"""
+        for _ in self:
+            pass
+        return "".join(self._recus).strip()
+    
+    def __repr__(self):
+        return "<flux IA>"
+
+class CacheReponsesIA:
+    """Réponses IA déjà obtenues : LRU en mémoire, plus une base SQLite optionnelle
+    partagée entre processus et exécutions"""
+    
+    def __init__(self, taille_max=1000, ttl=None, fichier=None, disque_max=10000):
+        self.memoire = CacheLRU(taille_max=taille_max, ttl=ttl)
+        self.ttl = ttl
+        self.fichier = fichier
+        self.disque_max = disque_max
+        self.succes_disque = 0
+        self._verrou = threading.Lock()
+        if fichier:
+            with closing(self._connexion()) as connexion, connexion:
+                connexion.execute(
+                    "CREATE TABLE IF NOT EXISTS reponses ("
+                    "cle TEXT PRIMARY KEY, reponse TEXT NOT NULL, expiration REAL, acces REAL NOT NULL)"
+                )
+    
+    @staticmethod
+    def cle(plateforme, modele, message, temperature, max_tokens):
+        donnees = json.dumps([plateforme, modele, message, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(donnees.encode('utf-8')).hexdigest()
+    
+    def _connexion(self):
+        # Une connexion par opération : sûr entre threads et après un fork
+        return sqlite3.connect(self.fichier, timeout=5)
+    
+    def obtenir(self, cle):
+        """Réponse en cache, ou None"""
+        reponse = self.memoire.obtenir(cle)
+        if reponse is not None or not self.fichier:
+            return reponse
+        try:
+            with closing(self._connexion()) as connexion, connexion:
+                ligne = connexion.execute(
+                    "SELECT reponse, expiration FROM reponses WHERE cle = ?", (cle,)
+                ).fetchone()
+                if ligne is None:
+                    return None
+                reponse, expiration = ligne
+                maintenant = time.time()
+                if expiration is not None and expiration <= maintenant:
+                    connexion.execute("DELETE FROM reponses WHERE cle = ?", (cle,))
+                    return None
+                connexion.execute("UPDATE reponses SET acces = ? WHERE cle = ?", (maintenant, cle))
+        except sqlite3.Error:
+            # Base indisponible (verrouillée, disque plein...) : l'appel se fait sans elle
+            return None
+        with self._verrou:
+            self.succes_disque += 1
+        self.memoire.ajouter(cle, reponse, None if expiration is None else expiration - maintenant)
+        return reponse
+    
+    def ajouter(self, cle, reponse):
+        self.memoire.ajouter(cle, reponse)
+        if not self.fichier:
+            return
+        maintenant = time.time()
+        expiration = None if self.ttl is None else maintenant + self.ttl
+        try:
+            with closing(self._connexion()) as connexion, connexion:
+                connexion.execute(
+                    "INSERT OR REPLACE INTO reponses (cle, reponse, expiration, acces) VALUES (?, ?, ?, ?)",
+                    (cle, reponse, expiration, maintenant)
+                )
+                connexion.execute("DELETE FROM reponses WHERE expiration <= ?", (maintenant,))
+                # Au-delà de disque_max entrées, les moins récemment lues sont supprimées
+                connexion.execute(
+                    "DELETE FROM reponses WHERE cle IN (SELECT cle FROM reponses ORDER BY acces DESC "
+                    "LIMIT -1 OFFSET ?)", (self.disque_max,)
+                )
+        except sqlite3.Error:
+            pass
+    
+    def stats(self):
+        memoire = self.memoire.stats()
+        with self._verrou:
+            succes_disque = self.succes_disque
+        # Un succès disque est compté comme échec par le cache mémoire
+        echecs = memoire['echecs'] - succes_disque
+        total = memoire['succes'] + succes_disque + echecs
+        statistiques = {
+            'succes_memoire': memoire['succes'],
+            'succes_disque': succes_disque,
+            'echecs': echecs,
+            'taux_succes': (memoire['succes'] + succes_disque) / total if total else 0.0,
+            'entrees_memoire': memoire['entrees'],
+            'taille_max': memoire['taille_max'],
+            'evictions': memoire['evictions'],
+            'expirations': memoire['expirations'],
+            'ttl': self.ttl,
+            'fichier': self.fichier,
+        }
+        if self.fichier:
+            try:
+                with closing(self._connexion()) as connexion:
+                    statistiques['entrees_disque'] = connexion.execute("SELECT COUNT(*) FROM reponses").fetchone()[0]
+            except sqlite3.Error:
+                statistiques['entrees_disque'] = None
+        return statistiques
+
+class AppelsEnCours:
+    """Appels IA identiques en cours dans le processus : le premier part vers la
+    plateforme, les suivants attendent sa réponse (ou son erreur) au lieu de la redemander"""
+    
+    def __init__(self):
+        self._appels = {}
+        # Tâches asyncio des appels menés par executer_async : la boucle ne garde qu'une
+        # référence faible, une tâche non référencée pourrait disparaître en cours d'appel
+        self._taches = set()
+        self._pid = os.getpid()
+        self._verrou = threading.Lock()
+        self.appels = 0
+        self.partages = 0
+    
+    def _inscrire(self, cle):
+        """(futur, meneur) : le futur de l'appel de clé `cle`, créé si aucun n'est en cours"""
+        with self._verrou:
+            if self._pid != os.getpid():
+                # Processus forké : les appels en cours du parent n'y aboutiront jamais
+                self._appels = {}
+                self._taches = set()
+                self._pid = os.getpid()
+            futur = self._appels.get(cle)
+            meneur = futur is None
+            if meneur:
+                futur = self._appels[cle] = Future()
+                # Déjà « en cours » : un appelant asyncio annulé ne peut pas l'annuler pour les autres
+                futur.set_running_or_notify_cancel()
+                self.appels += 1
+            else:
+                self.partages += 1
+        return futur, meneur
+    
+    def _retirer(self, cle):
+        with self._verrou:
+            self._appels.pop(cle, None)
+    
+    def executer(self, cle, fonction):
+        """Résultat de fonction(), partagé avec les appels de même clé arrivés entre-temps"""
+        futur, meneur = self._inscrire(cle)
+        if not meneur:
+            return futur.result()
+        try:
+            futur.set_result(fonction())
+        except BaseException as e:
+            futur.set_exception(e)
+        finally:
+            self._retirer(cle)
+        return futur.result()
+    
+    async def executer_async(self, cle, fonction):
+        """Comme executer, pour une coroutine fonction() ; l'attente ne bloque pas la boucle
+        
+        Les appels synchrones et asynchrones de même clé se partagent la même réponse.
+        """
+        futur, meneur = self._inscrire(cle)
+        if meneur:
+            # Tâche indépendante : l'annulation du lot du meneur n'en prive pas les autres appelants
+            tache = asyncio.ensure_future(self._mener_async(cle, futur, fonction))
+            with self._verrou:
+                self._taches.add(tache)
+            tache.add_done_callback(self._oublier_tache)
+        return await asyncio.wrap_future(futur)
+    
+    def _oublier_tache(self, tache):
+        with self._verrou:
+            self._taches.discard(tache)
+    
+    async def _mener_async(self, cle, futur, fonction):
+        try:
+            futur.set_result(await fonction())
+        except BaseException as e:
+            futur.set_exception(e)
+        finally:
+            self._retirer(cle)
+    
+    def compter_partages(self, nombre):
+        """Appels d'un même lot servis par une requête déjà envoyée (appeler_ia_parallele)"""
+        with self._verrou:
+            self.partages += nombre
+    
+    def stats(self):
+        with self._verrou:
+            return {'appels_envoyes': self.appels, 'appels_partages': self.partages}
 
 class AIIntegration:
     """Module d'intégration des plateformes d'IA pour le langage F-IA"""
@@ -11,13 +275,186 @@ class AIIntegration:
     def __init__(self):
         self.config = AIConfig()
         self._setup_openai()
+        # Clients HTTP persistants par plateforme, créés au premier appel
+        self._clients = {}
+        # Clients asynchrones (appeler_ia_parallele) et la boucle asyncio qui les fait tourner
+        self._clients_async = {}
+        self._boucle = None
+        self._compteurs = {'openai': CompteurConnexions(), 'deepseek': CompteurConnexions()}
+        self._pid = os.getpid()
+        self._verrou = threading.Lock()
+        self.en_cours = AppelsEnCours()
+        self.cache = None
+        if self.config.CACHE_IA:
+            self.cache = CacheReponsesIA(self.config.CACHE_IA_TAILLE, self.config.CACHE_IA_TTL,
+                                         self.config.CACHE_IA_FICHIER, self.config.CACHE_IA_DISQUE_MAX)
     
     def _setup_openai(self):
         """Configuration d'OpenAI"""
         if self.config.is_openai_configured():
             openai.api_key = self.config.OPENAI_API_KEY
     
-    def appeler_ia(self, plateforme, modele, message, temperature=None, max_tokens=None):
+    def _timeout(self):
+        return httpx.Timeout(self.config.TIMEOUT_IA, connect=self.config.TIMEOUT_CONNEXION_IA)
+    
+    def _limites(self, taille):
+        return httpx.Limits(max_connections=taille, max_keepalive_connections=taille,
+                            keepalive_expiry=self.config.KEEPALIVE_IA)
+    
+    def _verifier_processus(self):
+        """Sous self._verrou : oublie les clients du processus parent après un fork"""
+        if self._pid != os.getpid():
+            # Processus forké (pool de travailleurs) : ne pas partager les connexions du parent,
+            # ni sa boucle asyncio (son thread n'existe pas ici)
+            self._clients = {}
+            self._clients_async = {}
+            self._boucle = None
+            self._compteurs = {nom: CompteurConnexions() for nom in self._compteurs}
+            self._pid = os.getpid()
+    
+    def _client(self, plateforme):
+        """Client persistant de la plateforme : les connexions restent ouvertes entre deux appels"""
+        with self._verrou:
+            self._verifier_processus()
+            client = self._clients.get(plateforme)
+            if client is None:
+                http = httpx.Client(
+                    timeout=self._timeout(),
+                    limits=self._limites(self.config.TAILLE_POOL_IA),
+                    event_hooks={'request': [self._compteurs[plateforme].sur_requete]},
+                )
+                if plateforme == 'openai':
+                    # Réessais faits par _reessayer, sous le limiteur de débit
+                    client = openai.OpenAI(api_key=self.config.OPENAI_API_KEY, base_url=self.config.OPENAI_BASE_URL,
+                                           http_client=http, max_retries=0)
+                else:
+                    client = http
+                self._clients[plateforme] = client
+            return client
+    
+    def _boucle_async(self):
+        """Boucle asyncio du processus, dans un thread dédié : les connexions des clients
+        asynchrones y sont liées et restent ouvertes d'un appeler_ia_parallele à l'autre"""
+        with self._verrou:
+            self._verifier_processus()
+            if self._boucle is None:
+                self._boucle = asyncio.new_event_loop()
+                threading.Thread(target=self._boucle.run_forever, name='fia-ia-async', daemon=True).start()
+            return self._boucle
+    
+    def _client_async(self, plateforme):
+        """Client asynchrone persistant de la plateforme, utilisé dans la boucle de _boucle_async"""
+        with self._verrou:
+            self._verifier_processus()
+            client = self._clients_async.get(plateforme)
+            if client is None:
+                # Connexions non bornées : chaque lot borne les siennes (concurrence) ;
+                # FIA_IA_POOL connexions restent ouvertes entre les lots
+                client = self._clients_async[plateforme] = httpx.AsyncClient(
+                    timeout=self._timeout(),
+                    limits=httpx.Limits(max_connections=None, max_keepalive_connections=self.config.TAILLE_POOL_IA,
+                                        keepalive_expiry=self.config.KEEPALIVE_IA),
+                    event_hooks={'request': [self._compteurs[plateforme].sur_requete_async]},
+                )
+            return client
+    
+    def _limiteur(self, plateforme, modele):
+        """Limiteur de débit de (plateforme, modèle), partagé par tout le processus"""
+        return obtenir_limiteur(plateforme, modele, **self.config.get_rate_limits(plateforme, modele))
+    
+    def _reessayer(self, plateforme, modele, jetons, envoyer):
+        """Résultat de envoyer(), après attente du limiteur, en réessayant les échecs temporaires"""
+        limiteur = self._limiteur(plateforme, modele)
+        tentative = 0
+        while True:
+            attente = limiteur.reserver(jetons)
+            if attente:
+                time.sleep(attente)
+            try:
+                return envoyer()
+            except ReessaiNecessaire as e:
+                time.sleep(self._apres_echec(limiteur, e, tentative))
+                tentative += 1
+    
+    async def _reessayer_async(self, plateforme, modele, jetons, envoyer):
+        """Version asynchrone de _reessayer : envoyer() retourne une coroutine"""
+        limiteur = self._limiteur(plateforme, modele)
+        tentative = 0
+        while True:
+            attente = limiteur.reserver(jetons)
+            if attente:
+                await asyncio.sleep(attente)
+            try:
+                return await envoyer()
+            except ReessaiNecessaire as e:
+                await asyncio.sleep(self._apres_echec(limiteur, e, tentative))
+                tentative += 1
+    
+    def _apres_echec(self, limiteur, erreur, tentative):
+        """Délai avant de réessayer, ou RuntimeError une fois les réessais épuisés"""
+        if tentative >= self.config.REESSAIS_IA:
+            raise RuntimeError(f"{erreur} (après {tentative + 1} tentatives)")
+        limiteur.compter_reessai()
+        attente = attente_reessai(tentative, erreur.attente, self.config.ATTENTE_BASE_IA, self.config.ATTENTE_MAX_IA)
+        if erreur.statut == 429:
+            # Débit dépassé : tous les appels de ce limiteur patientent, pas seulement celui-ci
+            limiteur.suspendre(attente)
+            return 0.0
+        return attente
+    
+    def _verifier_statut(self, response):
+        """Lève ReessaiNecessaire (429, 5xx) ou RuntimeError si la réponse HTTP est en erreur"""
+        if response.status_code == 200:
+            return
+        message = f"Erreur HTTP {response.status_code}: {response.text}"
+        if response.status_code in STATUTS_REESSAYABLES:
+            raise ReessaiNecessaire(message, response.status_code,
+                                    lire_retry_after(response.headers.get("retry-after")))
+        raise RuntimeError(message)
+    
+    def _envoyer_openai(self, data, stream=False):
+        """Appel du SDK OpenAI ; les échecs temporaires deviennent ReessaiNecessaire"""
+        try:
+            return self._client('openai').chat.completions.create(
+                model=data["model"],
+                messages=data["messages"],
+                temperature=data["temperature"],
+                max_tokens=data["max_tokens"],
+                stream=stream
+            )
+        except openai.APIConnectionError as e:
+            raise ReessaiNecessaire(f"Erreur réseau OpenAI: {str(e)}")
+        except openai.APIStatusError as e:
+            if e.status_code not in STATUTS_REESSAYABLES:
+                raise
+            raise ReessaiNecessaire(f"Erreur HTTP {e.status_code}: {e.message}", e.status_code,
+                                    lire_retry_after(e.response.headers.get("retry-after")))
+    
+    def _memorisable(self, temperature):
+        """Vrai si la réponse d'un appel à cette température va dans le cache des réponses"""
+        return self.cache is not None and temperature <= self.config.CACHE_IA_TEMPERATURE_MAX
+    
+    def _cle_cache(self, cache, plateforme, modele, message, temperature, max_tokens):
+        """Clé du cache des réponses pour cet appel, ou None s'il ne doit pas être mis en cache"""
+        if not cache or not self._memorisable(temperature):
+            return None
+        return self.cache.cle(plateforme.lower(), modele, message, temperature, max_tokens)
+    
+    def stats_cache(self):
+        """Succès, échecs et taille du cache des réponses, et appels identiques partagés"""
+        if self.cache is not None:
+            statistiques = self.cache.stats()
+            statistiques['temperature_max'] = self.config.CACHE_IA_TEMPERATURE_MAX
+        else:
+            statistiques = {'actif': False}
+        statistiques.update(self.en_cours.stats())
+        return statistiques
+    
+    def stats_connexions(self):
+        """Requêtes, connexions ouvertes et connexions réutilisées par plateforme"""
+        return {plateforme: compteur.stats() for plateforme, compteur in self._compteurs.items()}
+    
+    def appeler_ia(self, plateforme, modele, message, temperature=None, max_tokens=None, cache=True):
         """
         Fonction principale pour appeler une IA depuis F-IA
         
@@ -27,42 +464,56 @@ class AIIntegration:
             message (str): message à envoyer à l'IA
             temperature (float): créativité (0.0 à 1.0)
             max_tokens (int): nombre maximum de tokens
+            cache (bool): réutiliser la réponse d'un appel identique
         
         Returns:
             str: réponse de l'IA
         """
         try:
-            # Paramètres par défaut
-            temperature = temperature or self.config.DEFAULT_TEMPERATURE
+            # Paramètres par défaut (une température de 0 est valide)
+            temperature = self.config.DEFAULT_TEMPERATURE if temperature is None else temperature
             max_tokens = max_tokens or self.config.DEFAULT_MAX_TOKENS
             
-            if plateforme.lower() == 'openai':
-                return self._call_openai(modele, message, temperature, max_tokens)
-            elif plateforme.lower() == 'deepseek':
-                return self._call_deepseek(modele, message, temperature, max_tokens)
-            else:
-                raise RuntimeError(f"Plateforme IA non supportée: {plateforme}")
+            if not cache:
+                return self._appeler_plateforme(plateforme, modele, message, temperature, max_tokens)
+            
+            cle = CacheReponsesIA.cle(plateforme.lower(), modele, message, temperature, max_tokens)
+            memoriser = self._memorisable(temperature)
+            if memoriser:
+                reponse = self.cache.obtenir(cle)
+                if reponse is not None:
+                    return reponse
+            
+            def appeler():
+                reponse = self._appeler_plateforme(plateforme, modele, message, temperature, max_tokens)
+                if memoriser:
+                    self.cache.ajouter(cle, reponse)
+                return reponse
+            
+            # Un appel identique déjà en cours (même script lancé par plusieurs utilisateurs) est attendu
+            return self.en_cours.executer(cle, appeler)
                 
         except Exception as e:
             raise RuntimeError(f"Erreur lors de l'appel IA: {str(e)}")
     
+    def _appeler_plateforme(self, plateforme, modele, message, temperature, max_tokens):
+        if plateforme.lower() == 'openai':
+            return self._call_openai(modele, message, temperature, max_tokens)
+        elif plateforme.lower() == 'deepseek':
+            return self._call_deepseek(modele, message, temperature, max_tokens)
+        raise RuntimeError(f"Plateforme IA non supportée: {plateforme}")
+    
     def _call_openai(self, modele, message, temperature, max_tokens):
         """Appel vers OpenAI"""
         if not self.config.is_openai_configured():
             raise RuntimeError("OpenAI non configuré. Vérifiez votre clé API dans .env")
         
+        _, _, data = self._requete_chat('openai', modele, message, temperature, max_tokens)
+        
         try:
-            # Utilisation de la nouvelle API OpenAI v1.0+
-            client = openai.OpenAI(api_key=self.config.OPENAI_API_KEY)
-            
-            response = client.chat.completions.create(
-                model=modele,
-                messages=[
-                    {"role": "user", "content": message}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
+            # Utilisation de la nouvelle API OpenAI v1.0+, client partagé entre les appels
+            response = self._reessayer('openai', modele, estimer_jetons(message, max_tokens),
+                                       lambda: self._envoyer_openai(data))
             
             return response.choices[0].message.content.strip()
             
@@ -71,42 +522,282 @@ class AIIntegration:
     
     def _call_deepseek(self, modele, message, temperature, max_tokens):
         """Appel vers DeepSeek"""
-        if not self.config.is_deepseek_configured():
-            raise RuntimeError("DeepSeek non configuré. Vérifiez votre clé API dans .env")
+        url, headers, data = self._requete_chat('deepseek', modele, message, temperature, max_tokens)
+        
+        def envoyer():
+            try:
+                response = self._client('deepseek').post(url, headers=headers, json=data)
+            except httpx.TransportError as e:
+                raise ReessaiNecessaire(f"Erreur réseau DeepSeek: {str(e)}")
+            self._verifier_statut(response)
+            return response
         
         try:
-            headers = {
-                "Authorization": f"Bearer {self.config.DEEPSEEK_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": modele,
-                "messages": [
-                    {"role": "user", "content": message}
-                ],
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
-            
-            response = requests.post(
-                f"{self.config.DEEPSEEK_BASE_URL}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                raise RuntimeError(f"Erreur HTTP {response.status_code}: {response.text}")
+            response = self._reessayer('deepseek', modele, estimer_jetons(message, max_tokens), envoyer)
             
             result = response.json()
             return result["choices"][0]["message"]["content"].strip()
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise RuntimeError(f"Erreur réseau DeepSeek: {str(e)}")
-        except (KeyError, IndexError) as e:
+        except (KeyError, IndexError, ValueError) as e:
             raise RuntimeError(f"Réponse DeepSeek invalide: {str(e)}")
     
+    def appeler_ia_flux(self, plateforme, modele, message, temperature=None, max_tokens=None, cache=True):
+        """
+        Comme appeler_ia, mais la réponse arrive morceau par morceau
+        
+        Returns:
+            FluxIA: morceaux de la réponse, au fil de leur génération
+        """
+        try:
+            temperature = self.config.DEFAULT_TEMPERATURE if temperature is None else temperature
+            max_tokens = max_tokens or self.config.DEFAULT_MAX_TOKENS
+            plateforme = plateforme.lower()
+            # Vérifie plateforme et configuration dès l'appel, pas à la première itération
+            requete = self._requete_chat(plateforme, modele, message, temperature, max_tokens)
+            
+            cle = self._cle_cache(cache, plateforme, modele, message, temperature, max_tokens)
+            if cle is not None:
+                reponse = self.cache.obtenir(cle)
+                if reponse is not None:
+                    return FluxIA(iter([reponse]))
+        except Exception as e:
+            raise RuntimeError(f"Erreur lors de l'appel IA: {str(e)}")
+        
+        return FluxIA(self._flux(plateforme, requete, cle))
+    
+    def _flux(self, plateforme, requete, cle):
+        recus = []
+        source = self._flux_openai if plateforme == 'openai' else self._flux_deepseek
+        try:
+            for morceau in source(*requete):
+                if not recus:
+                    # Comme le strip() de appeler_ia, en début de réponse
+                    morceau = morceau.lstrip()
+                    if not morceau:
+                        continue
+                recus.append(morceau)
+                yield morceau
+        except Exception as e:
+            raise RuntimeError(f"Erreur lors de l'appel IA: {str(e)}")
+        
+        # Seule une réponse reçue en entier est mise en cache
+        if cle is not None:
+            self.cache.ajouter(cle, "".join(recus).strip())
+    
+    def _flux_openai(self, url, headers, data):
+        """Morceaux d'une réponse OpenAI en streaming"""
+        # Seule l'ouverture du flux est réessayée : une réponse entamée ne se rejoue pas
+        flux = self._reessayer('openai', data["model"], self._jetons_requete(data),
+                               lambda: self._envoyer_openai(data, stream=True))
+        try:
+            for chunk in flux:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Boucle interrompue : libérer la connexion
+            flux.close()
+    
+    def _flux_deepseek(self, url, headers, data):
+        """Morceaux d'une réponse DeepSeek en streaming (server-sent events)"""
+        client = self._client('deepseek')
+        requete = client.build_request("POST", url, headers=headers, json=dict(data, stream=True))
+        
+        def ouvrir():
+            try:
+                response = client.send(requete, stream=True)
+            except httpx.TransportError as e:
+                raise ReessaiNecessaire(f"Erreur réseau DeepSeek: {str(e)}")
+            if response.status_code != 200:
+                response.read()
+                response.close()
+            self._verifier_statut(response)
+            return response
+        
+        response = self._reessayer('deepseek', data["model"], self._jetons_requete(data), ouvrir)
+        # httpx.Response n'est pas un gestionnaire de contexte (httpx 0.27) : fermeture explicite
+        try:
+            for ligne in response.iter_lines():
+                if not ligne.startswith("data:"):
+                    continue
+                donnees = ligne[len("data:"):].strip()
+                if donnees == "[DONE]":
+                    break
+                try:
+                    morceau = json.loads(donnees)["choices"][0]["delta"].get("content")
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    raise RuntimeError(f"Réponse DeepSeek invalide: {str(e)}")
+                if morceau:
+                    yield morceau
+        finally:
+            # Boucle interrompue ou réponse lue : libérer la connexion
+            response.close()
+    
+    def _jetons_requete(self, data):
+        return estimer_jetons(data["messages"][0]["content"], data["max_tokens"])
+    
+    def _requete_chat(self, plateforme, modele, message, temperature, max_tokens):
+        """URL, en-têtes et corps d'un appel chat/completions (API compatible OpenAI)"""
+        if plateforme == 'openai':
+            if not self.config.is_openai_configured():
+                raise RuntimeError("OpenAI non configuré. Vérifiez votre clé API dans .env")
+            base_url, cle = self.config.OPENAI_BASE_URL, self.config.OPENAI_API_KEY
+        elif plateforme == 'deepseek':
+            if not self.config.is_deepseek_configured():
+                raise RuntimeError("DeepSeek non configuré. Vérifiez votre clé API dans .env")
+            base_url, cle = self.config.DEEPSEEK_BASE_URL, self.config.DEEPSEEK_API_KEY
+        else:
+            raise RuntimeError(f"Plateforme IA non supportée: {plateforme}")
+        
+        headers = {
+            "Authorization": f"Bearer {cle}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "model": modele,
+            "messages": [
+                {"role": "user", "content": message}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        return f"{base_url}/chat/completions", headers, data
+    
+    async def appeler_ia_async(self, plateforme, modele, message, temperature=None, max_tokens=None, cache=True):
+        """
+        Version asynchrone de appeler_ia, à exécuter dans la boucle de _boucle_async
+        
+        Args:
+            voir appeler_ia
+        
+        Returns:
+            str: réponse de l'IA
+        """
+        temperature = self.config.DEFAULT_TEMPERATURE if temperature is None else temperature
+        max_tokens = max_tokens or self.config.DEFAULT_MAX_TOKENS
+        plateforme = plateforme.lower()
+        if not cache:
+            return await self._appeler_plateforme_async(plateforme, modele, message, temperature, max_tokens)
+        
+        cle = CacheReponsesIA.cle(plateforme, modele, message, temperature, max_tokens)
+        memoriser = self._memorisable(temperature)
+        if memoriser:
+            reponse = self.cache.obtenir(cle)
+            if reponse is not None:
+                return reponse
+        
+        async def appeler():
+            reponse = await self._appeler_plateforme_async(plateforme, modele, message, temperature, max_tokens)
+            if memoriser:
+                self.cache.ajouter(cle, reponse)
+            return reponse
+        
+        # Même appel en cours ailleurs dans le processus (autre lot, appeler_ia d'un autre script) : attendu
+        return await self.en_cours.executer_async(cle, appeler)
+    
+    async def _appeler_plateforme_async(self, plateforme, modele, message, temperature, max_tokens):
+        url, headers, data = self._requete_chat(plateforme, modele, message, temperature, max_tokens)
+        client = self._client_async(plateforme)
+        
+        async def envoyer():
+            try:
+                response = await client.post(url, headers=headers, json=data)
+            except httpx.TransportError as e:
+                raise ReessaiNecessaire(f"Erreur réseau {plateforme}: {str(e)}")
+            self._verifier_statut(response)
+            return response
+        
+        try:
+            response = await self._reessayer_async(plateforme, modele, estimer_jetons(message, max_tokens), envoyer)
+            result = response.json()
+            reponse = result["choices"][0]["message"]["content"].strip()
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Erreur réseau {plateforme}: {str(e)}")
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise RuntimeError(f"Réponse {plateforme} invalide: {str(e)}")
+        return reponse
+    
+    def _normaliser_requete(self, requete, cache=True):
+        """Une requête de appeler_ia_parallele : message seul ou dictionnaire"""
+        if isinstance(requete, str):
+            requete = {"message": requete}
+        if not isinstance(requete, dict) or "message" not in requete:
+            raise RuntimeError(f"Requête IA invalide: {requete!r} (texte ou dictionnaire avec 'message')")
+        
+        plateforme = requete.get("plateforme")
+        if not plateforme:
+            # Première plateforme configurée
+            plateformes = self.lister_plateformes()
+            if not plateformes:
+                raise RuntimeError("Aucune plateforme IA configurée. Vérifiez vos clés API dans .env")
+            plateforme = plateformes[0]
+        return {
+            "plateforme": plateforme,
+            "modele": requete.get("modele") or self.config.get_default_model(plateforme.lower()),
+            "message": str(requete["message"]),
+            "temperature": requete.get("temperature"),
+            "max_tokens": requete.get("max_tokens"),
+            "cache": requete.get("cache", cache),
+        }
+    
+    async def _appeler_ia_parallele(self, requetes, concurrence):
+        limite = asyncio.Semaphore(concurrence)
+        
+        async def appeler(numero, requete):
+            async with limite:
+                try:
+                    return await self.appeler_ia_async(**requete)
+                except Exception as e:
+                    raise RuntimeError(f"Erreur lors de l'appel IA n°{numero}: {str(e)}")
+        
+        # Les requêtes identiques du lot (hors cache=faux) ne partent qu'une fois
+        taches = {}
+        cles = []
+        for i, requete in enumerate(requetes):
+            cle = (i,)
+            if requete["cache"]:
+                cle = (requete["plateforme"].lower(), requete["modele"], requete["message"],
+                       requete["temperature"], requete["max_tokens"])
+            if cle not in taches:
+                taches[cle] = asyncio.ensure_future(appeler(i + 1, requete))
+            cles.append(cle)
+        self.en_cours.compter_partages(len(requetes) - len(taches))
+        
+        try:
+            reponses = dict(zip(taches, await asyncio.gather(*taches.values())))
+        except BaseException:
+            # La première erreur annule les appels restants (la boucle survit au lot)
+            for tache in taches.values():
+                tache.cancel()
+            raise
+        return [reponses[cle] for cle in cles]
+    
+    def appeler_ia_parallele(self, requetes, concurrence=None, cache=True):
+        """
+        Envoie plusieurs requêtes IA simultanément
+        
+        Args:
+            requetes (list): messages (str) ou dictionnaires
+                {message, plateforme, modele, temperature, max_tokens, cache} ;
+                par défaut, première plateforme configurée et son modèle par défaut
+            concurrence (int): nombre maximum d'appels en cours (FIA_IA_CONCURRENCE)
+            cache (bool): valeur par défaut de 'cache' pour chaque requête
+        
+        Returns:
+            list: réponses, dans l'ordre des requêtes
+        """
+        if not isinstance(requetes, list):
+            raise RuntimeError("appeler_ia_parallele attend une liste de requêtes")
+        concurrence = int(concurrence or self.config.CONCURRENCE_IA)
+        if concurrence < 1:
+            raise RuntimeError(f"Concurrence invalide: {concurrence}")
+        requetes = [self._normaliser_requete(requete, cache) for requete in requetes]
+        if not requetes:
+            return []
+        lot = asyncio.run_coroutine_threadsafe(self._appeler_ia_parallele(requetes, concurrence), self._boucle_async())
+        return lot.result()
+    
     def lister_plateformes(self):
         """Liste les plateformes IA disponibles"""
         return self.config.get_available_providers()
@@ -133,23 +824,56 @@ class AIIntegration:
         Returns:
             str: réponse du bot
         """
-        prompt = f"""Tu es un assistant conversationnel intelligent.
+        prompt = self._prompt_conversationnel(message_utilisateur, contexte_bot)
+        return self.appeler_ia(plateforme, modele, prompt, temperature=0.8, max_tokens=200)
+    
+    def generer_reponse_conversationnelle_flux(self, plateforme, modele, message_utilisateur, contexte_bot=""):
+        """Comme generer_reponse_conversationnelle, mais la réponse arrive morceau par morceau"""
+        prompt = self._prompt_conversationnel(message_utilisateur, contexte_bot)
+        return self.appeler_ia_flux(plateforme, modele, prompt, temperature=0.8, max_tokens=200)
+    
+    def _prompt_conversationnel(self, message_utilisateur, contexte_bot):
+        return f"""Tu es un assistant conversationnel intelligent.
 {contexte_bot}
 
 Réponds de manière naturelle, amicale et utile au message suivant:
 "{message_utilisateur}"
 
 Réponse:"""
-        
-        return self.appeler_ia(plateforme, modele, prompt, temperature=0.8, max_tokens=200)
 
 # Instance globale pour F-IA
 _ai_integration = AIIntegration()
 
 # Fonctions exposées au langage F-IA
-def _appeler_ia(plateforme, modele, message, temperature=0.7, max_tokens=1000):
+def _appeler_ia(plateforme, modele, message, temperature=0.7, max_tokens=1000, cache=True):
     """Fonction F-IA pour appeler une IA"""
-    return _ai_integration.appeler_ia(plateforme, modele, message, temperature, max_tokens)
+    return _ai_integration.appeler_ia(plateforme, modele, message, temperature, max_tokens, cache)
+
+def _appeler_ia_flux(plateforme, modele, message, temperature=0.7, max_tokens=1000, cache=True):
+    """Fonction F-IA pour appeler une IA en recevant la réponse morceau par morceau"""
+    return _ai_integration.appeler_ia_flux(plateforme, modele, message, temperature, max_tokens, cache)
+
+def _texte_flux(flux):
+    """Fonction F-IA pour obtenir la réponse complète d'un flux IA"""
+    if not isinstance(flux, FluxIA):
+        raise RuntimeError("texte_flux attend un flux retourné par appeler_ia_flux ou generer_reponse_bot_flux")
+    return flux.texte()
+
+def _appeler_ia_parallele(requetes, concurrence=None, cache=True):
+    """Fonction F-IA pour appeler une IA sur plusieurs requêtes en parallèle"""
+    return _ai_integration.appeler_ia_parallele(requetes, concurrence, cache)
+
+def _stats_cache_ia():
+    """Fonction F-IA pour consulter le cache des réponses IA"""
+    return _ai_integration.stats_cache()
+
+def _stats_connexions_ia():
+    """Fonction F-IA pour consulter la réutilisation des connexions aux IA"""
+    return _ai_integration.stats_connexions()
+
+def _stats_debit_ia():
+    """Fonction F-IA pour consulter les limiteurs de débit (attentes, réessais)"""
+    return stats_limiteurs()
 
 def _lister_plateformes_ia():
     """Fonction F-IA pour lister les plateformes IA disponibles"""
@@ -165,6 +889,12 @@ def _generer_reponse_bot(plateforme, modele, message_utilisateur, contexte=""):
         plateforme, modele, message_utilisateur, contexte
     )
 
+def _generer_reponse_bot_flux(plateforme, modele, message_utilisateur, contexte=""):
+    """Fonction F-IA pour générer une réponse de chatbot morceau par morceau"""
+    return _ai_integration.generer_reponse_conversationnelle_flux(
+        plateforme, modele, message_utilisateur, contexte
+    )
+
 def _verifier_config_ia():
     """Fonction F-IA pour vérifier la configuration IA"""
     config_status = {
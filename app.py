@@ -1,39 +1,275 @@
 import os
-from flask import Flask, request, jsonify
-from io import StringIO
-import sys
-from lexer import LexerFIA
-from parser import ParserFIA
-from interpreter import VisiteurInterpretation
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify
+from cache_fia import analyser_source, cle_source
+from lru import CacheLRU
+from interpreter import MOTEURS
+from budget import limites_environnement, borner
+from travailleurs import PoolTravailleurs, executer_capture, flux_local
 from errors import FIAError
+from fia_ast import Programme
 
 app = Flask(__name__)
 
-def executer_code(code):
-    old_stdout = sys.stdout
-    sys.stdout = captured_output = StringIO()
+# Moteur d'exécution par défaut du service (surchargeable par requête)
+MOTEUR_DEFAUT = os.environ.get('FIA_MOTEUR', 'arbre')
+
+# Budget maximal d'une exécution (FIA_BUDGET_INSTRUCTIONS/_TEMPS/_MEMOIRE, 0 = illimité) ;
+# une requête peut demander moins via {"budget": {...}}, jamais plus
+BUDGET_MAX = limites_environnement({
+    'instructions': 10_000_000,
+    'temps': 10,
+    'memoire': 256 * 1024 * 1024,
+})
+
+# Pool de processus d'exécution : FIA_POOL_TAILLE travailleurs (0 = exécution dans le
+# processus Flask), tués au-delà de FIA_POOL_DELAI secondes, recyclés après
+# FIA_POOL_MAX_TACHES programmes (0 = jamais)
+POOL_TAILLE = int(os.environ.get('FIA_POOL_TAILLE', os.cpu_count() or 1))
+POOL_DELAI = float(os.environ.get('FIA_POOL_DELAI', 30)) or None
+POOL_MAX_TACHES = int(os.environ.get('FIA_POOL_MAX_TACHES', 100))
+
+# Nombre maximal de programmes d'une requête /execute_batch
+LOT_MAX = int(os.environ.get('FIA_LOT_MAX', 64))
+
+_pool = None
+_verrou_pool = threading.Lock()
+_repartiteur = None # Threads qui attendent les travailleurs pour /execute_batch
+
+def obtenir_pool():
+    """Pool de travailleurs, démarré à la première requête (None si désactivé)."""
+    global _pool
+    if POOL_TAILLE <= 0:
+        return None
+    with _verrou_pool:
+        if _pool is None:
+            _pool = PoolTravailleurs(POOL_TAILLE, POOL_DELAI, POOL_MAX_TACHES)
+        return _pool
+
+def obtenir_repartiteur():
+    """Threads de répartition des lots : un par travailleur (un seul sans pool)."""
+    global _repartiteur
+    with _verrou_pool:
+        if _repartiteur is None:
+            _repartiteur = ThreadPoolExecutor(max_workers=max(1, POOL_TAILLE),
+                                              thread_name_prefix='fia-lot')
+        return _repartiteur
+
+# Programmes déjà analysés : empreinte du source -> AST (Programme)
+cache_programmes = CacheLRU(
+    taille_max=int(os.environ.get('FIA_CACHE_PROGRAMMES', 256)),
+    memoire_max=int(os.environ.get('FIA_CACHE_PROGRAMMES_MEMOIRE', 64 * 1024 * 1024)),
+)
+
+def obtenir_programme(code):
+    """AST du code, depuis le cache mémoire si ce source a déjà été analysé."""
+    cle = cle_source(code)
+    ast = cache_programmes.obtenir(cle)
+    if ast is None:
+        # Cache disque des AST uniquement si FIA_CACHE_DIR est défini
+        ast = analyser_source(code)
+        cache_programmes.ajouter(cle, ast)
+    return ast
+
+def executer_ast(ast, moteur, limites):
+    """Exécute un Programme déjà analysé dans un travailleur (ou sur place sans pool)."""
+    pool = obtenir_pool()
+    if pool is None:
+        return executer_capture(ast, moteur, limites)
+    return pool.executer(ast, moteur, limites)
+
+def executer_code(code, moteur=MOTEUR_DEFAUT, limites=BUDGET_MAX):
     try:
-        lexer = LexerFIA(code)
-        tokens = lexer.tokeniser()
-        parser = ParserFIA(tokens)
-        ast = parser.analyser()
-        interpreter = VisiteurInterpretation()
-        interpreter.executer(ast)
-        output = captured_output.getvalue()
-        return output
+        # Analyse dans le processus Flask (cache partagé), exécution dans un travailleur
+        ast = obtenir_programme(code)
     except FIAError as e:
         return str(e)
     except Exception as e:
         return f"Erreur inattendue: {str(e)}"
-    finally:
-        sys.stdout = old_stdout
+    return executer_ast(ast, moteur, limites)
+
+def executer_lot(programmes, prelude=None):
+    """Exécute des (code, moteur, limites) en parallèle sur le pool.
+
+    Retourne un {'result', 'duree'} par programme, dans l'ordre. Les analyses
+    passent par le cache : un source répété (ou le prélude) n'est analysé
+    qu'une fois. `prelude` est un Programme exécuté avant chaque code, dans
+    la même exécution.
+    """
+    resultats = [None] * len(programmes)
+    taches = {}
+    for i, (code, moteur, limites) in enumerate(programmes):
+        try:
+            # Analyse ici, avant la répartition : les doublons du lot profitent du cache
+            ast = obtenir_programme(code)
+        except FIAError as e:
+            resultats[i] = {'result': str(e), 'duree': 0.0}
+            continue
+        except Exception as e:
+            resultats[i] = {'result': f"Erreur inattendue: {str(e)}", 'duree': 0.0}
+            continue
+        if prelude is not None:
+            ast = Programme(prelude.instructions + ast.instructions, ast.ligne, ast.colonne)
+        taches[i] = obtenir_repartiteur().submit(_executer_chronometre, ast, moteur, limites)
+    for i, tache in taches.items():
+        resultats[i] = tache.result()
+    return resultats
+
+def _executer_chronometre(ast, moteur, limites):
+    debut = time.perf_counter()
+    result = executer_ast(ast, moteur, limites)
+    return {'result': result, 'duree': round(time.perf_counter() - debut, 6)}
+
+def executer_code_flux(code, moteur=MOTEUR_DEFAUT, limites=BUDGET_MAX):
+    """Générateur de ('sortie', texte) puis éventuellement ('erreur', message)."""
+    try:
+        ast = obtenir_programme(code)
+    except FIAError as e:
+        yield ('erreur', str(e))
+        return
+    except Exception as e:
+        yield ('erreur', f"Erreur inattendue: {str(e)}")
+        return
+    pool = obtenir_pool()
+    yield from (flux_local(ast, moteur, limites) if pool is None else pool.executer_flux(ast, moteur, limites))
+
+# Fins de ligne du format text/event-stream : chacune termine un champ
+_FINS_DE_LIGNE = re.compile(r'\r\n|\r|\n')
+
+def _donnees_sse(texte):
+    """Champs `data:` d'un événement, un par ligne de `texte` (le client les rejoint par des sauts de ligne)."""
+    return ''.join(f"data: {ligne}\n" for ligne in _FINS_DE_LIGNE.split(texte))
+
+def evenements_sse(morceaux):
+    """Server-sent events : un événement par ligne de sortie, puis 'erreur' et 'fin'.
+
+    Une ligne pas encore terminée (ecrire, flush) part dans un événement
+    'partiel' ; le client la préfixe à la ligne suivante.
+    """
+    for genre, contenu in morceaux:
+        if genre == 'sortie':
+            lignes = contenu.split('\n')
+            for ligne in lignes[:-1]:
+                yield f"{_donnees_sse(ligne)}\n"
+            if lignes[-1]:
+                yield f"event: partiel\n{_donnees_sse(lignes[-1])}\n"
+        else:
+            yield f"event: erreur\n{_donnees_sse(contenu)}\n"
+    yield "event: fin\ndata: \n\n"
+
+class RequeteInvalide(Exception):
+    """Corps de requête refusé ; `erreur` est le JSON de la réponse 400."""
+
+    def __init__(self, erreur):
+        super().__init__(erreur['error'])
+        self.erreur = erreur
+
+def lire_options(donnees, moteur=MOTEUR_DEFAUT, limites=BUDGET_MAX):
+    """(moteur, limites) demandés dans `donnees`, à défaut ceux donnés."""
+    moteur = donnees.get('moteur', moteur)
+    if moteur not in MOTEURS:
+        raise RequeteInvalide({'error': f"Moteur inconnu: {moteur}", 'moteurs': list(MOTEURS)})
+    try:
+        # Un budget par défaut déjà borné reste sous BUDGET_MAX
+        limites = borner(donnees.get('budget') or {}, limites)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise RequeteInvalide({'error': f"Budget invalide: {e}", 'budget_max': BUDGET_MAX})
+    return moteur, limites
+
+def lire_corps():
+    """Corps JSON de la requête, qui doit être un objet."""
+    donnees = request.json
+    if not isinstance(donnees, dict):
+        raise RequeteInvalide({'error': "Le corps de la requête doit être un objet JSON"})
+    return donnees
+
+def lire_code(donnees, cle='code'):
+    """Source F-IA `donnees[cle]` ('' si absent ou null), qui doit être une chaîne."""
+    code = donnees.get(cle)
+    if code is None:
+        return ''
+    if not isinstance(code, str):
+        raise RequeteInvalide({'error': f"'{cle}' doit être une chaîne"})
+    return code
+
+def lire_requete():
+    """(code, moteur, limites) d'une requête d'exécution, ou une réponse d'erreur 400."""
+    try:
+        donnees = lire_corps()
+        return lire_code(donnees), *lire_options(donnees)
+    except RequeteInvalide as e:
+        return jsonify(e.erreur), 400
+
+def lire_lot():
+    """(programmes, prelude) d'une requête /execute_batch, ou une réponse d'erreur 400."""
+    try:
+        donnees = lire_corps()
+        programmes = donnees.get('programmes')
+        if not isinstance(programmes, list) or not programmes:
+            raise RequeteInvalide({'error': "'programmes' doit être une liste non vide"})
+        if len(programmes) > LOT_MAX:
+            raise RequeteInvalide({'error': f"Trop de programmes: {len(programmes)}", 'lot_max': LOT_MAX})
+        source_prelude = lire_code(donnees, 'prelude')
+        moteur, limites = lire_options(donnees)
+        lot = []
+        for i, programme in enumerate(programmes):
+            # Un programme est un source, ou {"code", "moteur", "budget"}
+            if isinstance(programme, str):
+                programme = {'code': programme}
+            if not isinstance(programme, dict):
+                raise RequeteInvalide({'error': f"Programme {i} invalide"})
+            try:
+                lot.append((lire_code(programme), *lire_options(programme, moteur, limites)))
+            except RequeteInvalide as e:
+                e.erreur['programme'] = i
+                raise
+    except RequeteInvalide as e:
+        return jsonify(e.erreur), 400
+    prelude = None
+    if source_prelude:
+        try:
+            prelude = obtenir_programme(source_prelude)
+        except FIAError as e:
+            return jsonify({'error': f"Prélude invalide: {e}"}), 400
+    return lot, prelude
 
 @app.route('/execute', methods=['POST'])
 def execute():
-    code = request.json.get('code', '')
-    result = executer_code(code)
+    requete = lire_requete()
+    if isinstance(requete[0], Response):
+        return requete
+    result = executer_code(*requete)
     return jsonify({'result': result})
 
+@app.route('/execute_flux', methods=['POST'])
+def execute_flux():
+    """Comme /execute, mais la sortie est transmise ligne par ligne (text/event-stream)."""
+    requete = lire_requete()
+    if isinstance(requete[0], Response):
+        return requete
+    return Response(evenements_sse(executer_code_flux(*requete)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/execute_batch', methods=['POST'])
+def execute_batch():
+    """Plusieurs programmes en une requête, exécutés en parallèle sur le pool."""
+    requete = lire_lot()
+    if isinstance(requete[0], Response):
+        return requete
+    debut = time.perf_counter()
+    resultats = executer_lot(*requete)
+    return jsonify({'resultats': resultats, 'duree': round(time.perf_counter() - debut, 6)})
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    statistiques = {'cache_programmes': cache_programmes.stats(), 'budget_max': BUDGET_MAX}
+    if _pool is not None:
+        statistiques['pool'] = _pool.stats()
+    return jsonify(statistiques)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,67 @@
+# benchmarks/appels_fonctions.py
+# Coût d'un appel de fonction utilisateur selon le nombre de variables globales.
+#
+# Un appel ne doit coûter que ses arguments : le temps par appel doit rester
+# stable quand le programme définit des milliers de globales.
+#
+#   python benchmarks/appels_fonctions.py
+#   python benchmarks/appels_fonctions.py --globales 0 1000 100000 --moteurs vm
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_fia import analyser
+from interpreter import VisiteurInterpretation, MOTEURS
+
+# fib(n) effectue fib(n + 1) * 2 - 1 appels sans boucle (pas de limite d'itérations)
+PROGRAMME = """
+fonction fib(n) {
+    si (n < 2) {
+        retourner n
+    }
+    retourner fib(n - 1) + fib(n - 2)
+}
+fib(%d)
+"""
+
+def nombre_appels(n):
+    a, b = 0, 1
+    for _ in range(n + 1):
+        a, b = b, a + b
+    return 2 * a - 1
+
+def mesurer(moteur, nb_globales, n, repetitions):
+    """Meilleur temps par appel (en microsecondes) sur `repetitions` exécutions."""
+    ast = analyser(PROGRAMME % n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp = VisiteurInterpretation()
+    interp.contextes[0].update({f"g{i}": i for i in range(nb_globales)})
+    meilleur = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        interp.executer_programme(ast, moteur)
+        duree = time.perf_counter() - debut
+        meilleur = duree if meilleur is None else min(meilleur, duree)
+    return meilleur / nombre_appels(n) * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût d'un appel de fonction selon le nombre de globales")
+    parser.add_argument('--globales', type=int, nargs='+', default=[0, 1000, 10000, 100000])
+    parser.add_argument('--moteurs', nargs='+', choices=MOTEURS, default=list(MOTEURS))
+    parser.add_argument('-n', type=int, default=14, help="argument de fib (défaut: 14)")
+    parser.add_argument('--repetitions', type=int, default=5)
+    arguments = parser.parse_args(argv)
+
+    print(f"fib({arguments.n}) : {nombre_appels(arguments.n)} appels")
+    print(f"{'moteur':<10}" + "".join(f"{g:>12} glob." for g in arguments.globales))
+    for moteur in arguments.moteurs:
+        temps = [mesurer(moteur, g, arguments.n, arguments.repetitions) for g in arguments.globales]
+        print(f"{moteur:<10}" + "".join(f"{t:>15.2f}" for t in temps) + "  µs/appel")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/appels_integres.py
+# Coût d'un appel de fonction intégrée selon la taille de la liste passée.
+#
+# Les fonctions intégrées reçoivent les valeurs F-IA telles quelles (listes et
+# dictionnaires Python natifs), sans conversion récursive ni copie : longueur(l)
+# ou ajouter(l, x) coûtent le même temps sur 10^3 ou 10^6 éléments.
+#
+#   python benchmarks/appels_integres.py
+#   python benchmarks/appels_integres.py --tailles 1000 1000000 --appels 20000
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_fia import analyser
+from interpreter import VisiteurInterpretation, MOTEURS
+
+# Même boucle pour chaque fonction : seul l'appel change
+APPELS = """
+soit n = 0
+tant_que (n < appels) {
+    soit resultat = %s
+    n = n + 1
+}
+"""
+
+APPELS_MESURES = ('longueur(l)', 'ajouter(l, n)', 'l[0]')
+
+def duree_appel(taille, appel, appels, moteur):
+    """Temps moyen (en microsecondes) d'un tour de boucle avec `appel` sur une liste de `taille` éléments."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp = VisiteurInterpretation(banniere=False, sortie=io.StringIO())
+    interp.contextes[0].update({'l': list(range(taille)), 'appels': appels})
+    ast = analyser(APPELS % appel)
+    debut = time.perf_counter()
+    interp.executer_programme(ast, moteur)
+    return (time.perf_counter() - debut) / appels * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Appel d'une fonction intégrée selon la taille de son argument")
+    parser.add_argument('--tailles', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--appels', type=int, default=10000)
+    parser.add_argument('--moteur', choices=MOTEURS, default='vm')
+    arguments = parser.parse_args(argv)
+
+    print(f"moteur {arguments.moteur}, {arguments.appels} appels (µs par tour de boucle)")
+    print(f"{'éléments':>10}" + ''.join(f"{appel:>16}" for appel in APPELS_MESURES))
+    for taille in arguments.tailles:
+        durees = [duree_appel(taille, appel, arguments.appels, arguments.moteur) for appel in APPELS_MESURES]
+        print(f"{taille:>10}" + ''.join(f"{duree:>13.2f} µs" for duree in durees))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/faux_fournisseur.py
+# Faux fournisseur IA local imitant /chat/completions (API compatible OpenAI).
+#
+# La réponse reprend le message reçu. Sans "stream", elle arrive d'un bloc
+# après `latence` secondes ; avec "stream": true, elle est envoyée mot par mot
+# en server-sent events, un mot toutes les `latence / nombre de mots` secondes.
+# Avec `requetes_seconde`, les requêtes en excès reçoivent un 429 et Retry-After.
+import collections
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FauxFournisseur(BaseHTTPRequestHandler):
+    latence = 0.1
+    requetes_seconde = None
+    refus = 0 # Réponses 429 envoyées
+    _recentes = collections.deque() # Instants des requêtes acceptées depuis une seconde
+    _verrou = threading.Lock()
+    protocol_version = 'HTTP/1.1' # Connexions persistantes (keep-alive)
+
+    def do_POST(self):
+        corps = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        contenu = corps['messages'][0]['content']
+        if not self._accepter():
+            self._envoyer_refus()
+        elif corps.get('stream'):
+            self._envoyer_flux(contenu.split(' '))
+        else:
+            time.sleep(self.latence)
+            self._envoyer_json({
+                'choices': [{'message': {'role': 'assistant', 'content': contenu}}],
+            })
+
+    def _accepter(self):
+        if self.requetes_seconde is None:
+            return True
+        maintenant = time.monotonic()
+        with self._verrou:
+            while self._recentes and self._recentes[0] <= maintenant - 1:
+                self._recentes.popleft()
+            if len(self._recentes) >= self.requetes_seconde:
+                FauxFournisseur.refus += 1
+                return False
+            self._recentes.append(maintenant)
+            return True
+
+    def _envoyer_refus(self):
+        reponse = json.dumps({'error': {'message': 'Rate limit reached', 'type': 'requests'}}).encode()
+        self.send_response(429)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(reponse)))
+        self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(reponse)
+
+    def _envoyer_json(self, donnees):
+        reponse = json.dumps(donnees).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(reponse)))
+        self.end_headers()
+        self.wfile.write(reponse)
+
+    def _envoyer_flux(self, mots):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i, mot in enumerate(mots):
+            time.sleep(self.latence / len(mots))
+            morceau = {'choices': [{'index': 0, 'delta': {'content': mot if i == 0 else ' ' + mot}}]}
+            self._envoyer_morceau(f"data: {json.dumps(morceau)}\n\n")
+        self._envoyer_morceau("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _envoyer_morceau(self, texte):
+        donnees = texte.encode()
+        self.wfile.write(f"{len(donnees):x}\r\n".encode() + donnees + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+def demarrer(latence, requetes_seconde=None):
+    """Lance le faux fournisseur et y dirige OpenAI et DeepSeek ; retourne le serveur.
+
+    À appeler avant de charger l'interpréteur : ai_config lit ces variables à l'import.
+    """
+    FauxFournisseur.latence = latence
+    FauxFournisseur.requetes_seconde = requetes_seconde
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0), FauxFournisseur)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{serveur.server_port}/v1"
+    os.environ['OPENAI_BASE_URL'] = os.environ['DEEPSEEK_BASE_URL'] = url
+    os.environ['OPENAI_API_KEY'] = os.environ['DEEPSEEK_API_KEY'] = 'cle-de-test'
+    # Mesurer les appels, pas le cache des réponses
+    os.environ['FIA_CACHE_IA'] = '0'
+    return serveur
@@ -0,0 +1,64 @@
+# benchmarks/ia_debit.py
+# Débit soutenu face à un fournisseur qui limite les requêtes par seconde.
+#
+# Le faux fournisseur local refuse (429 + Retry-After) les requêtes au-delà de
+# sa limite. Sans limiteur côté client, un script en boucle accumule les
+# refus et les réessais ; avec le limiteur réglé sur la limite du fournisseur,
+# il avance à ce débit sans refus.
+#
+#   python benchmarks/ia_debit.py
+#   python benchmarks/ia_debit.py --requetes 60 --limite 20 --concurrence 8
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faux_fournisseur import FauxFournisseur, demarrer
+
+PROGRAMME = """
+soit reponses = appeler_ia_parallele(textes, %d)
+"""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit soutenu face à un fournisseur limité")
+    parser.add_argument('--requetes', type=int, default=40)
+    parser.add_argument('--limite', type=int, default=10, help="requêtes par seconde acceptées par le fournisseur")
+    parser.add_argument('--concurrence', type=int, default=8)
+    parser.add_argument('--sans-limiteur', action='store_true', help="laisser le client envoyer sans limite")
+    arguments = parser.parse_args(argv)
+
+    serveur = demarrer(0.01, arguments.limite)
+    # Limiteur client réglé sur la limite du fournisseur (0 = illimité)
+    os.environ['FIA_IA_REQUETES_MINUTE'] = '0' if arguments.sans_limiteur else str(arguments.limite * 60)
+    os.environ['FIA_IA_JETONS_MINUTE'] = '0'
+    os.environ['FIA_IA_REESSAIS'] = '20'
+
+    from cache_fia import analyser
+    from interpreter import VisiteurInterpretation
+    from ai_integration import _stats_debit_ia
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp = VisiteurInterpretation()
+    textes = [f"texte {i}" for i in range(arguments.requetes)]
+    interp.contextes[0]['textes'] = textes
+    debut = time.perf_counter()
+    try:
+        interp.executer_programme(analyser(PROGRAMME % arguments.concurrence))
+    finally:
+        serveur.shutdown()
+    duree = time.perf_counter() - debut
+    assert interp.contextes[0]['reponses'] == textes
+
+    # La rafale initiale du limiteur (une minute de débit) peut dépasser la fenêtre d'une seconde du fournisseur
+    print(f"{arguments.requetes} requêtes, fournisseur limité à {arguments.limite}/s, "
+          f"limiteur {'désactivé' if arguments.sans_limiteur else 'actif'}")
+    print(f"durée {duree:.2f} s, débit {arguments.requetes / duree:.1f} req/s, "
+          f"refus 429 {FauxFournisseur.refus}")
+    for cle, stats in _stats_debit_ia().items():
+        print(f"{cle}: {stats}")
+
+if __name__ == "__main__":
+    main()
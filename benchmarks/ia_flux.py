@@ -0,0 +1,106 @@
+# benchmarks/ia_flux.py
+# Délai avant le premier texte affiché : appeler_ia contre appeler_ia_flux.
+#
+# Le faux fournisseur local envoie la réponse mot par mot ; avec appeler_ia le
+# programme n'affiche rien avant la fin de la génération, avec appeler_ia_flux
+# le premier mot s'affiche dès qu'il est produit. Chaque plateforme est aussi
+# vérifiée sur le chemin du chatbot d'exemple (generer_reponse_bot_flux).
+#
+#   python benchmarks/ia_flux.py
+#   python benchmarks/ia_flux.py --mots 200 --latence 2 --plateformes deepseek
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faux_fournisseur import demarrer
+
+PROGRAMME_COMPLET = """
+imprimer(appeler_ia(plateforme, "modele-test", message))
+"""
+
+PROGRAMME_FLUX = """
+pour morceau dans appeler_ia_flux(plateforme, "modele-test", message) {
+    ecrire(morceau)
+}
+imprimer("")
+"""
+
+# Comme exemples/chatbot_ia_avance.fia : réponse affichée en flux, puis gardée en entier
+PROGRAMME_CHATBOT = """
+soit flux = generer_reponse_bot_flux(plateforme, "modele-test", message, "Tu es un assistant.")
+pour morceau dans flux {
+    ecrire(morceau)
+}
+imprimer("")
+soit reponse = texte_flux(flux)
+"""
+
+class SortieChronometree(io.StringIO):
+    """Sortie qui note l'instant de la première écriture."""
+    premiere = None
+
+    def write(self, texte):
+        if self.premiere is None and texte:
+            self.premiere = time.perf_counter()
+        return super().write(texte)
+
+def mesurer(programme, plateforme, message):
+    """(délai avant le premier texte, durée totale) en secondes, et le texte affiché."""
+    from cache_fia import analyser
+    from interpreter import VisiteurInterpretation
+    ast = analyser(programme)
+    sortie = SortieChronometree()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp = VisiteurInterpretation(sortie=sortie)
+    interp.contextes[0].update({'plateforme': plateforme, 'message': message})
+    sortie.seek(0)
+    sortie.truncate()
+    sortie.premiere = None
+    debut = time.perf_counter()
+    interp.executer_programme(ast)
+    fin = time.perf_counter()
+    return sortie.premiere - debut, fin - debut, sortie.getvalue()
+
+def verifier_chatbot(plateforme, message):
+    """Le texte affiché en flux par le chatbot est celui que retourne texte_flux."""
+    from cache_fia import analyser
+    from interpreter import VisiteurInterpretation
+    sortie = io.StringIO()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp = VisiteurInterpretation(banniere=False, sortie=sortie)
+    interp.contextes[0].update({'plateforme': plateforme, 'message': message})
+    interp.executer_programme(analyser(PROGRAMME_CHATBOT))
+    reponse = interp.contextes[0]['reponse']
+    # Le faux fournisseur renvoie le prompt, qui contient le message
+    assert message in reponse and sortie.getvalue().strip() == reponse, sortie.getvalue()[:80]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Premier texte affiché : appeler_ia contre appeler_ia_flux")
+    parser.add_argument('--mots', type=int, default=100, help="longueur de la réponse simulée")
+    parser.add_argument('--latence', type=float, default=1.0, help="durée de génération simulée en secondes")
+    parser.add_argument('--plateformes', nargs='+', choices=('openai', 'deepseek'), default=['openai', 'deepseek'])
+    arguments = parser.parse_args(argv)
+
+    serveur = demarrer(arguments.latence)
+    message = ' '.join(f"mot{i}" for i in range(arguments.mots))
+    try:
+        print(f"{arguments.mots} mots générés en {arguments.latence:.2f} s")
+        print(f"{'':<20}{'premier texte':>15}{'total':>10}")
+        for plateforme in arguments.plateformes:
+            for nom, programme in (('appeler_ia', PROGRAMME_COMPLET), ('appeler_ia_flux', PROGRAMME_FLUX)):
+                premier, total, texte = mesurer(programme, plateforme, message)
+                # Le faux fournisseur renvoie le message : les deux modes affichent le même texte
+                assert texte.strip() == message, texte[:80]
+                print(f"{plateforme + ' ' + nom:<20}{premier * 1000:>12.0f} ms{total:>8.2f} s")
+            verifier_chatbot(plateforme, message)
+        print(f"generer_reponse_bot_flux vérifié : {', '.join(arguments.plateformes)}")
+    finally:
+        serveur.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/ia_parallele.py
+# appel_ia en boucle contre appeler_ia_parallele, face à un faux fournisseur local.
+#
+# Le serveur de test imite /chat/completions avec une latence fixe : N appels
+# séquentiels prennent N × latence, la version parallèle environ
+# latence × N / concurrence. Les lots parallèles suivants réutilisent les
+# connexions ouvertes par le premier.
+#
+#   python benchmarks/ia_parallele.py
+#   python benchmarks/ia_parallele.py --requetes 200 --latence 0.2 --concurrence 16
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faux_fournisseur import demarrer
+
+PROGRAMME_SEQUENTIEL = """
+soit i = 0
+tant_que (i < longueur(textes)) {
+    soit reponse = appeler_ia("openai", "gpt-4.1-nano", textes[i])
+    i = i + 1
+}
+"""
+
+PROGRAMME_PARALLELE = """
+soit reponses = appeler_ia_parallele(textes, %d)
+"""
+
+def mesurer(programme, textes):
+    """Durée d'exécution (en secondes) d'un programme F-IA disposant de `textes`, et ses globales."""
+    from cache_fia import analyser
+    from interpreter import VisiteurInterpretation
+    ast = analyser(programme)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp = VisiteurInterpretation()
+    interp.contextes[0]['textes'] = textes
+    debut = time.perf_counter()
+    interp.executer_programme(ast)
+    return time.perf_counter() - debut, interp.contextes[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="appeler_ia séquentiel contre appeler_ia_parallele")
+    parser.add_argument('--requetes', type=int, default=50)
+    parser.add_argument('--latence', type=float, default=0.1, help="latence simulée en secondes")
+    parser.add_argument('--concurrence', type=int, default=8)
+    parser.add_argument('--lots', type=int, default=3, help="appels successifs de appeler_ia_parallele")
+    arguments = parser.parse_args(argv)
+
+    serveur = demarrer(arguments.latence)
+
+    textes = [f"texte {i}" for i in range(arguments.requetes)]
+    from ai_integration import _stats_connexions_ia
+    print(f"{arguments.requetes} requêtes, latence {arguments.latence * 1000:.0f} ms, "
+          f"concurrence {arguments.concurrence}")
+    try:
+        sequentiel, _ = mesurer(PROGRAMME_SEQUENTIEL, textes)
+        print(f"{'séquentiel':<12}{sequentiel:>10.2f} s")
+        for lot in range(1, arguments.lots + 1):
+            avant = _stats_connexions_ia()['openai']['connexions']
+            parallele, globales = mesurer(PROGRAMME_PARALLELE % arguments.concurrence, textes)
+            # Le faux fournisseur renvoie chaque message : les réponses doivent suivre l'ordre des requêtes
+            assert globales['reponses'] == textes
+            ouvertes = _stats_connexions_ia()['openai']['connexions'] - avant
+            print(f"{f'parallèle {lot}':<12}{parallele:>10.2f} s  (x{sequentiel / parallele:.1f}), "
+                  f"{ouvertes} connexion(s) ouverte(s)")
+    finally:
+        serveur.shutdown()
+    print("connexions openai:", _stats_connexions_ia()['openai'])
+
+if __name__ == "__main__":
+    main()
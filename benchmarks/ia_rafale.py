@@ -0,0 +1,79 @@
+# benchmarks/ia_rafale.py
+# Rafale d'utilisateurs lançant le même script au même moment.
+#
+# Chaque utilisateur a son interpréteur et son thread, comme les requêtes
+# concurrentes du service Flask. Les appels identiques en cours sont partagés :
+# une seule requête part vers le fournisseur, même cache des réponses désactivé,
+# que les scripts utilisent appeler_ia ou appeler_ia_parallele. Avec cache=faux,
+# chaque appel part séparément.
+#
+#   python benchmarks/ia_rafale.py
+#   python benchmarks/ia_rafale.py --utilisateurs 100 --latence 1
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faux_fournisseur import demarrer
+
+PROGRAMME = """
+soit reponse = appeler_ia("openai", "modele-test", "Bonjour, qui es-tu ?", 0.7, 1000, partager)
+"""
+
+PROGRAMME_PARALLELE = """
+soit reponse = appeler_ia_parallele([{"plateforme": "openai", "modele": "modele-test",
+                                      "message": "Bonjour, qui es-tu ?"}], 1, partager)[0]
+"""
+
+def rafale(utilisateurs, partager, programme=PROGRAMME):
+    """Durée de la rafale (en secondes) et requêtes reçues par le fournisseur."""
+    from cache_fia import analyser
+    from interpreter import VisiteurInterpretation
+    from ai_integration import _stats_connexions_ia
+    ast = analyser(programme)
+    interps = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(utilisateurs):
+            interp = VisiteurInterpretation()
+            interp.contextes[0]['partager'] = partager
+            interps.append(interp)
+    avant = _stats_connexions_ia()['openai']['requetes']
+    threads = [threading.Thread(target=interp.executer_programme, args=(ast,)) for interp in interps]
+    debut = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duree = time.perf_counter() - debut
+    assert all(interp.contextes[0]['reponse'] == "Bonjour, qui es-tu ?" for interp in interps)
+    return duree, _stats_connexions_ia()['openai']['requetes'] - avant
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Appels IA identiques simultanés, partagés ou non")
+    parser.add_argument('--utilisateurs', type=int, default=50)
+    parser.add_argument('--latence', type=float, default=0.5)
+    arguments = parser.parse_args(argv)
+
+    serveur = demarrer(arguments.latence)
+    os.environ['FIA_IA_REQUETES_MINUTE'] = os.environ['FIA_IA_JETONS_MINUTE'] = '0'
+    try:
+        print(f"{arguments.utilisateurs} utilisateurs, même message, latence {arguments.latence:.2f} s")
+        for nom, partager, programme in (
+            ('cache=faux', False, PROGRAMME),
+            ('partagés', True, PROGRAMME),
+            ('parallèle', True, PROGRAMME_PARALLELE),
+        ):
+            duree, requetes = rafale(arguments.utilisateurs, partager, programme)
+            print(f"{nom:<12} {duree:6.2f} s, {requetes} requêtes envoyées au fournisseur")
+    finally:
+        serveur.shutdown()
+    from ai_integration import _stats_cache_ia
+    print(_stats_cache_ia())
+
+if __name__ == "__main__":
+    main()
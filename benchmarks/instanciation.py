@@ -0,0 +1,55 @@
+# benchmarks/instanciation.py
+# Coût de création d'un interpréteur par exécution, comme le fait le service.
+#
+# VisiteurInterpretation() copie la table des fonctions intégrées, y ajoute les
+# fonctions IA et écrit la bannière ; deriver() part d'un interpréteur déjà
+# initialisé et partage sa table sans la copier.
+#
+#   python benchmarks/instanciation.py
+#   python benchmarks/instanciation.py --repetitions 100000
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_fia import analyser
+from interpreter import VisiteurInterpretation
+
+PROGRAMME = 'imprimer("ok")'
+
+def mesurer(creer, repetitions):
+    """Temps moyen (en microsecondes) de `creer(sortie)`, et de création + exécution d'un programme court."""
+    ast = analyser(PROGRAMME)
+    sortie = io.StringIO()
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        creer(sortie)
+    creation = time.perf_counter() - debut
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        creer(sortie).executer_programme(ast)
+    execution = time.perf_counter() - debut
+    return creation / repetitions * 1e6, execution / repetitions * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Création d'un interpréteur : constructeur contre deriver()")
+    parser.add_argument('--repetitions', type=int, default=20000)
+    arguments = parser.parse_args(argv)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        prototype = VisiteurInterpretation(banniere=False)
+    print(f"{len(prototype.fonctions_integrees)} fonctions intégrées, {arguments.repetitions} créations")
+    print(f"{'':<28}{'création':>12}{'+ exécution':>14}")
+    for nom, creer in (
+        ('VisiteurInterpretation()', lambda sortie: VisiteurInterpretation(sortie=sortie)),
+        ('prototype.deriver()', lambda sortie: prototype.deriver(sortie=sortie)),
+    ):
+        creation, execution = mesurer(creer, arguments.repetitions)
+        print(f"{nom:<28}{creation:>9.2f} µs{execution:>11.2f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/modele_memoire.py
+# Mémoire d'un modèle : tableaux contigus contre listes de listes.
+#
+# Les poids d'un reseau_neuronal sont des tableaux NumPy contigus dans un objet
+# opaque : ils occupent 8 (ou 4) octets par poids. Les mêmes poids en listes de
+# listes F-IA coûtent un flottant Python (et un pointeur) par poids.
+#
+#   python benchmarks/modele_memoire.py
+#   python benchmarks/modele_memoire.py --couches 784 512 10
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_fia import analyser
+from interpreter import VisiteurInterpretation
+
+CREATION = """
+soit modele = reseau_neuronal(couches, "relu", type_poids)
+"""
+
+# Poids de la première couche (l'essentiel du modèle) en listes de listes
+EN_LISTES = """
+soit poids = poids_modele(modele, 1)
+"""
+
+def memoire(interp, programme):
+    """Octets alloués (et encore vivants) par l'exécution de `programme`."""
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0]
+    interp.executer_programme(analyser(programme))
+    apres = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return apres - avant
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire d'un modèle : tableaux contigus contre listes")
+    parser.add_argument('--couches', type=int, nargs='+', default=[784, 512, 10])
+    arguments = parser.parse_args(argv)
+
+    import reseau
+    # Hors mesure : mémoire des modules NumPy eux-mêmes (numpy.random est chargé à la demande)
+    reseau.importer_numpy().random.default_rng()
+    print(f"architecture {arguments.couches}")
+    for type_poids in ('float64', 'float32'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            interp = VisiteurInterpretation(banniere=False, sortie=io.StringIO())
+        interp.contextes[0].update({'couches': arguments.couches, 'type_poids': type_poids})
+        octets_modele = memoire(interp, CREATION)
+        octets_listes = memoire(interp, EN_LISTES)
+        octets_couche = interp.contextes[0]['modele'].poids[0].nbytes
+        print(f"{type_poids}: modèle {octets_modele / 1e6:.1f} Mo ; couche 1 : tableau "
+              f"{octets_couche / 1e6:.1f} Mo, en listes {octets_listes / 1e6:.1f} Mo "
+              f"({octets_listes / octets_couche:.1f}×)")
+
+if __name__ == "__main__":
+    main()
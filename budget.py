@@ -0,0 +1,141 @@
+# budget.py
+# Budget d'exécution d'un programme F-IA : instructions, temps et mémoire.
+#
+# Les moteurs décomptent les instructions par bloc exécuté (une soustraction
+# par bloc, pas par noeud) ; le temps et la mémoire ne sont mesurés que
+# toutes les `intervalle` instructions. Toute boucle ou récursion passe par
+# un bloc : aucun programme ne peut échapper au budget.
+import os
+import time
+from errors import BudgetDepasseError
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+RESSOURCES = ('instructions', 'temps', 'memoire')
+
+# Variables d'environnement lues par main.py et app.py
+VARIABLES_BUDGET = {
+    'instructions': 'FIA_BUDGET_INSTRUCTIONS',
+    'temps': 'FIA_BUDGET_TEMPS',
+    'memoire': 'FIA_BUDGET_MEMOIRE',
+}
+
+UNITES_MEMOIRE = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+def convertir_limite(ressource, valeur):
+    """Convertit une limite (nombre ou texte, ex. '64M' pour la mémoire) ; None = illimité."""
+    if valeur is None or valeur == '':
+        return None
+    if isinstance(valeur, bool):
+        raise ValueError(f"limite '{ressource}' invalide: {valeur!r}")
+    if isinstance(valeur, str):
+        texte = valeur.strip().lower()
+        if texte in ('0', 'aucune', 'illimite', 'illimité'):
+            return None
+        facteur = 1
+        if ressource == 'memoire' and texte[-1:] in UNITES_MEMOIRE:
+            facteur, texte = UNITES_MEMOIRE[texte[-1]], texte[:-1]
+        try:
+            valeur = float(texte) * facteur
+        except ValueError:
+            raise ValueError(f"limite '{ressource}' invalide: {valeur!r}") from None
+    if valeur < 0:
+        raise ValueError(f"limite '{ressource}' invalide: {valeur!r}")
+    if valeur == 0:
+        return None
+    return valeur if ressource == 'temps' else int(valeur)
+
+def limites_environnement(defauts=None):
+    """Limites lues dans FIA_BUDGET_*, complétées par `defauts`."""
+    limites = dict(defauts or {})
+    for ressource, variable in VARIABLES_BUDGET.items():
+        if os.environ.get(variable) is not None:
+            limites[ressource] = convertir_limite(ressource, os.environ[variable])
+    return limites
+
+def borner(limites, maximum):
+    """Limites demandées, sans jamais dépasser celles de `maximum`."""
+    bornees = dict(maximum)
+    for ressource, valeur in limites.items():
+        if ressource not in RESSOURCES:
+            raise ValueError(f"ressource de budget inconnue: {ressource}")
+        valeur = convertir_limite(ressource, valeur)
+        if valeur is not None and (maximum.get(ressource) is None or valeur < maximum[ressource]):
+            bornees[ressource] = valeur
+    return bornees
+
+def memoire_processus():
+    """Mémoire résidente du processus en octets (None si non mesurable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # Pic de mémoire résidente : Ko sous Linux, octets sous macOS
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pic if os.uname().sysname == 'Darwin' else pic * 1024
+    return None
+
+class BudgetExecution:
+    """Limites d'une exécution ; None = pas de limite.
+
+    - `instructions` : nombre d'instructions F-IA exécutées
+    - `temps` : durée en secondes depuis le début de l'exécution
+    - `memoire` : croissance de la mémoire résidente du processus, en octets
+      (mesure au niveau du processus : approximative si plusieurs exécutions
+      partagent le même processus)
+    """
+
+    def __init__(self, instructions=None, temps=None, memoire=None, intervalle=1000):
+        self.instructions = instructions
+        self.temps = temps
+        self.memoire = memoire
+        self.intervalle = intervalle
+        self.demarrer()
+
+    def demarrer(self):
+        """Remet les compteurs à zéro au début d'une exécution."""
+        self.consommees = 0 # Instructions décomptées jusqu'à la dernière vérification
+        self.debut = time.monotonic()
+        self.memoire_depart = memoire_processus() if self.memoire is not None else None
+        self._armer()
+
+    def _armer(self):
+        # Prochaine vérification après `_pas` instructions (au plus tard au dépassement)
+        self._pas = self.intervalle
+        if self.instructions is not None:
+            self._pas = max(1, min(self._pas, self.instructions - self.consommees + 1))
+        self.restant = self._pas
+
+    def consommer(self, nombre):
+        """Décompte `nombre` instructions ; vérifie les limites une fois l'intervalle écoulé."""
+        self.restant -= nombre
+        if self.restant <= 0:
+            self.verifier()
+
+    def verifier(self):
+        """Lève BudgetDepasseError si une limite est dépassée."""
+        self.consommees += self._pas - self.restant
+        self._pas = self.restant # Déjà décompté, jusqu'au réarmement
+        if self.instructions is not None and self.consommees > self.instructions:
+            raise BudgetDepasseError('instructions', self.instructions)
+        if self.temps is not None and time.monotonic() - self.debut > self.temps:
+            raise BudgetDepasseError('temps', self.temps)
+        if self.memoire_depart is not None:
+            memoire = memoire_processus()
+            if memoire is not None and memoire - self.memoire_depart > self.memoire:
+                raise BudgetDepasseError('memoire', self.memoire)
+        self._armer()
+
+    def instructions_executees(self):
+        return self.consommees + self._pas - self.restant
+
+    def limites(self):
+        return {'instructions': self.instructions, 'temps': self.temps, 'memoire': self.memoire}
+
+    def __repr__(self):
+        return f"BudgetExecution(instructions={self.instructions}, temps={self.temps}, memoire={self.memoire})"
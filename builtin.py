@@ -2,11 +2,18 @@
 import json
 import math
 import random
+import threading
 from errors import RuntimeError
+from sortie import imprimer, flux_courant
 
 def _imprimer(*args):
-    # Supporte l'affichage de plusieurs arguments comme print
-    print(*args)
+    # Supporte l'affichage de plusieurs arguments comme print, vers la sortie de l'exécution
+    imprimer(*args)
+
+def _ecrire(*args):
+    # Comme imprimer, sans retour à la ligne ; affiché immédiatement (réponses IA en flux)
+    imprimer(*args, end='')
+    flux_courant().flush()
 
 def _longueur(obj):
     try:
@@ -264,53 +271,60 @@ def _arreter():
     raise _ArretProgramme()
 
 # === NOUVELLES FONCTIONS IA ===
+# Fonctions fournies par ai_integration : nom F-IA -> fonction `_<nom>` du module
+FONCTIONS_IA = (
+    'appeler_ia', 'appeler_ia_flux', 'appeler_ia_parallele', 'texte_flux',
+    'lister_plateformes_ia', 'lister_modeles_ia',
+    'generer_reponse_bot', 'generer_reponse_bot_flux',
+    'verifier_config_ia', 'stats_connexions_ia', 'stats_cache_ia', 'stats_debit_ia',
+)
+
 # Import avec gestion d'erreur pour les dépendances IA
 def _safe_import_ai():
     """Import sécurisé du module IA"""
     try:
-        from ai_integration import (
-            _appeler_ia, _lister_plateformes_ia, _lister_modeles_ia, 
-            _generer_reponse_bot, _verifier_config_ia
-        )
-        return {
-            'appeler_ia': _appeler_ia,
-            'lister_plateformes_ia': _lister_plateformes_ia,
-            'lister_modeles_ia': _lister_modeles_ia,
-            'generer_reponse_bot': _generer_reponse_bot,
-            'verifier_config_ia': _verifier_config_ia
-        }
+        import ai_integration
+        return {nom: getattr(ai_integration, f'_{nom}') for nom in FONCTIONS_IA}
     except ImportError as e:
         # Si les dépendances IA ne sont pas installées
         def _ia_non_disponible(*args, **kwargs):
             raise RuntimeError("Fonctions IA non disponibles. Installez les dépendances: pip install -r requirements.txt")
         
-        return {
-            'appeler_ia': _ia_non_disponible,
-            'lister_plateformes_ia': _ia_non_disponible,
-            'lister_modeles_ia': _ia_non_disponible,
-            'generer_reponse_bot': _ia_non_disponible,
-            'verifier_config_ia': _ia_non_disponible
-        }
+        return {nom: _ia_non_disponible for nom in FONCTIONS_IA}
     except Exception as e:
-        # Autres erreurs (clés API manquantes, etc.)
+        # Autres erreurs (clés API manquantes, etc.) ; `e` n'existe plus après le except
+        message = str(e)
         def _ia_erreur(*args, **kwargs):
-            raise RuntimeError(f"Erreur IA: {str(e)}")
+            raise RuntimeError(f"Erreur IA: {message}")
         
-        return {
-            'appeler_ia': _ia_erreur,
-            'lister_plateformes_ia': _ia_erreur,
-            'lister_modeles_ia': _ia_erreur,
-            'generer_reponse_bot': _ia_erreur,
-            'verifier_config_ia': _ia_erreur
-        }
-
-# Charger les fonctions IA
-_ai_functions = _safe_import_ai()
+        return {nom: _ia_erreur for nom in FONCTIONS_IA}
+
+# Les fonctions IA (openai, httpx, .env) ne sont chargées qu'au premier appel de
+# l'une d'elles : un script sans IA démarre sans importer ces dépendances
+_ai_functions = None
+_verrou_ia = threading.Lock()
+
+def charger_fonctions_ia():
+    """Importe et initialise le module IA s'il ne l'est pas déjà ; retourne ses fonctions"""
+    global _ai_functions
+    with _verrou_ia:
+        if _ai_functions is None:
+            _ai_functions = _safe_import_ai()
+        return _ai_functions
+
+def _fonction_ia(nom):
+    """Fonction IA `nom` qui charge le module IA à son premier appel"""
+    def fonction(*args, **kwargs):
+        fonctions = _ai_functions if _ai_functions is not None else charger_fonctions_ia()
+        return fonctions[nom](*args, **kwargs)
+    fonction.__name__ = f'_{nom}'
+    return fonction
 
 # Table des fonctions intégrées exposées au langage F-IA
 FONCTIONS_INTEGREES = {
     # Fonctions de base
     "imprimer": _imprimer,
+    "ecrire": _ecrire,
     "longueur": _longueur,
     "arrondir": _arrondir,
     "aleatoire": _aleatoire,
@@ -353,9 +367,16 @@ FONCTIONS_INTEGREES = {
     "arreter": _arreter,
 
     # === FONCTIONS IA INTÉGRÉES ===
-    "appeler_ia": _ai_functions['appeler_ia'],
-    "lister_plateformes_ia": _ai_functions['lister_plateformes_ia'],
-    "lister_modeles_ia": _ai_functions['lister_modeles_ia'],
-    "generer_reponse_bot": _ai_functions['generer_reponse_bot'],
-    "verifier_config_ia": _ai_functions['verifier_config_ia'],
+    "appeler_ia": _fonction_ia('appeler_ia'),
+    "appeler_ia_flux": _fonction_ia('appeler_ia_flux'),
+    "appeler_ia_parallele": _fonction_ia('appeler_ia_parallele'),
+    "lister_plateformes_ia": _fonction_ia('lister_plateformes_ia'),
+    "lister_modeles_ia": _fonction_ia('lister_modeles_ia'),
+    "generer_reponse_bot": _fonction_ia('generer_reponse_bot'),
+    "generer_reponse_bot_flux": _fonction_ia('generer_reponse_bot_flux'),
+    "texte_flux": _fonction_ia('texte_flux'),
+    "verifier_config_ia": _fonction_ia('verifier_config_ia'),
+    "stats_connexions_ia": _fonction_ia('stats_connexions_ia'),
+    "stats_cache_ia": _fonction_ia('stats_cache_ia'),
+    "stats_debit_ia": _fonction_ia('stats_debit_ia'),
 }
@@ -0,0 +1,419 @@
+# bytecode.py
+# Compilation de l'AST F-IA vers un bytecode à pile exécuté par vm.MachineVirtuelle.
+#
+# Une instruction est un couple (opcode, argument). Les sauts désignent un
+# index dans la liste d'instructions du même CodeFIA ; chaque fonction
+# utilisateur possède son propre CodeFIA.
+from errors import RuntimeError
+from fia_ast import (
+    Programme, DeclarationVariable, Assignation, AssignationComposee, ExpressionBinaire,
+    ExpressionUnaire, Littéral, ListeLitterale, DictionnaireLitteral, Identifiant, AppelFonction,
+    Condition, BoucleTantQue, BouclePour, BouclePourDans, Bloc, Fonction, Retour, AccesIndex,
+    AccesDictionnaire, ExpressionStatement,
+)
+from operations import (
+    OPERATEURS_BINAIRES, OPERATEURS_UNAIRES, OPERATEURS_COMPOSES, OPERATIONS_RAPIDES,
+    nom_de_fonction, constante, plier_constantes,
+)
+
+# ========== OPCODES ==========
+# Numérotés par fréquence d'exécution décroissante (ordre de test dans la VM)
+
+CHARGER_LOCAL = 0            # (niveau, slot, nom) -> slot du cadre, sinon variable globale
+CHARGER_GLOBAL = 1           # nom -> empile la variable globale
+CONSTANTE = 2                # valeur -> empile la valeur
+BINAIRE = 3                  # (operation, rapide) -> dépile d, g ; empile g op d
+BINAIRE_CONSTANTE = 4        # (operation, rapide, d) -> dépile g ; empile g op d
+SAUT_SI_FAUX = 5             # cible -> dépile la condition
+SAUT = 6                     # cible
+CONSOMMER = 7                # cout -> décompte le budget d'exécution (début de bloc)
+STOCKER_LOCAL = 8            # (niveau, slot) -> dépile dans le slot du cadre
+STOCKER_GLOBAL = 9           # nom -> dépile dans le contexte global
+VERIFIER_EXISTE = 10         # (adresses, nom, message) -> erreur si la variable n'existe pas
+APPELER = 11                 # (nom, nb_args) -> fonction utilisateur
+APPELER_INTEGREE = 12        # (nom, fonction, nb_args)
+RETOURNER = 13               # -> dépile la valeur de retour
+DEPILER = 14                 # -> jette le sommet de pile
+INDEX = 15                   # -> dépile index, base ; empile base[index]
+CLE = 16                     # -> dépile cle, base ; empile base[cle]
+UNAIRE = 17                  # operation -> dépile v ; empile op v
+CHARGER_NOM = 18             # (adresses, nom) -> plusieurs slots candidats ou recherche par nom
+CHARGER_FONCTION_OU_NOM = 19 # (adresses, nom) -> fonction utilisateur si définie, sinon variable
+STOCKER_INDEX = 20           # -> dépile index, base, valeur
+STOCKER_CLE = 21             # -> dépile cle, base, valeur
+PREPARER_INDEX_COMPOSE = 22  # -> base, index -> base, index, base[index] (vérifiés)
+PREPARER_CLE_COMPOSE = 23    # -> base, cle -> base, cle, base[cle] (vérifiés)
+STOCKER_COMPOSE = 24         # -> dépile resultat, index, base ; base[index] = resultat
+CONSTANTE_CONTENEUR = 25     # valeur -> empile une copie de la liste/du dictionnaire littéral
+ENTRER_BLOC = 26             # portee -> cadre temporaire du niveau global
+SORTIR_BLOC = 27             # -> fusion du cadre temporaire dans le global
+POUR_DANS_DEBUT = 28         # portee -> dépile l'itérable ; ouvre le cadre de boucle
+POUR_DANS_SUIVANT = 29       # cible -> élément suivant dans le slot 1, ou saut en fin
+POUR_DANS_FIN = 30           # -> ferme le cadre de boucle
+DEFINIR_FONCTION = 31        # (nom, params, corps, portee)
+ERREUR = 32                  # message -> lève une RuntimeError
+FIN = 33                     # -> fin du programme, dépile le résultat
+CONSTRUIRE_LISTE = 34        # n -> dépile n éléments ; empile la liste
+CONSTRUIRE_DICTIONNAIRE = 35 # n -> dépile n couples (cle, valeur) ; empile le dictionnaire
+
+NOMS_OPCODES = {valeur: nom for nom, valeur in list(globals().items())
+                if nom.isupper() and isinstance(valeur, int)}
+
+class CodeFIA:
+    """Bytecode d'un programme ou d'un corps de fonction."""
+    def __init__(self, nom, instructions, positions):
+        self.nom = nom
+        self.instructions = instructions # Liste de (opcode, argument)
+        self.positions = positions # (ligne, colonne) source de chaque instruction
+
+    def __repr__(self):
+        return f"CodeFIA({self.nom}, {len(self.instructions)} instructions)"
+
+class CompilateurBytecode:
+    """Compile un Programme (et les fonctions qu'il définit) en CodeFIA.
+
+    Les corps de fonctions compilés sont enregistrés dans
+    `interpreteur.codes_bytecode`, indexés par leur noeud Bloc.
+    """
+
+    def __init__(self, interpreteur):
+        self.interpreteur = interpreteur
+        self._fonctions_declarees = set()
+        self._instructions = None
+        self._positions = None
+        self._source = (None, None) # Position du noeud en cours de compilation
+        self._compilateurs = {
+            DeclarationVariable: self._compiler_declaration_variable,
+            Assignation: self._compiler_assignation,
+            AssignationComposee: self._compiler_assignation_composee,
+            ExpressionBinaire: self._compiler_expression_binaire,
+            ExpressionUnaire: self._compiler_expression_unaire,
+            Littéral: self._compiler_litteral,
+            ListeLitterale: self._compiler_liste_litterale,
+            DictionnaireLitteral: self._compiler_dictionnaire_litteral,
+            Identifiant: self._compiler_identifiant,
+            AppelFonction: self._compiler_appel_fonction,
+            Condition: self._compiler_condition,
+            BoucleTantQue: self._compiler_boucle_tant_que,
+            BouclePour: self._compiler_boucle_pour,
+            BouclePourDans: self._compiler_boucle_pour_dans,
+            Bloc: self._compiler_bloc,
+            Fonction: self._compiler_fonction,
+            Retour: self._compiler_retour,
+            AccesIndex: self._compiler_acces_index,
+            AccesDictionnaire: self._compiler_acces_dictionnaire,
+            ExpressionStatement: self._compiler_expression_statement,
+        }
+
+    def compiler_programme(self, programme):
+        self._fonctions_declarees = set(self.interpreteur.fonctions_definies)
+        self._collecter_fonctions(programme)
+        return self._compiler_unite('<programme>', programme.instructions, FIN)
+
+    def compiler_fonction(self, nom, corps):
+        # Corps de fonction : contextes = [global, cadre local], le Bloc ne crée pas de cadre
+        return self._compiler_unite(nom, corps.instructions, RETOURNER)
+
+    def _compiler_unite(self, nom, instructions, opcode_fin):
+        sauvegarde = self._instructions, self._positions
+        self._instructions, self._positions = [], []
+        try:
+            self._emettre(CONSOMMER, len(instructions) or 1)
+            # La valeur de la dernière instruction est le résultat de l'unité
+            for i, instruction in enumerate(instructions):
+                if i == len(instructions) - 1 and isinstance(instruction, ExpressionStatement):
+                    self.compiler(instruction.expression)
+                else:
+                    self.compiler(instruction)
+            if not instructions or not isinstance(instructions[-1], ExpressionStatement):
+                self._emettre(CONSTANTE, None)
+            self._emettre(opcode_fin)
+            return CodeFIA(nom, self._instructions, self._positions)
+        finally:
+            self._instructions, self._positions = sauvegarde
+
+    def compiler(self, noeud):
+        compilateur = self._compilateurs.get(type(noeud))
+        if compilateur is None:
+            raise RuntimeError(f"Erreur de compilation: noeud non supporté {type(noeud).__name__}")
+        source = self._source
+        if noeud.ligne is not None:
+            self._source = (noeud.ligne, noeud.colonne)
+        compilateur(noeud)
+        self._source = source
+
+    def _collecter_fonctions(self, noeud):
+        """Recense les noms des fonctions utilisateur déclarées dans le programme."""
+        if isinstance(noeud, Fonction):
+            self._fonctions_declarees.add(noeud.nom)
+            self._collecter_fonctions(noeud.corps)
+        elif isinstance(noeud, (Programme, Bloc)):
+            for instruction in noeud.instructions:
+                self._collecter_fonctions(instruction)
+        elif isinstance(noeud, Condition):
+            self._collecter_fonctions(noeud.bloc_si)
+            if noeud.bloc_sinon:
+                self._collecter_fonctions(noeud.bloc_sinon)
+        elif isinstance(noeud, (BoucleTantQue, BouclePourDans)):
+            self._collecter_fonctions(noeud.corps)
+        elif isinstance(noeud, BouclePour):
+            self._collecter_fonctions(noeud.init)
+            self._collecter_fonctions(noeud.increment)
+            self._collecter_fonctions(noeud.corps)
+
+    # --- Émission ---
+
+    def _emettre(self, opcode, argument=None):
+        self._instructions.append((opcode, argument))
+        self._positions.append(self._source)
+        return len(self._instructions) - 1
+
+    def _position(self):
+        return len(self._instructions)
+
+    def _corriger_saut(self, index, cible=None):
+        """Renseigne la cible d'un saut émis avant que celle-ci soit connue."""
+        opcode, argument = self._instructions[index]
+        cible = self._position() if cible is None else cible
+        if isinstance(argument, tuple):
+            self._instructions[index] = (opcode, argument[:-1] + (cible,))
+        else:
+            self._instructions[index] = (opcode, cible)
+
+    def _emettre_chargement(self, ident):
+        """Lecture d'une variable selon les adresses calculées par le résolveur."""
+        adresses = ident.adresses
+        if adresses == ():
+            self._emettre(CHARGER_GLOBAL, ident.nom)
+        elif adresses is not None and len(adresses) == 1:
+            niveau, slot = adresses[0]
+            self._emettre(CHARGER_LOCAL, (niveau, slot, ident.nom))
+        else:
+            self._emettre(CHARGER_NOM, (adresses, ident.nom))
+
+    def _emettre_stockage(self, nom, adresse):
+        if adresse is None:
+            self._emettre(STOCKER_GLOBAL, nom)
+        else:
+            self._emettre(STOCKER_LOCAL, adresse)
+
+    # --- Instructions ---
+
+    def _compiler_bloc(self, bloc):
+        # Seul un bloc de niveau global a son propre cadre (voir resolveur.py)
+        if bloc.portee is not None:
+            self._emettre(ENTRER_BLOC, bloc.portee)
+        # Budget décompté par bloc : toute boucle ou récursion passe par ici
+        self._emettre(CONSOMMER, len(bloc.instructions) or 1)
+        for instruction in bloc.instructions:
+            self.compiler(instruction)
+        if bloc.portee is not None:
+            self._emettre(SORTIR_BLOC)
+
+    def _compiler_expression_statement(self, stmt):
+        self.compiler(stmt.expression)
+        self._emettre(DEPILER)
+
+    def _compiler_declaration_variable(self, decl):
+        if decl.valeur:
+            self.compiler(decl.valeur)
+        else:
+            self._emettre(CONSTANTE, None)
+        self._emettre_stockage(decl.nom, decl.adresse)
+
+    def _compiler_assignation(self, assign):
+        self.compiler(assign.valeur)
+        cible = assign.cible
+        if isinstance(cible, Identifiant):
+            self._emettre(VERIFIER_EXISTE, (cible.adresses, cible.nom, f"Erreur d'exécution: variable '{cible.nom}' non déclarée avant assignation"))
+            self._emettre_stockage(cible.nom, assign.adresse)
+        elif isinstance(cible, AccesIndex):
+            self.compiler(cible.base)
+            self.compiler(cible.index)
+            self._emettre(STOCKER_INDEX)
+        elif isinstance(cible, AccesDictionnaire):
+            self.compiler(cible.base)
+            self.compiler(cible.cle)
+            self._emettre(STOCKER_CLE)
+        else:
+            self._emettre(ERREUR, "Erreur d'exécution: Cible d'assignation invalide")
+
+    def _compiler_assignation_composee(self, assign):
+        cible = assign.cible
+        operation = OPERATEURS_COMPOSES.get(assign.operateur)
+
+        if isinstance(cible, Identifiant):
+            self._emettre(VERIFIER_EXISTE, (cible.adresses, cible.nom, f"Erreur d'exécution: variable '{cible.nom}' non déclarée avant assignation composée"))
+            self._emettre_chargement(cible)
+            erreur = f"Erreur d'exécution: Opérateur d'assignation composée inconnu: {assign.operateur}"
+            stockage = (STOCKER_GLOBAL, cible.nom) if assign.adresse is None else (STOCKER_LOCAL, assign.adresse)
+        elif isinstance(cible, AccesIndex):
+            self.compiler(cible.base)
+            self.compiler(cible.index)
+            self._emettre(PREPARER_INDEX_COMPOSE)
+            erreur = f"Erreur d'exécution: Opérateur d'assignation composée non supporté pour les listes: {assign.operateur}"
+            stockage = (STOCKER_COMPOSE, None)
+        elif isinstance(cible, AccesDictionnaire):
+            self.compiler(cible.base)
+            self.compiler(cible.cle)
+            self._emettre(PREPARER_CLE_COMPOSE)
+            erreur = f"Erreur d'exécution: Opérateur d'assignation composée non supporté pour les dictionnaires: {assign.operateur}"
+            stockage = (STOCKER_COMPOSE, None)
+        else:
+            self._emettre(ERREUR, "Erreur d'exécution: Cible d'assignation composée invalide")
+            return
+
+        self.compiler(assign.valeur)
+        if operation is None:
+            self._emettre(ERREUR, erreur)
+            return
+        self._emettre(BINAIRE, (operation, None))
+        self._emettre(*stockage)
+
+    def _compiler_condition(self, condition):
+        self.compiler(condition.condition)
+        saut_sinon = self._emettre(SAUT_SI_FAUX)
+        self.compiler(condition.bloc_si)
+        if condition.bloc_sinon:
+            saut_fin = self._emettre(SAUT)
+            self._corriger_saut(saut_sinon)
+            self.compiler(condition.bloc_sinon)
+            self._corriger_saut(saut_fin)
+        else:
+            self._corriger_saut(saut_sinon)
+
+    def _compiler_boucle(self, condition, corps, increment=None):
+        """Boucle commune à tant_que et pour(init; condition; increment)."""
+        debut = self._position()
+        self.compiler(condition)
+        saut_fin = self._emettre(SAUT_SI_FAUX)
+        self.compiler(corps)
+        if increment is not None:
+            self.compiler(increment)
+        self._emettre(SAUT, debut)
+        self._corriger_saut(saut_fin)
+
+    def _compiler_boucle_tant_que(self, boucle):
+        self._compiler_boucle(boucle.condition, boucle.corps)
+
+    def _compiler_boucle_pour(self, boucle):
+        self.compiler(boucle.init)
+        self._compiler_boucle(boucle.condition, boucle.corps, boucle.increment)
+
+    def _compiler_boucle_pour_dans(self, boucle):
+        self.compiler(boucle.iterable)
+        self._emettre(POUR_DANS_DEBUT, boucle.portee)
+        debut = self._emettre(POUR_DANS_SUIVANT)
+        self.compiler(boucle.corps)
+        self._emettre(SAUT, debut)
+        self._corriger_saut(debut)
+        self._emettre(POUR_DANS_FIN)
+
+    def _compiler_fonction(self, fonction):
+        codes = self.interpreteur.codes_bytecode
+        if fonction.corps not in codes:
+            codes[fonction.corps] = self.compiler_fonction(fonction.nom, fonction.corps)
+        self._emettre(DEFINIR_FONCTION, (fonction.nom, fonction.parametres, fonction.corps, fonction.portee))
+
+    def _compiler_retour(self, retour):
+        if retour.valeur is not None:
+            self.compiler(retour.valeur)
+        else:
+            self._emettre(CONSTANTE, None)
+        self._emettre(RETOURNER)
+
+    # --- Expressions ---
+
+    def _compiler_litteral(self, litteral):
+        if isinstance(litteral.valeur, (list, dict)):
+            self._emettre(CONSTANTE_CONTENEUR, litteral.valeur)
+            return
+        self._emettre(CONSTANTE, litteral.valeur)
+
+    def _compiler_liste_litterale(self, liste):
+        for element in liste.elements:
+            self.compiler(element)
+        self._emettre(CONSTRUIRE_LISTE, len(liste.elements))
+
+    def _compiler_dictionnaire_litteral(self, dictionnaire):
+        for cle, valeur in zip(dictionnaire.cles, dictionnaire.valeurs):
+            self.compiler(cle)
+            self.compiler(valeur)
+        self._emettre(CONSTRUIRE_DICTIONNAIRE, len(dictionnaire.cles))
+
+    def _compiler_identifiant(self, ident):
+        fonction = self.interpreteur.fonctions_integrees.get(ident.nom)
+        if fonction is not None:
+            self._emettre(CONSTANTE, fonction)
+        elif ident.nom in self._fonctions_declarees:
+            self._emettre(CHARGER_FONCTION_OU_NOM, (ident.adresses, ident.nom))
+        else:
+            self._emettre_chargement(ident)
+
+    def _compiler_expression_binaire(self, expr_bin):
+        operation = OPERATEURS_BINAIRES.get(expr_bin.operateur)
+        if operation is not None:
+            resultat = plier_constantes(operation, expr_bin.gauche, expr_bin.droite)
+            if resultat is not None:
+                self._emettre(CONSTANTE, resultat[0])
+                return
+        rapide = OPERATIONS_RAPIDES.get(expr_bin.operateur)
+        droite_constante = constante(expr_bin.droite)
+        if rapide is not None and droite_constante is not None and type(droite_constante[0]) is not str:
+            # Forme spécialisée pour 'x < 10', 'i + 1'...
+            self.compiler(expr_bin.gauche)
+            self._emettre(BINAIRE_CONSTANTE, (operation, rapide, droite_constante[0]))
+            return
+        self.compiler(expr_bin.gauche)
+        self.compiler(expr_bin.droite)
+        if operation is None:
+            self._emettre(ERREUR, f"Erreur d'exécution: Opérateur binaire inconnu: {expr_bin.operateur}")
+        else:
+            self._emettre(BINAIRE, (operation, rapide))
+
+    def _compiler_expression_unaire(self, expr_unaire):
+        operation = OPERATEURS_UNAIRES.get(expr_unaire.operateur)
+        if operation is not None:
+            resultat = plier_constantes(operation, expr_unaire.operande)
+            if resultat is not None:
+                self._emettre(CONSTANTE, resultat[0])
+                return
+        self.compiler(expr_unaire.operande)
+        if operation is None:
+            self._emettre(ERREUR, f"Erreur d'exécution: Opérateur unaire non supporté: {expr_unaire.operateur}")
+        else:
+            self._emettre(UNAIRE, operation)
+
+    def _compiler_appel_fonction(self, appel):
+        nom_fonction = nom_de_fonction(appel.nom_fonction)
+        for argument in appel.arguments:
+            self.compiler(argument)
+        nb_args = len(appel.arguments)
+        fonction = self.interpreteur.fonctions_integrees.get(nom_fonction)
+        if fonction is not None:
+            self._emettre(APPELER_INTEGREE, (nom_fonction, fonction, nb_args))
+        else:
+            self._emettre(APPELER, (nom_fonction, nb_args))
+
+    def _compiler_acces_index(self, acces_index):
+        self.compiler(acces_index.base)
+        self.compiler(acces_index.index)
+        self._emettre(INDEX)
+
+    def _compiler_acces_dictionnaire(self, acces_dict):
+        self.compiler(acces_dict.base)
+        self.compiler(acces_dict.cle)
+        self._emettre(CLE)
+
+def desassembler(code):
+    """Retourne une représentation lisible d'un CodeFIA (débogage, profilage)."""
+    lignes = [f"== {code.nom} =="]
+    for index, (opcode, argument) in enumerate(code.instructions):
+        nom = NOMS_OPCODES.get(opcode, str(opcode))
+        if argument is None:
+            lignes.append(f"{index:5d}  {nom}")
+        else:
+            if isinstance(argument, tuple):
+                argument = ", ".join(getattr(a, '__name__', repr(a)) for a in argument)
+            lignes.append(f"{index:5d}  {nom:<24} {argument}")
+    return "\n".join(lignes)
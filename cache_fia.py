@@ -0,0 +1,103 @@
+# cache_fia.py
+# Cache disque des programmes F-IA analysés (fichiers .fiac).
+#
+# Un fichier .fiac contient une en-tête (signature + clé) suivie de l'AST
+# sérialisé avec pickle. La clé est l'empreinte SHA-256 du code source et de
+# VERSION_CACHE : un script modifié ou un interpréteur mis à jour invalide
+# le cache sans autre vérification. Le dossier de cache doit être de
+# confiance (pickle exécute du code au chargement).
+import hashlib
+import os
+import pickle
+import tempfile
+from lexer import LexerFIA
+from parser import ParserFIA
+
+# À incrémenter à chaque changement du lexer, du parser ou des noeuds AST
+VERSION_CACHE = 4
+
+SIGNATURE = b'FIAC'
+EXTENSION_CACHE = '.fiac'
+DOSSIER_CACHE = '__fiacache__'
+
+def cle_source(code_source):
+    """Empreinte du code source pour la version courante de l'interpréteur."""
+    empreinte = hashlib.sha256(f"F-IA/{VERSION_CACHE}\0".encode('utf-8'))
+    empreinte.update(code_source.encode('utf-8'))
+    return empreinte.hexdigest()
+
+def cache_active():
+    """Le cache peut être désactivé avec FIA_CACHE=0."""
+    return os.environ.get('FIA_CACHE', '1').lower() not in ('0', 'non', 'false')
+
+def chemin_cache(cle, nom_fichier=None):
+    """Chemin du fichier .fiac, ou None si aucun emplacement n'est configuré.
+
+    Avec FIA_CACHE_DIR, les entrées sont nommées par leur clé. Sinon un script
+    est mis en cache dans `__fiacache__/` à côté de lui (une entrée par script,
+    réécrite quand le source change) ; du code sans fichier n'est pas mis en cache.
+    """
+    dossier = os.environ.get('FIA_CACHE_DIR')
+    if dossier:
+        return os.path.join(dossier, cle + EXTENSION_CACHE)
+    if nom_fichier:
+        dossier_script, nom = os.path.split(os.path.abspath(nom_fichier))
+        return os.path.join(dossier_script, DOSSIER_CACHE, os.path.splitext(nom)[0] + EXTENSION_CACHE)
+    return None
+
+def analyser(code_source):
+    """Analyse lexicale et syntaxique complète du code source."""
+    # Le parser consomme les tokens au fil de leur production par le lexer
+    return ParserFIA(LexerFIA(code_source).generer_tokens()).analyser()
+
+def lire_cache(chemin, cle):
+    """Retourne l'AST stocké dans `chemin` s'il correspond à `cle`, sinon None."""
+    try:
+        with open(chemin, 'rb') as f:
+            if f.read(len(SIGNATURE)) != SIGNATURE or f.read(len(cle)).decode('ascii') != cle:
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, UnicodeDecodeError, pickle.UnpicklingError, AttributeError, ImportError):
+        # Entrée absente, tronquée ou produite par une version incompatible
+        return None
+
+def ecrire_cache(chemin, cle, ast):
+    """Enregistre l'AST ; un échec d'écriture n'empêche pas l'exécution."""
+    fichier_temporaire = None
+    try:
+        dossier = os.path.dirname(chemin)
+        os.makedirs(dossier, exist_ok=True)
+        # Écriture atomique : plusieurs processus peuvent viser la même entrée
+        descripteur, fichier_temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+        with os.fdopen(descripteur, 'wb') as f:
+            f.write(SIGNATURE)
+            f.write(cle.encode('ascii'))
+            pickle.dump(ast, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(fichier_temporaire, chemin)
+        fichier_temporaire = None
+    except (OSError, pickle.PicklingError, RecursionError):
+        pass
+    finally:
+        if fichier_temporaire is not None:
+            try:
+                os.remove(fichier_temporaire)
+            except OSError:
+                pass
+
+def analyser_source(code_source, nom_fichier=None):
+    """Retourne l'AST du code source, en passant par le cache .fiac si possible.
+
+    L'AST est lu depuis le cache (ou écrit dedans) avant toute exécution :
+    les littéraux modifiés à l'exécution ne sont jamais enregistrés.
+    """
+    if not cache_active():
+        return analyser(code_source)
+    cle = cle_source(code_source)
+    chemin = chemin_cache(cle, nom_fichier)
+    if chemin is None:
+        return analyser(code_source)
+    ast = lire_cache(chemin, cle)
+    if ast is None:
+        ast = analyser(code_source)
+        ecrire_cache(chemin, cle, ast)
+    return ast
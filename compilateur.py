@@ -0,0 +1,536 @@
+# compilateur.py
+# Compilation de l'AST F-IA en fermetures Python pré-liées.
+#
+# Chaque noeud est transformé une seule fois en une fonction sans argument :
+# l'opérateur est résolu à la compilation, les expressions constantes sont
+# pré-calculées et chaque identifiant est classé (fonction intégrée, fonction
+# utilisateur ou variable). L'exécution n'a plus de double dispatch
+# accepter()/visiter_*() ni de comparaisons de chaînes sur les opérateurs.
+from errors import RuntimeError, ReturnException
+from builtin import _ArretProgramme
+from fia_ast import (
+    Programme, DeclarationVariable, Assignation, AssignationComposee, ExpressionBinaire,
+    ExpressionUnaire, Littéral, ListeLitterale, DictionnaireLitteral, Identifiant, AppelFonction,
+    Condition, BoucleTantQue, BouclePour, BouclePourDans, Bloc, Fonction, Retour, AccesIndex,
+    AccesDictionnaire, ExpressionStatement,
+)
+from operations import (
+    OPERATEURS_BINAIRES, OPERATEURS_UNAIRES, OPERATEURS_COMPOSES, OPERATIONS_RAPIDES,
+    constante, plier_constantes,
+    copier_litteral, construire_dictionnaire, appeler_fonction_integree, nom_de_fonction,
+    iterer_pour_dans, lire_index, lire_cle, ecrire_index, ecrire_cle,
+)
+from resolveur import INDEFINI, lire_variable, variable_existe, lire_par_nom, fusionner_bloc
+
+class CompilateurClosures:
+    """Compile un Programme en fermetures liées à un VisiteurInterpretation.
+
+    L'interpréteur fournit l'état d'exécution (pile de contextes, fonctions
+    intégrées et définies) : les deux modes peuvent donc être mélangés, par
+    exemple dans le REPL.
+    """
+
+    def __init__(self, interpreteur):
+        self.interpreteur = interpreteur
+        self._fonctions_declarees = set()
+        self._compilateurs = {
+            Programme: self._compiler_programme,
+            DeclarationVariable: self._compiler_declaration_variable,
+            Assignation: self._compiler_assignation,
+            AssignationComposee: self._compiler_assignation_composee,
+            ExpressionBinaire: self._compiler_expression_binaire,
+            ExpressionUnaire: self._compiler_expression_unaire,
+            Littéral: self._compiler_litteral,
+            ListeLitterale: self._compiler_liste_litterale,
+            DictionnaireLitteral: self._compiler_dictionnaire_litteral,
+            Identifiant: self._compiler_identifiant,
+            AppelFonction: self._compiler_appel_fonction,
+            Condition: self._compiler_condition,
+            BoucleTantQue: self._compiler_boucle_tant_que,
+            BouclePour: self._compiler_boucle_pour,
+            BouclePourDans: self._compiler_boucle_pour_dans,
+            Bloc: self._compiler_bloc,
+            Fonction: self._compiler_fonction,
+            Retour: self._compiler_retour,
+            AccesIndex: self._compiler_acces_index,
+            AccesDictionnaire: self._compiler_acces_dictionnaire,
+            ExpressionStatement: self._compiler_expression_statement,
+        }
+
+    def compiler_programme(self, programme):
+        """Compile un programme complet et retourne une fonction sans argument."""
+        self._fonctions_declarees = set(self.interpreteur.fonctions_definies)
+        self._collecter_fonctions(programme)
+        return self.compiler(programme)
+
+    def compiler(self, noeud):
+        compilateur = self._compilateurs.get(type(noeud))
+        if compilateur is None:
+            raise RuntimeError(f"Erreur de compilation: noeud non supporté {type(noeud).__name__}")
+        return compilateur(noeud)
+
+    def _collecter_fonctions(self, noeud):
+        """Recense les noms des fonctions utilisateur déclarées dans le programme."""
+        if isinstance(noeud, Fonction):
+            self._fonctions_declarees.add(noeud.nom)
+            self._collecter_fonctions(noeud.corps)
+        elif isinstance(noeud, (Programme, Bloc)):
+            for instruction in noeud.instructions:
+                self._collecter_fonctions(instruction)
+        elif isinstance(noeud, Condition):
+            self._collecter_fonctions(noeud.bloc_si)
+            if noeud.bloc_sinon:
+                self._collecter_fonctions(noeud.bloc_sinon)
+        elif isinstance(noeud, (BoucleTantQue, BouclePourDans)):
+            self._collecter_fonctions(noeud.corps)
+        elif isinstance(noeud, BouclePour):
+            self._collecter_fonctions(noeud.init)
+            self._collecter_fonctions(noeud.increment)
+            self._collecter_fonctions(noeud.corps)
+
+    # --- Accès aux variables ---
+
+    def _lecteur_variable(self, nom, adresses):
+        """Lecteur spécialisé selon les adresses calculées par le résolveur."""
+        interp = self.interpreteur
+
+        if adresses is None:
+            # Identifiant non résolu : recherche par nom
+            return lambda: lire_par_nom(interp.contextes, nom)
+
+        if not adresses:
+            def lire_global():
+                globaux = interp.contextes[0]
+                if nom in globaux:
+                    return globaux[nom]
+                raise RuntimeError(f"Erreur d'exécution: Variable '{nom}' non définie")
+            return lire_global
+
+        if len(adresses) == 1:
+            (niveau, slot), = adresses
+
+            def lire_local():
+                contextes = interp.contextes
+                valeur = contextes[niveau][slot]
+                if valeur is not INDEFINI:
+                    return valeur
+                globaux = contextes[0]
+                if nom in globaux:
+                    return globaux[nom]
+                raise RuntimeError(f"Erreur d'exécution: Variable '{nom}' non définie")
+            return lire_local
+
+        return lambda: lire_variable(interp.contextes, adresses, nom)
+
+    def _ecrivain_variable(self, nom, adresse):
+        """Écriture dans le slot `adresse`, ou dans le contexte global si None."""
+        interp = self.interpreteur
+        if adresse is None:
+            def ecrire_global(valeur):
+                interp.contextes[0][nom] = valeur
+            return ecrire_global
+        niveau, slot = adresse
+
+        def ecrire_local(valeur):
+            interp.contextes[niveau][slot] = valeur
+        return ecrire_local
+
+    # --- Instructions ---
+
+    def _compiler_sequence(self, noeuds):
+        """Compile une suite d'instructions exécutées dans l'ordre.
+
+        Une RuntimeError reçoit la position de l'instruction qui l'a levée :
+        le suivi se fait par instruction, sans coût sur les expressions.
+        Le budget d'exécution est décompté une fois par séquence.
+        """
+        interp = self.interpreteur
+        instructions = [self.compiler(noeud) for noeud in noeuds]
+        positions = [(noeud.ligne, noeud.colonne) for noeud in noeuds]
+        cout = len(instructions) or 1
+
+        def executer_sequence():
+            interp.budget.consommer(cout)
+            resultat = None
+            index = 0
+            try:
+                for index, instruction in enumerate(instructions):
+                    resultat = instruction()
+            except RuntimeError as erreur:
+                erreur.localiser(*positions[index])
+                raise
+            return resultat
+        return executer_sequence
+
+    def _compiler_programme(self, programme):
+        sequence = self._compiler_sequence(programme.instructions)
+
+        def executer_programme():
+            try:
+                return sequence()
+            except _ArretProgramme:
+                # Arrêt contrôlé du programme (arreter())
+                return None
+        return executer_programme
+
+    def _compiler_bloc(self, bloc):
+        interp = self.interpreteur
+        sequence = self._compiler_sequence(bloc.instructions)
+        portee = bloc.portee
+        if portee is None:
+            return sequence
+
+        def executer_bloc():
+            # Au niveau global : cadre temporaire fusionné en sortie de bloc
+            contextes = interp.contextes
+            contextes.append(portee.nouveau_cadre())
+            try:
+                resultat = sequence()
+            finally:
+                if len(contextes) > 1:
+                    fusionner_bloc(contextes.pop(), contextes[0])
+            return resultat
+        return executer_bloc
+
+    def _compiler_declaration_variable(self, decl):
+        interp = self.interpreteur
+        nom = decl.nom
+        valeur = self.compiler(decl.valeur) if decl.valeur else (lambda: None)
+
+        if decl.adresse is None:
+            def declarer_global():
+                interp.contextes[0][nom] = valeur()
+            return declarer_global
+
+        niveau, slot = decl.adresse
+
+        def declarer():
+            interp.contextes[niveau][slot] = valeur()
+        return declarer
+
+    def _compiler_assignation(self, assign):
+        interp = self.interpreteur
+        valeur = self.compiler(assign.valeur)
+        cible = assign.cible
+
+        if isinstance(cible, Identifiant):
+            nom, adresses = cible.nom, cible.adresses
+            ecrire = self._ecrivain_variable(nom, assign.adresse)
+
+            def assigner():
+                v = valeur()
+                if not variable_existe(interp.contextes, adresses, nom):
+                    raise RuntimeError(f"Erreur d'exécution: variable '{nom}' non déclarée avant assignation")
+                ecrire(v)
+            return assigner
+
+        if isinstance(cible, AccesIndex):
+            base, index = self.compiler(cible.base), self.compiler(cible.index)
+
+            def assigner_index():
+                v = valeur()
+                ecrire_index(base(), index(), v)
+            return assigner_index
+
+        if isinstance(cible, AccesDictionnaire):
+            base, cle = self.compiler(cible.base), self.compiler(cible.cle)
+
+            def assigner_cle():
+                v = valeur()
+                ecrire_cle(base(), cle(), v)
+            return assigner_cle
+
+        def cible_invalide():
+            valeur()
+            raise RuntimeError(f"Erreur d'exécution: Cible d'assignation invalide")
+        return cible_invalide
+
+    def _compiler_assignation_composee(self, assign):
+        interp = self.interpreteur
+        valeur = self.compiler(assign.valeur)
+        operateur = assign.operateur
+        operation = OPERATEURS_COMPOSES.get(operateur)
+        cible = assign.cible
+
+        if isinstance(cible, Identifiant):
+            nom, adresses = cible.nom, cible.adresses
+            lire = self._lecteur_variable(nom, adresses)
+            ecrire = self._ecrivain_variable(nom, assign.adresse)
+
+            def assigner():
+                if not variable_existe(interp.contextes, adresses, nom):
+                    raise RuntimeError(f"Erreur d'exécution: variable '{nom}' non déclarée avant assignation composée")
+                actuelle = lire()
+                nouvelle = valeur()
+                if operation is None:
+                    raise RuntimeError(f"Erreur d'exécution: Opérateur d'assignation composée inconnu: {operateur}")
+                ecrire(operation(actuelle, nouvelle))
+            return assigner
+
+        if isinstance(cible, AccesIndex):
+            base, index = self.compiler(cible.base), self.compiler(cible.index)
+
+            def assigner_index():
+                base_list = base()
+                index_value = index()
+                if not isinstance(base_list, list):
+                    raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'assignation composée par index doit être une liste")
+                if not isinstance(index_value, int):
+                    raise RuntimeError("Erreur d'exécution: L'index doit être un entier")
+                if index_value < 0 or index_value >= len(base_list):
+                    raise RuntimeError("Erreur d'exécution: Index de liste hors limites")
+                actuelle = base_list[index_value]
+                nouvelle = valeur()
+                if operation is None:
+                    raise RuntimeError(f"Erreur d'exécution: Opérateur d'assignation composée non supporté pour les listes: {operateur}")
+                base_list[index_value] = operation(actuelle, nouvelle)
+            return assigner_index
+
+        if isinstance(cible, AccesDictionnaire):
+            base, cle = self.compiler(cible.base), self.compiler(cible.cle)
+
+            def assigner_cle():
+                base_dict = base()
+                cle_value = cle()
+                if not isinstance(base_dict, dict):
+                    raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'assignation composée par clé doit être un dictionnaire")
+                if cle_value not in base_dict:
+                    raise RuntimeError(f"Erreur d'exécution: Clé '{cle_value}' non trouvée dans le dictionnaire")
+                actuelle = base_dict[cle_value]
+                nouvelle = valeur()
+                if operation is None:
+                    raise RuntimeError(f"Erreur d'exécution: Opérateur d'assignation composée non supporté pour les dictionnaires: {operateur}")
+                base_dict[cle_value] = operation(actuelle, nouvelle)
+            return assigner_cle
+
+        def cible_invalide():
+            raise RuntimeError(f"Erreur d'exécution: Cible d'assignation composée invalide")
+        return cible_invalide
+
+    def _compiler_condition(self, condition):
+        test = self.compiler(condition.condition)
+        bloc_si = self.compiler(condition.bloc_si)
+        bloc_sinon = self.compiler(condition.bloc_sinon) if condition.bloc_sinon else None
+
+        if bloc_sinon is None:
+            def si():
+                if test():
+                    bloc_si()
+            return si
+
+        def si_sinon():
+            if test():
+                bloc_si()
+            else:
+                bloc_sinon()
+        return si_sinon
+
+    def _compiler_boucle_tant_que(self, boucle):
+        test = self.compiler(boucle.condition)
+        corps = self.compiler(boucle.corps)
+
+        def tant_que():
+            while test():
+                corps()
+        return tant_que
+
+    def _compiler_boucle_pour(self, boucle):
+        init = self.compiler(boucle.init)
+        test = self.compiler(boucle.condition)
+        increment = self.compiler(boucle.increment)
+        corps = self.compiler(boucle.corps)
+
+        def pour():
+            init()
+            while test():
+                corps()
+                increment()
+        return pour
+
+    def _compiler_boucle_pour_dans(self, boucle):
+        interp = self.interpreteur
+        iterable = self.compiler(boucle.iterable)
+        corps = self.compiler(boucle.corps)
+        portee = boucle.portee
+
+        def pour_dans():
+            elements = iterer_pour_dans(iterable())
+            # La variable de boucle occupe le slot 1 du cadre
+            cadre = portee.nouveau_cadre()
+            interp.contextes.append(cadre)
+            try:
+                for element in elements:
+                    cadre[1] = element
+                    corps()
+            finally:
+                if len(interp.contextes) > 1:
+                    interp.contextes.pop()
+        return pour_dans
+
+    def _compiler_fonction(self, fonction):
+        interp = self.interpreteur
+        nom = fonction.nom
+        params, corps, portee = fonction.parametres, fonction.corps, fonction.portee
+        interp.corps_compiles[corps] = self.compiler(corps)
+
+        def definir():
+            interp.fonctions_definies[nom] = {'params': params, 'corps': corps, 'portee': portee}
+        return definir
+
+    def _compiler_retour(self, retour):
+        valeur = self.compiler(retour.valeur) if retour.valeur is not None else (lambda: None)
+
+        def retourner():
+            raise ReturnException(valeur())
+        return retourner
+
+    def _compiler_expression_statement(self, stmt):
+        return self.compiler(stmt.expression)
+
+    # --- Expressions ---
+
+    def _compiler_litteral(self, litteral):
+        valeur = litteral.valeur
+        if isinstance(valeur, (list, dict)):
+            return lambda: copier_litteral(valeur)
+        return lambda: valeur
+
+    def _compiler_liste_litterale(self, liste):
+        elements = [self.compiler(element) for element in liste.elements]
+        return lambda: [element() for element in elements]
+
+    def _compiler_dictionnaire_litteral(self, dictionnaire):
+        cles = [self.compiler(cle) for cle in dictionnaire.cles]
+        valeurs = [self.compiler(valeur) for valeur in dictionnaire.valeurs]
+        return lambda: construire_dictionnaire([cle() for cle in cles], [valeur() for valeur in valeurs])
+
+    def _compiler_identifiant(self, ident):
+        interp = self.interpreteur
+        nom = ident.nom
+
+        fonction = interp.fonctions_integrees.get(nom)
+        if fonction is not None:
+            # Les fonctions intégrées masquent toujours les variables
+            return lambda: fonction
+
+        lire = self._lecteur_variable(nom, ident.adresses)
+        if nom not in self._fonctions_declarees:
+            return lire
+
+        def lire_fonction_ou_variable():
+            definition = interp.fonctions_definies.get(nom)
+            if definition is not None:
+                return definition
+            return lire()
+        return lire_fonction_ou_variable
+
+    def _compiler_expression_binaire(self, expr_bin):
+        gauche = self.compiler(expr_bin.gauche)
+        droite = self.compiler(expr_bin.droite)
+        operateur = expr_bin.operateur
+        operation = OPERATEURS_BINAIRES.get(operateur)
+
+        if operation is None:
+            def operateur_inconnu():
+                gauche()
+                droite()
+                raise RuntimeError(f"Erreur d'exécution: Opérateur binaire inconnu: {operateur}")
+            return operateur_inconnu
+
+        resultat = plier_constantes(operation, expr_bin.gauche, expr_bin.droite)
+        if resultat is not None:
+            valeur_pliee = resultat[0]
+            return lambda: valeur_pliee
+
+        rapide = OPERATIONS_RAPIDES.get(operateur)
+        if rapide is None:
+            return lambda: operation(gauche(), droite())
+
+        # convertir_si_nombre() ne touche que les chaînes : sans chaîne,
+        # l'opérateur Python natif a exactement la même sémantique.
+        droite_constante = constante(expr_bin.droite)
+        if droite_constante is not None and type(droite_constante[0]) is not str:
+            d = droite_constante[0]
+
+            def binaire_constante():
+                g = gauche()
+                if type(g) is str:
+                    return operation(g, d)
+                return rapide(g, d)
+            return binaire_constante
+
+        def binaire():
+            g = gauche()
+            d = droite()
+            if type(g) is str or type(d) is str:
+                return operation(g, d)
+            return rapide(g, d)
+        return binaire
+
+    def _compiler_expression_unaire(self, expr_unaire):
+        operande = self.compiler(expr_unaire.operande)
+        operateur = expr_unaire.operateur
+        operation = OPERATEURS_UNAIRES.get(operateur)
+
+        if operation is None:
+            def operateur_inconnu():
+                operande()
+                raise RuntimeError(f"Erreur d'exécution: Opérateur unaire non supporté: {operateur}")
+            return operateur_inconnu
+
+        resultat = plier_constantes(operation, expr_unaire.operande)
+        if resultat is not None:
+            valeur_pliee = resultat[0]
+            return lambda: valeur_pliee
+
+        return lambda: operation(operande())
+
+    def _compiler_appel_fonction(self, appel):
+        interp = self.interpreteur
+        nom_fonction = nom_de_fonction(appel.nom_fonction)
+        arguments = [self.compiler(arg) for arg in appel.arguments]
+        nb_args = len(arguments)
+
+        fonction = interp.fonctions_integrees.get(nom_fonction)
+        if fonction is not None:
+            def appeler_integree():
+                # Arguments passés sans conversion ni copie
+                return appeler_fonction_integree(nom_fonction, fonction, [arg() for arg in arguments])
+            return appeler_integree
+
+        compiler = self.compiler
+        corps_compiles = interp.corps_compiles
+
+        def appeler_utilisateur():
+            args = [arg() for arg in arguments]
+            func_def = interp.fonctions_definies.get(nom_fonction)
+            if func_def is None:
+                raise RuntimeError(f"Erreur d'exécution: fonction '{nom_fonction}' non définie")
+            params = func_def['params']
+            if nb_args != len(params):
+                raise RuntimeError(f"Erreur d'exécution: la fonction '{nom_fonction}' attend {len(params)} arguments, {nb_args} fournis.")
+            corps = func_def['corps']
+            code = corps_compiles.get(corps)
+            if code is None:
+                # Fonction définie par l'interpréteur d'arbre (REPL)
+                code = corps_compiles[corps] = compiler(corps)
+            ancien_contexte = interp.contextes
+            # Le corps n'écrit que dans son cadre : le global est partagé sans copie
+            interp.contextes = [ancien_contexte[0], func_def['portee'].cadre_appel(args)]
+            try:
+                return code()
+            except ReturnException as e:
+                return e.value
+            finally:
+                interp.contextes = ancien_contexte
+        return appeler_utilisateur
+
+    def _compiler_acces_index(self, acces_index):
+        base = self.compiler(acces_index.base)
+        index = self.compiler(acces_index.index)
+        return lambda: lire_index(base(), index())
+
+    def _compiler_acces_dictionnaire(self, acces_dict):
+        base = self.compiler(acces_dict.base)
+        cle = self.compiler(acces_dict.cle)
+        return lambda: lire_cle(base(), cle())
@@ -22,7 +22,35 @@ class ParseError(FIAError):
 
 class RuntimeError(FIAError):
     """Erreur pendant l'exécution du programme."""
-    pass
+    def __init__(self, message, ligne=None, colonne=None):
+        super().__init__(message)
+        self.ligne = ligne
+        self.colonne = colonne
+
+    def localiser(self, ligne, colonne):
+        """Attache la position du noeud en cause, si aucune n'est encore connue."""
+        if self.ligne is None and ligne is not None:
+            self.ligne = ligne
+            self.colonne = colonne
+        return self
+
+    def __str__(self):
+        if self.ligne is not None:
+            return f"{self.args[0]} (ligne {self.ligne}, colonne {self.colonne})"
+        return str(self.args[0])
+
+class BudgetDepasseError(RuntimeError):
+    """Limite du budget d'exécution atteinte (voir budget.py)."""
+    MESSAGES = {
+        'instructions': "limite de {limite} instructions atteinte",
+        'temps': "limite de {limite} s atteinte",
+        'memoire': "limite de {limite} octets de mémoire atteinte",
+    }
+
+    def __init__(self, ressource, limite, ligne=None, colonne=None):
+        super().__init__(f"Erreur d'exécution: budget dépassé, {self.MESSAGES[ressource].format(limite=limite)}", ligne, colonne)
+        self.ressource = ressource # 'instructions', 'temps' ou 'memoire'
+        self.limite = limite
 
 # Exception spécifique pour gérer le 'retourner'
 class ReturnException(Exception):
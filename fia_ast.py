@@ -4,45 +4,69 @@ from abc import ABC, abstractmethod
 
 class Noeud(ABC):
     """Classe de base abstraite pour tous les noeuds de l'AST."""
+    __slots__ = ('ligne', 'colonne')
+
+    def __init__(self, ligne=None, colonne=None):
+        self.ligne = ligne # Position du token de départ dans le source
+        self.colonne = colonne
+
     @abstractmethod
     def accepter(self, visiteur):
         pass
 
 class Programme(Noeud):
-    def __init__(self, instructions):
+    __slots__ = ('instructions',)
+
+    def __init__(self, instructions, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.instructions = instructions # Liste de Noeuds
 
     def accepter(self, visiteur):
         return visiteur.visiter_programme(self)
 
 class DeclarationVariable(Noeud):
-    def __init__(self, nom, valeur=None):
+    __slots__ = ('nom', 'valeur', 'adresse')
+
+    def __init__(self, nom, valeur=None, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.nom = nom
         self.valeur = valeur # Noeud expression
+        self.adresse = None # (niveau, slot) du cadre écrit, None = contexte global
 
     def accepter(self, visiteur):
         return visiteur.visiter_declaration_variable(self)
 
 class Assignation(Noeud):
-    def __init__(self, cible, valeur):
+    __slots__ = ('cible', 'valeur', 'adresse')
+
+    def __init__(self, cible, valeur, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.cible = cible # Noeud (Variable ou IndexAccess)
         self.valeur = valeur # Noeud expression
+        self.adresse = None # Cible Identifiant : (niveau, slot) écrit, None = contexte global
 
     def accepter(self, visiteur):
         return visiteur.visiter_assignation(self)
 
 # NOUVELLE CLASSE POUR LES ASSIGNATIONS COMPOSÉES
 class AssignationComposee(Noeud):
-    def __init__(self, cible, operateur, valeur):
+    __slots__ = ('cible', 'operateur', 'valeur', 'adresse')
+
+    def __init__(self, cible, operateur, valeur, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.cible = cible # Noeud (Variable ou IndexAccess)
         self.operateur = operateur # str (+=, -=, *=, /=, %=)
         self.valeur = valeur # Noeud expression
+        self.adresse = None # Cible Identifiant : (niveau, slot) écrit, None = contexte global
 
     def accepter(self, visiteur):
         return visiteur.visiter_assignation_composee(self)
 
 class ExpressionBinaire(Noeud):
-    def __init__(self, gauche, operateur, droite):
+    __slots__ = ('gauche', 'operateur', 'droite')
+
+    def __init__(self, gauche, operateur, droite, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.gauche = gauche # Noeud expression
         self.operateur = operateur # str
         self.droite = droite # Noeud expression
@@ -51,7 +75,10 @@ class ExpressionBinaire(Noeud):
         return visiteur.visiter_expression_binaire(self)
 
 class ExpressionUnaire(Noeud):
-    def __init__(self, operateur, operande):
+    __slots__ = ('operateur', 'operande')
+
+    def __init__(self, operateur, operande, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.operateur = operateur
         self.operande = operande
 
@@ -59,21 +86,54 @@ class ExpressionUnaire(Noeud):
         return visiteur.visiter_expression_unaire(self)
 
 class Littéral(Noeud):
-    def __init__(self, valeur):
-        self.valeur = valeur # valeur brute (int, float, str, bool, list, None)
+    __slots__ = ('valeur',)
+
+    def __init__(self, valeur, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
+        self.valeur = valeur # valeur brute (int, float, str, bool, None, liste/dictionnaire de constantes)
 
     def accepter(self, visiteur):
         return visiteur.visiter_litteral(self)
 
+class ListeLitterale(Noeud):
+    """Liste [a, b, ...] dont un élément au moins n'est pas un littéral : construite à chaque évaluation."""
+    __slots__ = ('elements',)
+
+    def __init__(self, elements, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
+        self.elements = elements # Liste de Noeuds expression
+
+    def accepter(self, visiteur):
+        return visiteur.visiter_liste_litterale(self)
+
+class DictionnaireLitteral(Noeud):
+    """Dictionnaire {cle: valeur, ...} non constant : clés et valeurs évaluées à chaque évaluation."""
+    __slots__ = ('cles', 'valeurs')
+
+    def __init__(self, cles, valeurs, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
+        self.cles = cles # Liste de Noeuds expression
+        self.valeurs = valeurs # Liste de Noeuds expression, dans l'ordre des clés
+
+    def accepter(self, visiteur):
+        return visiteur.visiter_dictionnaire_litteral(self)
+
 class Identifiant(Noeud):
-    def __init__(self, nom):
+    __slots__ = ('nom', 'adresses')
+
+    def __init__(self, nom, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.nom = nom
+        self.adresses = None # (niveau, slot) candidats avant le global ; None = recherche par nom
 
     def accepter(self, visiteur):
         return visiteur.visiter_identifiant(self)
 
 class AppelFonction(Noeud):
-    def __init__(self, nom_fonction, arguments):
+    __slots__ = ('nom_fonction', 'arguments')
+
+    def __init__(self, nom_fonction, arguments, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.nom_fonction = nom_fonction # str
         self.arguments = arguments # Liste de Noeuds expressions
 
@@ -81,7 +141,10 @@ class AppelFonction(Noeud):
         return visiteur.visiter_appel_fonction(self)
 
 class Condition(Noeud):
-    def __init__(self, condition, bloc_si, bloc_sinon=None):
+    __slots__ = ('condition', 'bloc_si', 'bloc_sinon')
+
+    def __init__(self, condition, bloc_si, bloc_sinon=None, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.condition = condition # Noeud expression
         self.bloc_si = bloc_si # Liste de Noeuds
         self.bloc_sinon = bloc_sinon # Liste de Noeuds optionnel
@@ -90,7 +153,10 @@ class Condition(Noeud):
         return visiteur.visiter_condition(self)
 
 class BoucleTantQue(Noeud):
-    def __init__(self, condition, corps):
+    __slots__ = ('condition', 'corps')
+
+    def __init__(self, condition, corps, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.condition = condition # Noeud expression
         self.corps = corps # Liste de Noeuds
 
@@ -98,7 +164,10 @@ class BoucleTantQue(Noeud):
         return visiteur.visiter_boucle_tant_que(self)
 
 class BouclePour(Noeud):
-    def __init__(self, init, condition, increment, corps):
+    __slots__ = ('init', 'condition', 'increment', 'corps')
+
+    def __init__(self, init, condition, increment, corps, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.init = init # Noeud instruction
         self.condition = condition # Noeud expression
         self.increment = increment # Noeud instruction
@@ -109,39 +178,57 @@ class BouclePour(Noeud):
 
 # NOUVELLE CLASSE POUR LA BOUCLE POUR...DANS
 class BouclePourDans(Noeud):
-    def __init__(self, variable, iterable, corps):
+    __slots__ = ('variable', 'iterable', 'corps', 'portee')
+
+    def __init__(self, variable, iterable, corps, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.variable = variable # str (nom de la variable de boucle)
         self.iterable = iterable # Noeud expression (liste, dictionnaire, chaîne)
         self.corps = corps # Bloc
+        self.portee = None # Portee du cadre de boucle (resolveur.py)
 
     def accepter(self, visiteur):
         return visiteur.visiter_boucle_pour_dans(self)
 
 class Bloc(Noeud):
-    def __init__(self, instructions):
+    __slots__ = ('instructions', 'portee')
+
+    def __init__(self, instructions, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.instructions = instructions # Liste de Noeuds
+        self.portee = None # Portee du cadre temporaire d'un bloc de niveau global
 
     def accepter(self, visiteur):
         return visiteur.visiter_bloc(self)
 
 class Fonction(Noeud):
-    def __init__(self, nom, parametres, corps):
+    __slots__ = ('nom', 'parametres', 'corps', 'portee')
+
+    def __init__(self, nom, parametres, corps, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.nom = nom # str
         self.parametres = parametres # Liste de str (noms des paramètres)
         self.corps = corps # Liste de Noeuds
+        self.portee = None # Portee du cadre d'appel
 
     def accepter(self, visiteur):
         return visiteur.visiter_fonction(self)
 
 class Retour(Noeud):
-    def __init__(self, valeur=None):
+    __slots__ = ('valeur',)
+
+    def __init__(self, valeur=None, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.valeur = valeur # Noeud expression optionnel
 
     def accepter(self, visiteur):
         return visiteur.visiter_retour(self)
 
 class AccesIndex(Noeud):
-    def __init__(self, base, index):
+    __slots__ = ('base', 'index')
+
+    def __init__(self, base, index, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.base = base # Noeud expression (la liste)
         self.index = index # Noeud expression (l'index)
 
@@ -149,7 +236,10 @@ class AccesIndex(Noeud):
         return visiteur.visiter_acces_index(self)
 
 class AccesDictionnaire(Noeud):
-    def __init__(self, base, cle):
+    __slots__ = ('base', 'cle')
+
+    def __init__(self, base, cle, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.base = base # Noeud expression (le dictionnaire)
         self.cle = cle # Noeud expression (la clé)
 
@@ -157,7 +247,10 @@ class AccesDictionnaire(Noeud):
         return visiteur.visiter_acces_dictionnaire(self)
 
 class ExpressionStatement(Noeud):
-    def __init__(self, expression):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression, ligne=None, colonne=None):
+        super().__init__(ligne, colonne)
         self.expression = expression
 
     def accepter(self, visiteur):
@@ -1,55 +1,53 @@
 # ia_module.py
 from errors import RuntimeError
+from sortie import imprimer
 import random
-import math
+import reseau
 
-def reseau_neuronal(couches, activation="relu"):
+def reseau_neuronal(couches, activation="relu", type_poids="float64"):
     """
     Crée un réseau de neurones simple.
     Args:
         couches: Liste des nombres de neurones par couche [entrée, cachée, sortie]
         activation: Type d'activation ('relu', 'sigmoid', 'tanh')
+        type_poids: 'float64' ou 'float32' (deux fois moins de mémoire)
+    Returns:
+        Modèle opaque (voir infos_modele, poids_modele, biais_modele)
     """
     if not isinstance(couches, list) or len(couches) < 2:
         raise RuntimeError("Le paramètre 'couches' doit être une liste d'au moins 2 éléments")
+    if not all(isinstance(n, int) and not isinstance(n, bool) and n > 0 for n in couches):
+        raise RuntimeError("Chaque couche doit compter un nombre entier de neurones supérieur à 0")
     
     activations_supportees = ['relu', 'sigmoid', 'tanh']
     if activation not in activations_supportees:
         raise RuntimeError(f"Activation '{activation}' non supportée. Utilisez: {activations_supportees}")
+    if type_poids not in reseau.TYPES_POIDS:
+        raise RuntimeError(f"Type de poids '{type_poids}' non supporté. Utilisez: {list(reseau.TYPES_POIDS)}")
     
     # Génération des poids aléatoires
-    poids = []
-    for i in range(len(couches) - 1):
-        poids_couche = []
-        for j in range(couches[i]):
-            neurone_poids = [random.uniform(-1, 1) for _ in range(couches[i + 1])]
-            poids_couche.append(neurone_poids)
-        poids.append(poids_couche)
-    
-    reseau = {
-        "type": "reseau_neuronal",
-        "architecture": couches,
-        "activation": activation,
-        "poids": poids,
-        "entraine": False,
-        "precision": 0.0
-    }
+    modele = reseau.ModeleReseau.creer(reseau.importer_numpy(), couches, activation, type_poids)
     
-    print(f"✅ Réseau créé - Architecture: {couches}, Activation: {activation}")
-    return reseau
+    imprimer(f"✅ Réseau créé - Architecture: {couches}, Activation: {activation}")
+    return modele
 
-def apprentissage(modele, donnees_entrees, donnees_sorties, epoques=100, taux_apprentissage=0.01):
+def _verifier_modele(modele):
+    if not isinstance(modele, reseau.ModeleReseau):
+        raise RuntimeError("Le modèle doit être créé avec 'reseau_neuronal()'")
+
+def apprentissage(modele, donnees_entrees, donnees_sorties, epoques=100, taux_apprentissage=0.01, taille_lot=32):
     """
-    Entraîne un modèle sur des données.
+    Entraîne un modèle sur des données (rétropropagation par mini-lots, voir reseau.py).
     Args:
-        modele: Réseau de neurones créé avec reseau_neuronal()
+        modele: Réseau de neurones créé avec reseau_neuronal(), modifié en place
         donnees_entrees: Liste des exemples d'entrée
-        donnees_sorties: Liste des résultats attendus
+        donnees_sorties: Liste des résultats attendus (0/1 pour un neurone de
+            sortie, indice de classe pour plusieurs)
         epoques: Nombre d'itérations d'entraînement
         taux_apprentissage: Vitesse d'apprentissage
+        taille_lot: Nombre d'exemples par mise à jour des poids
     """
-    if not isinstance(modele, dict) or modele.get("type") != "reseau_neuronal":
-        raise RuntimeError("Le modèle doit être créé avec 'reseau_neuronal()'")
+    _verifier_modele(modele)
     
     if not isinstance(donnees_entrees, list) or not isinstance(donnees_sorties, list):
         raise RuntimeError("Les données d'entrée et de sortie doivent être des listes")
@@ -57,52 +55,81 @@ def apprentissage(modele, donnees_entrees, donnees_sorties, epoques=100, taux_ap
     if len(donnees_entrees) != len(donnees_sorties):
         raise RuntimeError("Le nombre d'exemples d'entrée et de sortie doit être identique")
     
-    print(f"📊 Début de l'entraînement sur {len(donnees_entrees)} exemples")
-    print(f"⏱️ {epoques} époques à un taux de {taux_apprentissage}")
+    if not isinstance(epoques, int) or epoques < 0:
+        raise RuntimeError("Le nombre d'époques doit être un entier positif")
+    if not isinstance(taille_lot, int) or taille_lot < 1:
+        raise RuntimeError("La taille de lot doit être un entier supérieur à 0")
     
-    # Simulation d'entraînement
-    erreur_initiale = 1.0
-    for epoque in range(epoques):
-        # Calcul de l'erreur simulée (décroîlt avec les époques)
-        erreur = erreur_initiale * math.exp(-epoque / (epoques / 4))
-        
-        # Affichage du progrès tous les 20%
-        if epoque % max(1, epoques // 5) == 0:
-            print(f"Époque {epoque + 1}/{epoques} - Erreur: {erreur:.4f}")
+    np = reseau.importer_numpy()
+    couches = modele.architecture
+    x = reseau.entrees(np, donnees_entrees, couches[0], modele.type_poids)
+    y = reseau.cibles(np, donnees_sorties, couches[-1], modele.type_poids)
+    
+    imprimer(f"📊 Début de l'entraînement sur {len(donnees_entrees)} exemples")
+    imprimer(f"⏱️ {epoques} époques à un taux de {taux_apprentissage}, lots de {taille_lot}")
+    
+    def journal(epoque, erreur):
+        imprimer(f"Époque {epoque + 1}/{epoques} - Erreur: {erreur:.4f}")
+    
+    # Affichage du progrès tous les 20%
+    reseau.entrainer(np, modele.poids, modele.biais, modele.activation, x, y, epoques, taux_apprentissage,
+                     taille_lot, journal, max(1, epoques // 5))
     
-    # Calcul d'une précision simulée
-    precision_finale = min(0.95, 0.5 + (epoques / 200))
-    modele["entraine"] = True
-    modele["precision"] = precision_finale
+    probabilites = reseau.passe_avant(np, modele.poids, modele.biais, modele.activation, x)[-1]
+    precision_finale = float(np.mean(reseau.classes(np, probabilites) == reseau.classes(np, y)))
+    modele.entraine = True
+    modele.precision = precision_finale
+    modele.erreur = reseau.perte(np, probabilites, y)
     
-    print(f"✅ Entraînement terminé - Précision: {precision_finale:.2%}")
+    imprimer(f"✅ Entraînement terminé - Précision: {precision_finale:.2%}")
     return modele
 
 def prediction(modele, donnees_test):
     """
-    Effectue des prédictions avec un modèle entraîné.
+    Effectue des prédictions avec un modèle entraîné, sur tous les exemples à la fois.
     Args:
         modele: Modèle entraîné
         donnees_test: Données à prédire
+    Returns:
+        Classe prédite pour chaque exemple (0/1 pour un neurone de sortie)
     """
-    if not isinstance(modele, dict) or not modele.get("entraine", False):
+    _verifier_modele(modele)
+    if not modele.entraine:
         raise RuntimeError("Le modèle doit être entraîné avant la prédiction")
     
     if not isinstance(donnees_test, list):
         raise RuntimeError("Les données de test doivent être une liste")
     
-    # Génération de prédictions simulées
-    predictions = []
-    for i, exemple in enumerate(donnees_test):
-        # Prédiction aléatoire pondérée par la précision du modèle
-        base = sum(exemple) if isinstance(exemple, list) else exemple
-        bruit = random.uniform(-0.1, 0.1) * (1 - modele["precision"])
-        pred = abs(base + bruit) % 2  # Simulation d'une classification binaire
-        predictions.append(round(pred))
+    np = reseau.importer_numpy()
+    x = reseau.entrees(np, donnees_test, modele.architecture[0], modele.type_poids)
+    probabilites = reseau.passe_avant(np, modele.poids, modele.biais, modele.activation, x)[-1]
+    predictions = reseau.classes(np, probabilites).tolist()
     
-    print(f"🎯 Prédictions générées pour {len(donnees_test)} exemples")
+    imprimer(f"🎯 Prédictions générées pour {len(donnees_test)} exemples")
     return predictions
 
+def infos_modele(modele):
+    """
+    Décrit un modèle : architecture, activation, type_poids, parametres,
+    octets (mémoire des poids), entraine, precision, erreur.
+    """
+    _verifier_modele(modele)
+    return modele.infos()
+
+def poids_modele(modele, couche):
+    """
+    Copie des poids d'une couche, une ligne par neurone d'entrée.
+    Args:
+        couche: 1 pour les poids entre les entrées et la première couche cachée
+    """
+    _verifier_modele(modele)
+    return modele.poids[modele.couche(couche)].tolist()
+
+def biais_modele(modele, couche):
+    """Copie des biais d'une couche (numérotée comme pour poids_modele)."""
+    _verifier_modele(modele)
+    return modele.biais[modele.couche(couche)].tolist()
+
 def charger_jeu_de_donnees(chemin):
     """
     Charge et prépare un jeu de données depuis un fichier.
@@ -143,9 +170,9 @@ def charger_jeu_de_donnees(chemin):
                 "donnees_sorties": [random.randint(0, 1) for _ in range(5)]
             }
         
-        print(f"📁 Jeu de données chargé: {donnees['nom']}")
-        print(f"📊 {donnees['exemples']} exemples, {len(donnees['caracteristiques'])} caractéristiques")
-        print(f"🏷️ Classes: {donnees['classes']}")
+        imprimer(f"📁 Jeu de données chargé: {donnees['nom']}")
+        imprimer(f"📊 {donnees['exemples']} exemples, {len(donnees['caracteristiques'])} caractéristiques")
+        imprimer(f"🏷️ Classes: {donnees['classes']}")
         
         return donnees
         
@@ -177,10 +204,10 @@ def evaluer_modele(modele, donnees_test, vraies_sorties):
         "erreur": 1 - precision
     }
     
-    print(f"📊 Résultats de l'évaluation:")
-    print(f"✅ Précision: {precision:.2%}")
-    print(f"🎯 {corrects}/{len(vraies_sorties)} prédictions correctes")
-    print(f"❌ Taux d'erreur: {(1-precision):.2%}")
+    imprimer(f"📊 Résultats de l'évaluation:")
+    imprimer(f"✅ Précision: {precision:.2%}")
+    imprimer(f"🎯 {corrects}/{len(vraies_sorties)} prédictions correctes")
+    imprimer(f"❌ Taux d'erreur: {(1-precision):.2%}")
     
     return resultats
 
@@ -191,4 +218,7 @@ FONCTIONS_IA = {
     'prediction': prediction,
     'charger_jeu_de_donnees': charger_jeu_de_donnees,
     'evaluer_modele': evaluer_modele,
+    'infos_modele': infos_modele,
+    'poids_modele': poids_modele,
+    'biais_modele': biais_modele,
 }
\ No newline at end of file
@@ -0,0 +1,129 @@
+# limiteur.py
+# Limitation de débit côté client des appels aux plateformes IA.
+#
+# Chaque couple (plateforme, modèle) a un seau de requêtes et un seau de jetons
+# par minute, partagés par tous les interpréteurs du processus : un script qui
+# boucle sur appeler_ia attend son tour au lieu de recevoir des 429. Les
+# erreurs 429 et 5xx restantes sont réessayées avec un délai exponentiel
+# aléatoire, ou celui indiqué par l'en-tête Retry-After.
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Statuts HTTP réessayés : limite de débit dépassée, erreurs temporaires du fournisseur
+STATUTS_REESSAYABLES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+class ReessaiNecessaire(Exception):
+    """Échec temporaire d'un appel : `statut` HTTP (None = erreur réseau), `attente` demandée."""
+
+    def __init__(self, message, statut=None, attente=None):
+        super().__init__(message)
+        self.statut = statut
+        self.attente = attente
+
+def lire_retry_after(valeur):
+    """Délai en secondes d'un en-tête Retry-After (secondes ou date HTTP), ou None."""
+    if not valeur:
+        return None
+    try:
+        return max(0.0, float(valeur))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valeur).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def attente_reessai(tentative, attente=None, base=1.0, maximum=60.0):
+    """Délai avant la tentative suivante : Retry-After s'il est donné, sinon exponentiel
+    avec gigue complète (entre 0 et base × 2^tentative, plafonné à `maximum`)."""
+    if attente is not None:
+        return min(attente, maximum)
+    return random.uniform(0, min(maximum, base * 2 ** tentative))
+
+def estimer_jetons(message, max_tokens):
+    """Jetons décomptés par le fournisseur pour un appel : ~4 caractères par jeton
+    en entrée, plus la réponse maximale demandée."""
+    return len(message) // 4 + (max_tokens or 0)
+
+class SeauJetons:
+    """Seau de `par_minute` jetons, rechargé en continu."""
+
+    def __init__(self, par_minute):
+        self.capacite = par_minute
+        self.debit = par_minute / 60
+        self.niveau = par_minute
+        self.dernier = time.monotonic()
+
+    def reserver(self, nombre, maintenant):
+        """Prélève `nombre` jetons (le niveau peut devenir négatif) ; retourne l'attente nécessaire."""
+        self.niveau = min(self.capacite, self.niveau + (maintenant - self.dernier) * self.debit)
+        self.dernier = maintenant
+        # Un appel plus gros que le seau attend qu'il soit plein, pas indéfiniment
+        self.niveau -= min(nombre, self.capacite)
+        return 0.0 if self.niveau >= 0 else -self.niveau / self.debit
+
+class LimiteurDebit:
+    """Requêtes et jetons par minute d'un couple (plateforme, modèle) ; None = illimité.
+
+    `reserver` retourne le délai à attendre avant d'envoyer la requête : l'attente
+    se fait hors du verrou, par time.sleep ou asyncio.sleep selon l'appelant.
+    """
+
+    def __init__(self, requetes_minute=None, jetons_minute=None):
+        self.requetes = SeauJetons(requetes_minute) if requetes_minute else None
+        self.jetons = SeauJetons(jetons_minute) if jetons_minute else None
+        self._reprise = 0.0 # Pas d'envoi avant cet instant (après un 429)
+        self._verrou = threading.Lock()
+        self.appels = 0
+        self.attente_totale = 0.0
+        self.reessais = 0
+
+    def reserver(self, jetons):
+        maintenant = time.monotonic()
+        with self._verrou:
+            attente = max(0.0, self._reprise - maintenant)
+            if self.requetes is not None:
+                attente = max(attente, self.requetes.reserver(1, maintenant))
+            if self.jetons is not None:
+                attente = max(attente, self.jetons.reserver(jetons, maintenant))
+            self.appels += 1
+            self.attente_totale += attente
+            return attente
+
+    def suspendre(self, attente):
+        """Après un 429 : plus aucun envoi de ce limiteur pendant `attente` secondes."""
+        with self._verrou:
+            self._reprise = max(self._reprise, time.monotonic() + attente)
+
+    def compter_reessai(self):
+        with self._verrou:
+            self.reessais += 1
+
+    def stats(self):
+        with self._verrou:
+            return {
+                'requetes_minute': self.requetes.capacite if self.requetes else None,
+                'jetons_minute': self.jetons.capacite if self.jetons else None,
+                'appels': self.appels,
+                'attente_totale': round(self.attente_totale, 3),
+                'reessais': self.reessais,
+            }
+
+_limiteurs = {}
+_verrou_limiteurs = threading.Lock()
+
+def obtenir_limiteur(plateforme, modele, requetes_minute=None, jetons_minute=None):
+    """Limiteur du processus pour (plateforme, modèle), créé au premier appel."""
+    cle = (plateforme, modele)
+    with _verrou_limiteurs:
+        limiteur = _limiteurs.get(cle)
+        if limiteur is None:
+            limiteur = _limiteurs[cle] = LimiteurDebit(requetes_minute, jetons_minute)
+        return limiteur
+
+def stats_limiteurs():
+    with _verrou_limiteurs:
+        limiteurs = dict(_limiteurs)
+    return {f"{plateforme}/{modele}": limiteur.stats() for (plateforme, modele), limiteur in limiteurs.items()}
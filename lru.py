@@ -0,0 +1,114 @@
+# lru.py
+# Cache LRU borné en nombre d'entrées et en mémoire estimée.
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+def taille_approximative(objet):
+    """Estime la mémoire occupée par un objet et tout ce qu'il référence (en octets)."""
+    vus = set()
+    a_visiter = [objet]
+    total = 0
+    while a_visiter:
+        courant = a_visiter.pop()
+        if id(courant) in vus:
+            continue
+        vus.add(id(courant))
+        total += sys.getsizeof(courant)
+        if isinstance(courant, dict):
+            a_visiter.extend(courant.keys())
+            a_visiter.extend(courant.values())
+        elif isinstance(courant, (list, tuple, set, frozenset)):
+            a_visiter.extend(courant)
+        else:
+            if hasattr(courant, '__dict__'):
+                a_visiter.append(courant.__dict__)
+            # Objets à __slots__ (noeuds AST, tokens) : suivre chaque attribut renseigné
+            for classe in type(courant).__mro__:
+                for attribut in getattr(classe, '__slots__', ()):
+                    if hasattr(courant, attribut):
+                        a_visiter.append(getattr(courant, attribut))
+    return total
+
+class CacheLRU:
+    """Cache clé -> valeur avec éviction de l'entrée la moins récemment utilisée.
+
+    `taille_max` borne le nombre d'entrées, `memoire_max` la somme des tailles
+    estimées par `mesurer` (0 = pas de limite). `ttl` est la durée de vie d'une
+    entrée en secondes (None = pas d'expiration). Utilisable depuis plusieurs threads.
+    """
+
+    def __init__(self, taille_max=256, memoire_max=0, mesurer=taille_approximative, ttl=None):
+        self.taille_max = taille_max
+        self.memoire_max = memoire_max
+        self.mesurer = mesurer
+        self.ttl = ttl
+        self._entrees = OrderedDict() # cle -> (valeur, taille, expiration)
+        self._memoire = 0
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def obtenir(self, cle, defaut=None):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[2] is not None and time.monotonic() >= entree[2]:
+                del self._entrees[cle]
+                self._memoire -= entree[1]
+                self.expirations += 1
+                entree = None
+            if entree is None:
+                self.echecs += 1
+                return defaut
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[0]
+
+    def ajouter(self, cle, valeur, ttl=None):
+        """Ajoute une entrée ; `ttl` remplace la durée de vie par défaut du cache."""
+        taille = self.mesurer(valeur) if self.memoire_max else 0
+        if self.memoire_max and taille > self.memoire_max:
+            # Entrée trop grosse pour le cache : ne pas vider tout le reste pour elle
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expiration = None if ttl is None else time.monotonic() + ttl
+        with self._verrou:
+            ancienne = self._entrees.pop(cle, None)
+            if ancienne is not None:
+                self._memoire -= ancienne[1]
+            self._entrees[cle] = (valeur, taille, expiration)
+            self._memoire += taille
+            while self._entrees and (len(self._entrees) > self.taille_max
+                                     or (self.memoire_max and self._memoire > self.memoire_max)):
+                _, (_, taille_evincee, _) = self._entrees.popitem(last=False)
+                self._memoire -= taille_evincee
+                self.evictions += 1
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self._memoire = 0
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, cle):
+        return cle in self._entrees
+
+    def stats(self):
+        with self._verrou:
+            total = self.succes + self.echecs
+            return {
+                'entrees': len(self._entrees),
+                'taille_max': self.taille_max,
+                'memoire': self._memoire,
+                'memoire_max': self.memoire_max,
+                'succes': self.succes,
+                'echecs': self.echecs,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'taux_succes': self.succes / total if total else 0.0,
+            }
@@ -1,13 +1,39 @@
 # main.py
+import builtins
 import sys
+import time
+
+_debut = time.perf_counter()
+# --profil-demarrage : durée du premier import de chaque module (cumulée avec ses
+# propres imports, comme python -X importtime), mesurée dès les imports ci-dessous
+_imports = {}
+if '--profil-demarrage' in sys.argv:
+    _import_original = builtins.__import__
+
+    def _import_chronometre(nom, globals=None, locals=None, fromlist=(), level=0):
+        if level or nom in sys.modules:
+            return _import_original(nom, globals, locals, fromlist, level)
+        debut = time.perf_counter()
+        try:
+            return _import_original(nom, globals, locals, fromlist, level)
+        finally:
+            _imports.setdefault(nom, time.perf_counter() - debut)
+
+    builtins.__import__ = _import_chronometre
+
 import os
-from lexer import LexerFIA
-from parser import ParserFIA
-from interpreter import VisiteurInterpretation
+import argparse
+import builtin
+from cache_fia import analyser_source
+from interpreter import VisiteurInterpretation, MOTEURS
+from budget import BudgetExecution, RESSOURCES, convertir_limite, limites_environnement
 from repl import REPL
 from errors import FIAError
 
-def executer_fichier(nom_fichier):
+_fin_imports = time.perf_counter()
+
+def executer_fichier(nom_fichier, moteur='arbre', budget=None, etapes=None):
+    """Exécute un script ; `etapes` (liste) reçoit la durée de chaque étape."""
     if not os.path.exists(nom_fichier):
         print(f"Erreur: Le fichier '{nom_fichier}' n'existe pas.")
         return
@@ -15,26 +41,81 @@ def executer_fichier(nom_fichier):
     with open(nom_fichier, 'r', encoding='utf-8') as f:
         code_source = f.read()
 
+    etapes = [] if etapes is None else etapes
+    debut = time.perf_counter()
     try:
-        lexer = LexerFIA(code_source)
-        tokens = lexer.tokeniser()
-        parser = ParserFIA(tokens)
-        ast = parser.analyser()
-        interpreter = VisiteurInterpretation()
-        interpreter.executer(ast)
+        # Lexer + parser, ou AST relu depuis __fiacache__/ si le script n'a pas changé
+        ast = analyser_source(code_source, nom_fichier)
+        etapes.append(('analyse', time.perf_counter() - debut))
+        debut = time.perf_counter()
+        interpreter = VisiteurInterpretation(budget)
+        etapes.append(('interpréteur', time.perf_counter() - debut))
+        debut = time.perf_counter()
+        try:
+            interpreter.executer_programme(ast, moteur)
+        finally:
+            etapes.append(('exécution', time.perf_counter() - debut))
     except FIAError as e:
         print(e)
     except Exception as e:
         print(f"Erreur inattendue lors de l'exécution de '{nom_fichier}': {e}")
 
+def analyser_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Interpréteur du langage F-IA")
+    parser.add_argument('fichier', nargs='?', help="script .fia à exécuter (REPL si absent)")
+    parser.add_argument('--moteur', choices=MOTEURS, default=os.environ.get('FIA_MOTEUR', 'arbre'),
+                        help="moteur d'exécution (défaut: arbre, ou $FIA_MOTEUR)")
+    # Budget d'exécution (défaut: illimité, ou $FIA_BUDGET_INSTRUCTIONS/_TEMPS/_MEMOIRE)
+    parser.add_argument('--max-instructions', metavar='N',
+                        help="nombre maximal d'instructions exécutées")
+    parser.add_argument('--max-temps', metavar='SECONDES',
+                        help="durée maximale d'exécution")
+    parser.add_argument('--max-memoire', metavar='OCTETS',
+                        help="croissance mémoire maximale (suffixes K, M, G acceptés)")
+    parser.add_argument('--profil-demarrage', action='store_true',
+                        help="afficher sur stderr la durée des imports et de chaque étape")
+    return parser.parse_args(argv)
+
+def budget_arguments(arguments):
+    """Budget d'exécution : options de la ligne de commande, sinon variables FIA_BUDGET_*."""
+    limites = limites_environnement()
+    for ressource in RESSOURCES:
+        valeur = getattr(arguments, 'max_' + ressource)
+        if valeur is not None:
+            limites[ressource] = convertir_limite(ressource, valeur)
+    return BudgetExecution(**limites)
+
+def afficher_profil(etapes, nb_modules=15):
+    """Durées du démarrage sur stderr : imports, étapes de l'exécution, modules les plus lents."""
+    def ms(duree):
+        return f"{duree * 1000:8.1f} ms"
+
+    print("Profil de démarrage :", file=sys.stderr)
+    print(f"  {'imports':<16}{ms(_fin_imports - _debut)}", file=sys.stderr)
+    for nom, duree in etapes:
+        print(f"  {nom:<16}{ms(duree)}", file=sys.stderr)
+    print(f"  {'total':<16}{ms(time.perf_counter() - _debut)}", file=sys.stderr)
+    print(f"  module IA chargé : {'non' if builtin._ai_functions is None else 'oui'}", file=sys.stderr)
+    print("Imports les plus lents (durée cumulée) :", file=sys.stderr)
+    for nom, duree in sorted(_imports.items(), key=lambda element: -element[1])[:nb_modules]:
+        print(f"  {nom:<24}{ms(duree)}", file=sys.stderr)
+
 def main():
-    if len(sys.argv) > 1:
-        nom_fichier = sys.argv[1]
-        executer_fichier(nom_fichier)
+    arguments = analyser_arguments()
+    try:
+        budget = budget_arguments(arguments)
+    except ValueError as e:
+        print(f"Erreur: {e}")
+        sys.exit(2)
+    if arguments.fichier:
+        etapes = []
+        executer_fichier(arguments.fichier, arguments.moteur, budget, etapes)
+        if arguments.profil_demarrage:
+            afficher_profil(etapes)
     else:
         # Lancer le REPL si aucun fichier n'est fourni
-        repl = REPL()
+        repl = REPL(budget)
         repl.boucle()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,247 @@
+# operations.py
+# Sémantique des opérateurs F-IA, partagée par tous les moteurs d'exécution.
+import operator
+from collections.abc import Iterator
+from errors import RuntimeError
+from fia_ast import Littéral
+from builtin import _ArretProgramme
+
+def convertir_si_nombre(valeur):
+    """Convertit une valeur en nombre si possible"""
+    if isinstance(valeur, str):
+        if valeur.replace('.', '').replace('-', '').isdigit():
+            return float(valeur) if '.' in valeur else int(valeur)
+    return valeur
+
+# ========== OPÉRATEURS BINAIRES ==========
+
+def _plus(gauche, droite):
+    # Si l'un des opérandes est une chaîne, convertir l'autre en chaîne
+    if isinstance(gauche, str) or isinstance(droite, str):
+        return str(gauche) + str(droite)
+    return gauche + droite
+
+def _moins(gauche, droite):
+    return convertir_si_nombre(gauche) - convertir_si_nombre(droite)
+
+def _fois(gauche, droite):
+    return convertir_si_nombre(gauche) * convertir_si_nombre(droite)
+
+def _diviser(gauche, droite):
+    droite = convertir_si_nombre(droite)
+    if droite == 0:
+        raise RuntimeError("Erreur d'exécution: Division par zéro")
+    return convertir_si_nombre(gauche) / droite
+
+def _modulo(gauche, droite):
+    return convertir_si_nombre(gauche) % convertir_si_nombre(droite)
+
+def _egal(gauche, droite):
+    return convertir_si_nombre(gauche) == convertir_si_nombre(droite)
+
+def _different(gauche, droite):
+    return convertir_si_nombre(gauche) != convertir_si_nombre(droite)
+
+def _inferieur(gauche, droite):
+    return convertir_si_nombre(gauche) < convertir_si_nombre(droite)
+
+def _inferieur_egal(gauche, droite):
+    return convertir_si_nombre(gauche) <= convertir_si_nombre(droite)
+
+def _superieur(gauche, droite):
+    return convertir_si_nombre(gauche) > convertir_si_nombre(droite)
+
+def _superieur_egal(gauche, droite):
+    return convertir_si_nombre(gauche) >= convertir_si_nombre(droite)
+
+def _et(gauche, droite):
+    return convertir_si_nombre(gauche) and convertir_si_nombre(droite)
+
+def _ou(gauche, droite):
+    return convertir_si_nombre(gauche) or convertir_si_nombre(droite)
+
+OPERATEURS_BINAIRES = {
+    '+': _plus,
+    '-': _moins,
+    '*': _fois,
+    '/': _diviser,
+    '%': _modulo,
+    '==': _egal,
+    '!=': _different,
+    '<': _inferieur,
+    '<=': _inferieur_egal,
+    '>': _superieur,
+    '>=': _superieur_egal,
+    'et': _et,
+    'ou': _ou,
+}
+
+# Opérateurs équivalents à leur version Python quand aucun opérande n'est une
+# chaîne : convertir_si_nombre() ne touche que les chaînes.
+OPERATIONS_RAPIDES = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# ========== OPÉRATEURS UNAIRES ==========
+
+def _negation(valeur):
+    return -convertir_si_nombre(valeur)
+
+def _identite(valeur):
+    return convertir_si_nombre(valeur)
+
+OPERATEURS_UNAIRES = {
+    '-': _negation,
+    '+': _identite,
+}
+
+# ========== ASSIGNATIONS COMPOSÉES ==========
+
+def _diviser_compose(gauche, droite):
+    droite = convertir_si_nombre(droite)
+    if droite == 0:
+        raise RuntimeError("Erreur d'exécution: Division par zéro dans assignation composée")
+    return convertir_si_nombre(gauche) / droite
+
+OPERATEURS_COMPOSES = {
+    '+=': _plus,
+    '-=': _moins,
+    '*=': _fois,
+    '/=': _diviser_compose,
+    '%=': _modulo,
+}
+
+# ========== PRÉ-CALCUL DES CONSTANTES ==========
+
+# Types dont les littéraux peuvent être pré-calculés sans risque de partage
+_TYPES_CONSTANTS = (int, float, str, bool, type(None))
+
+def constante(noeud):
+    """Retourne (valeur,) si le noeud est un littéral simple, sinon None."""
+    if isinstance(noeud, Littéral) and isinstance(noeud.valeur, _TYPES_CONSTANTS):
+        return (noeud.valeur,)
+    return None
+
+def plier_constantes(operation, *operandes):
+    """Pré-calcule une opération dont tous les opérandes sont des littéraux simples.
+
+    Retourne (resultat,) ou None si un opérande n'est pas constant ou si
+    l'opération échoue (l'erreur sera alors levée à l'exécution).
+    """
+    valeurs = []
+    for operande in operandes:
+        valeur = constante(operande)
+        if valeur is None:
+            return None
+        valeurs.append(valeur[0])
+    try:
+        return (operation(*valeurs),)
+    except Exception:
+        return None
+
+# ========== LITTÉRAUX ==========
+
+def copier_litteral(valeur):
+    """Copie les conteneurs d'un littéral liste/dictionnaire de constantes.
+
+    Les listes et dictionnaires littéraux appartiennent à l'AST : sans copie,
+    une assignation par index modifierait le programme lui-même (et donc les
+    exécutions suivantes d'un AST mis en cache).
+    """
+    if isinstance(valeur, list):
+        return [copier_litteral(element) for element in valeur]
+    elif isinstance(valeur, dict):
+        return {cle: copier_litteral(element) for cle, element in valeur.items()}
+    return valeur
+
+def construire_dictionnaire(cles, valeurs):
+    """Dictionnaire d'un DictionnaireLitteral, à partir des clés et valeurs évaluées."""
+    try:
+        return dict(zip(cles, valeurs))
+    except TypeError:
+        raise RuntimeError("Erreur d'exécution: Une clé de dictionnaire ne peut pas être une liste ou un dictionnaire")
+
+# ========== ACCÈS INDEXÉS ==========
+
+def lire_index(base_value, index_value):
+    """Accès base[index] sur une liste ou un dictionnaire."""
+    # Cas dictionnaire: supporter également base[index] pour les dicts
+    if isinstance(base_value, dict):
+        if index_value not in base_value:
+            raise RuntimeError(f"Erreur d'exécution: Clé '{index_value}' non trouvée dans le dictionnaire")
+        return base_value[index_value]
+
+    # Cas liste
+    if not isinstance(base_value, list):
+        raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'accès par index doit être une liste ou un dictionnaire")
+    if not isinstance(index_value, int):
+        raise RuntimeError("Erreur d'exécution: L'index doit être un entier")
+    if index_value < 0 or index_value >= len(base_value):
+        raise RuntimeError("Erreur d'exécution: Index de liste hors limites")
+
+    return base_value[index_value]
+
+def lire_cle(base_value, cle_value):
+    """Accès base["cle"] sur un dictionnaire."""
+    if not isinstance(base_value, dict):
+        raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'accès par clé doit être un dictionnaire")
+    if cle_value not in base_value:
+        raise RuntimeError(f"Erreur d'exécution: Clé '{cle_value}' non trouvée dans le dictionnaire")
+    return base_value[cle_value]
+
+def ecrire_index(base_list, index_value, valeur):
+    """Assignation base[index] = valeur sur une liste."""
+    if not isinstance(base_list, list):
+        raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'assignation par index doit être une liste")
+    if not isinstance(index_value, int):
+        raise RuntimeError("Erreur d'exécution: L'index doit être un entier")
+    if index_value < 0 or index_value >= len(base_list):
+        raise RuntimeError("Erreur d'exécution: Index de liste hors limites")
+    base_list[index_value] = valeur
+
+def ecrire_cle(base_dict, cle_value, valeur):
+    """Assignation base["cle"] = valeur sur un dictionnaire."""
+    if not isinstance(base_dict, dict):
+        raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'assignation par clé doit être un dictionnaire")
+    base_dict[cle_value] = valeur
+
+# ========== APPELS ==========
+
+def iterer_pour_dans(valeur):
+    """Itérateur d'une boucle pour...dans : éléments d'une liste, clés d'un dictionnaire,
+    caractères d'une chaîne ou morceaux d'un flux (appeler_ia_flux)."""
+    if isinstance(valeur, (list, dict, str, Iterator)):
+        return iter(valeur)
+    raise RuntimeError("Erreur d'exécution: L'objet à droite de 'dans' doit être itérable (liste, dictionnaire, chaîne ou flux)")
+
+def appeler_fonction_integree(nom_fonction, fonction, args):
+    """Appelle une fonction intégrée et traduit ses erreurs en erreurs F-IA."""
+    try:
+        return fonction(*args)
+    except _ArretProgramme:
+        # Arrêt demandé par l'utilisateur via arreter()
+        raise
+    except TypeError as e:
+        raise RuntimeError(f"Erreur d'exécution lors de l'appel de '{nom_fonction}': {e}")
+    except Exception as e:
+        # Gestion des erreurs spécifiques du module IA
+        raise RuntimeError(f"Erreur IA dans '{nom_fonction}': {str(e)}")
+
+def nom_de_fonction(nom_fonction):
+    """Extrait le nom d'une fonction appelée (chaîne ou noeud AST)."""
+    if isinstance(nom_fonction, str):
+        return nom_fonction
+    elif hasattr(nom_fonction, 'nom'):  # Cas Identifiant
+        return nom_fonction.nom
+    elif hasattr(nom_fonction, 'valeur'):  # Cas Littéral
+        return nom_fonction.valeur
+    return str(nom_fonction)
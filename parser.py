@@ -1,11 +1,16 @@
+from collections import deque
 from lexer import Token
 from fia_ast import *
 from errors import ParseError
+from resolveur import resoudre
 
 class ParserFIA:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.position = 0
+        # Liste de tokens ou générateur (LexerFIA.generer_tokens) : seuls les
+        # tokens en attente de lecture sont gardés en mémoire
+        self.tokens = iter(tokens)
+        self.tampon = deque()
+        self.position = 0 # Nombre de tokens consommés
         self.ligne_courante = 0
 
     def analyser(self):
@@ -14,15 +19,26 @@ class ParserFIA:
             instruction = self.analyser_instruction()
             if instruction:
                 instructions.append(instruction)
-        return Programme(instructions)
+        # Adresses des variables et portées des cadres
+        return resoudre(Programme(instructions))
+
+    def remplir_tampon(self, taille):
+        """Lit des tokens jusqu'à en avoir `taille` en attente ; False si le flux est épuisé."""
+        tampon = self.tampon
+        while len(tampon) < taille:
+            token = next(self.tokens, None)
+            if token is None:
+                return False
+            tampon.append(token)
+        return True
 
     def est_a_la_fin(self):
-        return self.position >= len(self.tokens)
+        return not self.tampon and not self.remplir_tampon(1)
 
-    def regarder_token(self):
-        if self.est_a_la_fin():
-            return Token('EOF', '', 0, 0)
-        return self.tokens[self.position]
+    def regarder_token(self, decalage=0):
+        if decalage < len(self.tampon) or self.remplir_tampon(decalage + 1):
+            return self.tampon[decalage]
+        return Token('EOF', '', 0, 0)
 
     def consommer_token(self, type_attendu=None):
         token = self.regarder_token()
@@ -32,6 +48,8 @@ class ParserFIA:
                 ligne=token.ligne,
                 colonne=token.colonne
             )
+        if self.tampon:
+            self.tampon.popleft()
         self.position += 1
         return token
 
@@ -59,11 +77,12 @@ class ParserFIA:
             # Rendre le point-virgule optionnel ici aussi
             if self.regarder_token().type == 'POINT_VIRGULE':
                 self.consommer_token('POINT_VIRGULE')
-            return ExpressionStatement(expr)
+            return ExpressionStatement(expr, token.ligne, token.colonne)
 
     def analyser_instruction_identifiant(self):
         # Sauvegarder la position pour pouvoir revenir en arrière
         position_sauvee = self.position
+        debut = self.regarder_token()
         
         # Analyser l'expression complète (identifiant + accès éventuels)
         expr = self.analyser_expression()
@@ -77,36 +96,36 @@ class ParserFIA:
             valeur = self.analyser_expression()
             if self.regarder_token().type == 'POINT_VIRGULE':
                 self.consommer_token('POINT_VIRGULE')
-            return Assignation(expr, valeur)
+            return Assignation(expr, valeur, debut.ligne, debut.colonne)
         elif token_courant.type in ['PLUS_EGAL', 'MOINS_EGAL', 'FOIS_EGAL', 'DIVISE_EGAL', 'MODULO_EGAL']:
             # Assignation composée (+=, -=, *=, /=, %=)
             operateur = self.consommer_token().valeur
             valeur = self.analyser_expression()
             if self.regarder_token().type == 'POINT_VIRGULE':
                 self.consommer_token('POINT_VIRGULE')
-            return AssignationComposee(expr, operateur, valeur)
+            return AssignationComposee(expr, operateur, valeur, debut.ligne, debut.colonne)
         else:
             # C'est juste une expression
             if self.regarder_token().type == 'POINT_VIRGULE':
                 self.consommer_token('POINT_VIRGULE')
-            return ExpressionStatement(expr)
+            return ExpressionStatement(expr, debut.ligne, debut.colonne)
 
     def analyser_boucle_pour_ou_pour_dans(self):
-        self.consommer_token('POUR')
+        token_pour = self.consommer_token('POUR')
         
         # Regarder s'il y a une parenthèse ou un identifiant
         if self.regarder_token().type == 'PARENTHESE_OUVRANTE':
             # C'est une boucle pour classique : pour (init; condition; increment)
-            return self.analyser_boucle_pour_classique()
+            return self.analyser_boucle_pour_classique(token_pour)
         elif self.regarder_token().type == 'IDENTIFIANT':
             # C'est potentiellement une boucle pour...dans
-            return self.analyser_boucle_pour_dans()
+            return self.analyser_boucle_pour_dans(token_pour)
         else:
             raise ParseError(f"Syntaxe de boucle 'pour' invalide", 
                            ligne=self.regarder_token().ligne,
                            colonne=self.regarder_token().colonne)
 
-    def analyser_boucle_pour_classique(self):
+    def analyser_boucle_pour_classique(self, token_pour):
         self.consommer_token('PARENTHESE_OUVRANTE')
         init = self.analyser_instruction()
         self.consommer_token('POINT_VIRGULE')
@@ -115,18 +134,18 @@ class ParserFIA:
         increment = self.analyser_instruction()
         self.consommer_token('PARENTHESE_FERMANTE')
         corps = self.analyser_bloc()
-        return BouclePour(init, condition, increment, corps)
+        return BouclePour(init, condition, increment, corps, token_pour.ligne, token_pour.colonne)
 
-    def analyser_boucle_pour_dans(self):
+    def analyser_boucle_pour_dans(self, token_pour):
         # Syntaxe: pour variable dans iterable { ... }
         variable = self.consommer_token('IDENTIFIANT').valeur
         self.consommer_token('DANS')
         iterable = self.analyser_expression()
         corps = self.analyser_bloc()
-        return BouclePourDans(variable, iterable, corps)
+        return BouclePourDans(variable, iterable, corps, token_pour.ligne, token_pour.colonne)
 
     def analyser_declaration_variable(self):
-        self.consommer_token('SOIT')
+        token = self.consommer_token('SOIT')
         nom = self.consommer_token('IDENTIFIANT').valeur
         valeur = None
         if self.regarder_token().type == 'ASSIGNATION':
@@ -136,10 +155,10 @@ class ParserFIA:
         if self.regarder_token().type == 'POINT_VIRGULE':
             self.consommer_token('POINT_VIRGULE')
         # --- FIN CHANGEMENT ---
-        return DeclarationVariable(nom, valeur)
+        return DeclarationVariable(nom, valeur, token.ligne, token.colonne)
 
     def analyser_fonction(self):
-        self.consommer_token('FONCTION')
+        token = self.consommer_token('FONCTION')
         nom = self.consommer_token('IDENTIFIANT').valeur
         self.consommer_token('PARENTHESE_OUVRANTE')
         params = []
@@ -150,10 +169,10 @@ class ParserFIA:
                 params.append(self.consommer_token('IDENTIFIANT').valeur)
         self.consommer_token('PARENTHESE_FERMANTE')
         corps = self.analyser_bloc()
-        return Fonction(nom, params, corps)
+        return Fonction(nom, params, corps, token.ligne, token.colonne)
 
     def analyser_retour(self):
-        self.consommer_token('RETOURNER')
+        token = self.consommer_token('RETOURNER')
         valeur = None
         if self.regarder_token().type != 'POINT_VIRGULE' and self.regarder_token().type != 'ACCOLADE_FERMANTE': # Si ce n'est pas immédiatement un ';'
             valeur = self.analyser_expression()
@@ -161,10 +180,10 @@ class ParserFIA:
         if self.regarder_token().type == 'POINT_VIRGULE':
             self.consommer_token('POINT_VIRGULE')
         # --- FIN CHANGEMENT ---
-        return Retour(valeur)
+        return Retour(valeur, token.ligne, token.colonne)
 
     def analyser_condition(self):
-        self.consommer_token('SI')
+        token = self.consommer_token('SI')
         self.consommer_token('PARENTHESE_OUVRANTE')
         condition = self.analyser_expression()
         self.consommer_token('PARENTHESE_FERMANTE')
@@ -174,28 +193,29 @@ class ParserFIA:
             self.consommer_token('SINON')
             # Support de "sinon si (...) { }"
             if self.regarder_token().type == 'SI':
-                bloc_sinon = Bloc([self.analyser_condition()])
+                token_si = self.regarder_token()
+                bloc_sinon = Bloc([self.analyser_condition()], token_si.ligne, token_si.colonne)
             else:
                 bloc_sinon = self.analyser_bloc()
-        return Condition(condition, bloc_si, bloc_sinon)
+        return Condition(condition, bloc_si, bloc_sinon, token.ligne, token.colonne)
 
     def analyser_boucle_tant_que(self):
-        self.consommer_token('TANT_QUE')
+        token = self.consommer_token('TANT_QUE')
         self.consommer_token('PARENTHESE_OUVRANTE')
         condition = self.analyser_expression()
         self.consommer_token('PARENTHESE_FERMANTE')
         corps = self.analyser_bloc()
-        return BoucleTantQue(condition, corps)
+        return BoucleTantQue(condition, corps, token.ligne, token.colonne)
 
     def analyser_bloc(self):
-        self.consommer_token('ACCOLADE_OUVRANTE')
+        token = self.consommer_token('ACCOLADE_OUVRANTE')
         instructions = []
         while self.regarder_token().type != 'ACCOLADE_FERMANTE' and not self.est_a_la_fin():
             instruction = self.analyser_instruction()
             if instruction:
                 instructions.append(instruction)
         self.consommer_token('ACCOLADE_FERMANTE')
-        return Bloc(instructions)
+        return Bloc(instructions, token.ligne, token.colonne)
 
     def analyser_expression(self):
         # Précédence des opérateurs
@@ -204,49 +224,49 @@ class ParserFIA:
     def analyser_ou(self):
         gauche = self.analyser_et()
         while self.regarder_token().type == 'OU':
-            operateur = self.consommer_token().valeur
+            token = self.consommer_token()
             droite = self.analyser_et()
-            gauche = ExpressionBinaire(gauche, operateur, droite)
+            gauche = ExpressionBinaire(gauche, token.valeur, droite, token.ligne, token.colonne)
         return gauche
 
     def analyser_et(self):
         gauche = self.analyser_comparaison()
         while self.regarder_token().type == 'ET':
-            operateur = self.consommer_token().valeur
+            token = self.consommer_token()
             droite = self.analyser_comparaison()
-            gauche = ExpressionBinaire(gauche, operateur, droite)
+            gauche = ExpressionBinaire(gauche, token.valeur, droite, token.ligne, token.colonne)
         return gauche
 
     def analyser_comparaison(self):
         gauche = self.analyser_terme()
         while self.regarder_token().type in ['EGAL', 'DIFF', 'INF', 'SUP', 'INF_EGAL', 'SUP_EGAL']:
-            operateur = self.consommer_token().valeur
+            token = self.consommer_token()
             droite = self.analyser_terme()
-            gauche = ExpressionBinaire(gauche, operateur, droite)
+            gauche = ExpressionBinaire(gauche, token.valeur, droite, token.ligne, token.colonne)
         return gauche
 
     def analyser_terme(self):
         gauche = self.analyser_facteur()
         while self.regarder_token().type in ['PLUS', 'MOINS']:
-            operateur = self.consommer_token().valeur
+            token = self.consommer_token()
             droite = self.analyser_facteur()
-            gauche = ExpressionBinaire(gauche, operateur, droite)
+            gauche = ExpressionBinaire(gauche, token.valeur, droite, token.ligne, token.colonne)
         return gauche
 
     def analyser_facteur(self):
         gauche = self.analyser_unaire()
         while self.regarder_token().type in ['FOIS', 'DIVISE', 'MODULO']:
-            operateur = self.consommer_token().valeur
+            token = self.consommer_token()
             droite = self.analyser_unaire()
-            gauche = ExpressionBinaire(gauche, operateur, droite)
+            gauche = ExpressionBinaire(gauche, token.valeur, droite, token.ligne, token.colonne)
         return gauche
 
     def analyser_unaire(self):
         # Gestion des opérateurs unaires (ex: -5, -variable)
         if self.regarder_token().type == 'MOINS': # Ajout de la gestion de l'opérateur unaire MOINS
-            operateur = self.consommer_token().valeur
+            token = self.consommer_token()
             operand = self.analyser_unaire() # Récursion pour gérer --5 ou -(-x)
-            return ExpressionUnaire(operateur, operand)
+            return ExpressionUnaire(token.valeur, operand, token.ligne, token.colonne)
         # Pour l'instant, on passe directement à la primaire
         return self.analyser_appel()
 
@@ -277,37 +297,37 @@ class ParserFIA:
         else:
              # Sinon, c'est une expression complexe (ex: obj.fonction)
              nom_fonction = nom_fonction_noeud # Pourrait être traité différemment si nécessaire
-        return AppelFonction(nom_fonction, arguments)
+        return AppelFonction(nom_fonction, arguments, nom_fonction_noeud.ligne, nom_fonction_noeud.colonne)
 
     def analyser_acces_crochet(self, base_noeud):
-        self.consommer_token('CROCHET_OUVRANT')
+        token = self.consommer_token('CROCHET_OUVRANT')
         index_expr = self.analyser_expression()
         self.consommer_token('CROCHET_FERMANT')
         
         # Déterminer si c'est un accès liste ou dictionnaire
         # Si l'expression d'index est un littéral string, c'est probablement un dictionnaire
         if hasattr(index_expr, 'valeur') and isinstance(index_expr.valeur, str):
-            return AccesDictionnaire(base_noeud, index_expr)
+            return AccesDictionnaire(base_noeud, index_expr, token.ligne, token.colonne)
         else:
-            return AccesIndex(base_noeud, index_expr)
+            return AccesIndex(base_noeud, index_expr, token.ligne, token.colonne)
 
     def analyser_primaire(self):
         token = self.regarder_token()
         if token.type == 'NOMBRE':
             self.consommer_token()
-            return Littéral(token.valeur)
+            return Littéral(token.valeur, token.ligne, token.colonne)
         elif token.type == 'CHAINE':
             self.consommer_token()
-            return Littéral(token.valeur)
+            return Littéral(token.valeur, token.ligne, token.colonne)
         elif token.type == 'VRAI':
             self.consommer_token()
-            return Littéral(True)
+            return Littéral(True, token.ligne, token.colonne)
         elif token.type == 'FAUX':
             self.consommer_token()
-            return Littéral(False)
+            return Littéral(False, token.ligne, token.colonne)
         elif token.type == 'NUL':
             self.consommer_token()
-            return Littéral(None)
+            return Littéral(None, token.ligne, token.colonne)
         elif token.type == 'CROCHET_OUVRANT':
             return self.analyser_liste()
         elif token.type == 'ACCOLADE_OUVRANTE':
@@ -315,7 +335,7 @@ class ParserFIA:
         elif token.type in ['IDENTIFIANT', 'IMPRIMER', 'LONGUEUR', 'ENTIER', 'DECIMAL', 'BOOLEEN', 'CHAINE']:
         # Autoriser l'utilisation de fonctions intégrées mappées comme mots-clés
             nom = self.consommer_token().valeur
-            return Identifiant(nom)
+            return Identifiant(nom, token.ligne, token.colonne)
         elif token.type == 'PARENTHESE_OUVRANTE':
             self.consommer_token('PARENTHESE_OUVRANTE')
             expr = self.analyser_expression()
@@ -325,7 +345,7 @@ class ParserFIA:
             raise ParseError(f"Erreur de syntaxe: expression inattendue '{token.type}' à la ligne {token.ligne}")
 
     def analyser_liste(self):
-        self.consommer_token() # '['
+        token = self.consommer_token() # '['
         elements = []
         if self.regarder_token().type != 'CROCHET_FERMANT':
             elements.append(self.analyser_expression())
@@ -334,39 +354,21 @@ class ParserFIA:
                 elements.append(self.analyser_expression())
         self.consommer_token('CROCHET_FERMANT') # ']'
         
-        # Évaluer immédiatement les éléments de la liste
-        elements_evalues = []
-        for elem in elements:
-            if hasattr(elem, 'valeur') and hasattr(elem, 'accepter'):
-                # Si c'est un Littéral, extraire sa valeur
-                elements_evalues.append(elem.valeur)
-            else:
-                elements_evalues.append(elem)
-        
-        return Littéral(elements_evalues)
+        if all(isinstance(elem, Littéral) for elem in elements):
+            # Liste de constantes : calculée ici, copiée à chaque évaluation
+            return Littéral([elem.valeur for elem in elements], token.ligne, token.colonne)
+        return ListeLitterale(elements, token.ligne, token.colonne)
 
     def analyser_dictionnaire(self):
-        self.consommer_token('ACCOLADE_OUVRANTE') # '{'
-        elements = {}
+        token = self.consommer_token('ACCOLADE_OUVRANTE') # '{'
+        cles = []
+        valeurs = []
         
         if self.regarder_token().type != 'ACCOLADE_FERMANTE':
             # Premier élément
-            cle = self.analyser_expression()
+            cles.append(self.analyser_expression())
             self.consommer_token('DEUX_POINTS') # ':'
-            valeur = self.analyser_expression()
-            
-            # Extraire la valeur de la clé et de la valeur si c'est un Littéral
-            if hasattr(cle, 'valeur'):
-                cle_str = cle.valeur
-            else:
-                cle_str = str(cle)
-            
-            if hasattr(valeur, 'valeur'):
-                valeur_python = valeur.valeur
-            else:
-                valeur_python = valeur
-                
-            elements[cle_str] = valeur_python
+            valeurs.append(self.analyser_expression())
             
             # Éléments suivants
             while self.regarder_token().type == 'VIRGULE':
@@ -374,21 +376,14 @@ class ParserFIA:
                 if self.regarder_token().type == 'ACCOLADE_FERMANTE':
                     break  # Virgule de fin autorisée
                 
-                cle = self.analyser_expression()
+                cles.append(self.analyser_expression())
                 self.consommer_token('DEUX_POINTS')
-                valeur = self.analyser_expression()
-                
-                if hasattr(cle, 'valeur'):
-                    cle_str = cle.valeur
-                else:
-                    cle_str = str(cle)
-                
-                if hasattr(valeur, 'valeur'):
-                    valeur_python = valeur.valeur
-                else:
-                    valeur_python = valeur
-                    
-                elements[cle_str] = valeur_python
+                valeurs.append(self.analyser_expression())
         
         self.consommer_token('ACCOLADE_FERMANTE') # '}'
-        return Littéral(elements)
+        if (all(isinstance(noeud, Littéral) for noeud in cles + valeurs)
+                and not any(isinstance(cle.valeur, (list, dict)) for cle in cles)):
+            # Dictionnaire de constantes : calculé ici, copié à chaque évaluation
+            return Littéral({cle.valeur: valeur.valeur for cle, valeur in zip(cles, valeurs)},
+                            token.ligne, token.colonne)
+        return DictionnaireLitteral(cles, valeurs, token.ligne, token.colonne)
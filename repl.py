@@ -3,11 +3,13 @@ from lexer import LexerFIA
 from parser import ParserFIA
 from interpreter import VisiteurInterpretation
 from errors import FIAError
+from budget import BudgetExecution, RESSOURCES, convertir_limite
 import sys
 
 class REPL:
-    def __init__(self):
-        self.interpreter = VisiteurInterpretation()
+    def __init__(self, budget=None):
+        # Le budget s'applique à chaque ligne exécutée
+        self.interpreter = VisiteurInterpretation(budget)
         self.prompt = "f-ia> "
 
     def boucle(self):
@@ -16,7 +18,7 @@ class REPL:
         print("💻 Langage de programmation français pour l'IA")
         print("🎯 Amélioré avec ACCÈS INDEXÉ, OPÉRATEUR UNAIRE, ACCENTS!")
         print("🌟" * 50)
-        print("Commandes spéciales: .aide, .variables, .reset, .quitter")
+        print("Commandes spéciales: .aide, .variables, .budget, .reset, .quitter")
         print("🌟" * 50)
         while True:
             try:
@@ -46,6 +48,7 @@ class REPL:
             print("  soit liste = [10, 20, 30]; imprimer(liste[0])") # Exemple avec accès indexé
             print("  soit neg = -5; imprimer(neg)") # Exemple avec opérateur unaire
             print("  soit nom_àccéntué = 'valeur'") # Exemple avec accents
+            print("  .budget temps=2 instructions=100000 memoire=64M  (0 = illimité)")
         elif commande == '.variables':
             if not self.interpreter.contextes[0]: # Vérifie le contexte global
                 print("📝 Aucune variable globale")
@@ -59,6 +62,8 @@ class REPL:
                 print("\n📝 Fonctions définies:")
                 for nom, _ in self.interpreter.fonctions_definies.items():
                     print(f"  {nom}")
+        elif commande.split()[0] == '.budget':
+            self.configurer_budget(commande.split()[1:])
         elif commande == '.reset':
             # Réinitialiser les contextes : un contexte global vide
             self.interpreter.contextes = [{}]
@@ -71,6 +76,23 @@ class REPL:
         else:
             print(f"Commande spéciale inconnue: {commande}")
 
+    def configurer_budget(self, reglages):
+        """`.budget` affiche les limites, `.budget temps=2 memoire=64M` les modifie."""
+        limites = self.interpreter.budget.limites()
+        try:
+            for reglage in reglages:
+                ressource, _, valeur = reglage.partition('=')
+                if ressource not in RESSOURCES:
+                    raise ValueError(f"ressource inconnue: {ressource} (choix: {', '.join(RESSOURCES)})")
+                limites[ressource] = convertir_limite(ressource, valeur)
+        except ValueError as e:
+            print(f"Erreur: {e}")
+            return
+        self.interpreter.budget = BudgetExecution(**limites)
+        print("⏱️ Budget par ligne:")
+        for ressource, valeur in limites.items():
+            print(f"  {ressource} = {'illimité' if valeur is None else valeur}")
+
     def executer_ligne(self, ligne):
         try:
             lexer = LexerFIA(ligne)
@@ -79,7 +101,7 @@ class REPL:
             parser = ParserFIA(tokens)
             ast = parser.analyser()
             print(f"🌳 AST: {ast.instructions}")
-            resultat = self.interpreter.executer(ast)
+            resultat = self.interpreter.executer_programme(ast)
             if resultat is not None:
                 print(f"🎯 Résultat: {resultat}")
         except FIAError as e:
@@ -0,0 +1,178 @@
+# reseau.py
+# Perceptron multicouche vectorisé (NumPy) derrière reseau_neuronal,
+# apprentissage et prediction (ia_module).
+#
+# Les calculs portent sur des matrices d'exemples, une ligne par exemple : la
+# passe avant d'un lot est un produit matriciel par couche, la rétropropagation
+# aussi. Couches cachées : activation du réseau (relu, sigmoid, tanh) ; couche
+# de sortie : sigmoïde pour un neurone (classes 0/1), softmax au-delà (indice de
+# classe), avec l'entropie croisée comme erreur.
+#
+# Un modèle est un ModeleReseau : valeur opaque pour F-IA (passée aux fonctions
+# intégrées sans conversion ni copie), avec un tableau NumPy contigu par couche.
+# NumPy n'est importé qu'à la création du premier réseau.
+import random
+from errors import RuntimeError
+
+def importer_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("NumPy est requis pour les réseaux de neurones. Installez les dépendances: "
+                           "pip install -r requirements.txt")
+    return numpy
+
+def _sigmoide(np, z):
+    # Bornée pour ne pas déborder en float32 (exp(89) > float32 max) ; saturée bien avant
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -60, 60)))
+
+def _softmax(np, z):
+    exp = np.exp(z - z.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+# Activation des couches cachées : (fonction, dérivée exprimée avec la sortie de la couche)
+ACTIVATIONS = {
+    'relu': (lambda np, z: np.maximum(z, 0.0), lambda np, a: (a > 0).astype(a.dtype)),
+    'sigmoid': (_sigmoide, lambda np, a: a * (1.0 - a)),
+    'tanh': (lambda np, z: np.tanh(z), lambda np, a: 1.0 - a * a),
+}
+
+# Types des poids acceptés par reseau_neuronal
+TYPES_POIDS = ('float64', 'float32')
+
+class ModeleReseau:
+    """Réseau de neurones créé par reseau_neuronal.
+
+    `poids[i]` (entrées × sorties) et `biais[i]` sont les tableaux de la couche
+    i + 1 ; apprentissage les modifie en place.
+    """
+
+    def __init__(self, architecture, activation, poids, biais):
+        self.architecture = list(architecture)
+        self.activation = activation
+        self.poids = poids
+        self.biais = biais
+        self.entraine = False
+        self.precision = 0.0
+        self.erreur = None
+
+    @classmethod
+    def creer(cls, np, couches, activation, type_poids='float64'):
+        """Poids tirés uniformément entre -1 et 1, biais nuls."""
+        # Graine tirée du module random : le même état random donne les mêmes poids
+        generateur = np.random.default_rng(random.getrandbits(64))
+        poids = [generateur.uniform(-1, 1, (entrees, sorties)).astype(type_poids, copy=False)
+                 for entrees, sorties in zip(couches, couches[1:])]
+        biais = [np.zeros(sorties, dtype=type_poids) for sorties in couches[1:]]
+        return cls(couches, activation, poids, biais)
+
+    @property
+    def type_poids(self):
+        return self.poids[0].dtype.name
+
+    def couche(self, numero):
+        """Indice des tableaux de la couche `numero` (1 = entre les entrées et la première couche cachée)."""
+        if not isinstance(numero, int) or not 1 <= numero <= len(self.poids):
+            raise RuntimeError(f"Couche {numero} inexistante : le réseau a {len(self.poids)} couche(s) de poids")
+        return numero - 1
+
+    def infos(self):
+        return {
+            "type": "reseau_neuronal",
+            "architecture": list(self.architecture),
+            "activation": self.activation,
+            "type_poids": self.type_poids,
+            "parametres": sum(w.size + b.size for w, b in zip(self.poids, self.biais)),
+            "octets": sum(w.nbytes + b.nbytes for w, b in zip(self.poids, self.biais)),
+            "entraine": self.entraine,
+            "precision": self.precision,
+            "erreur": self.erreur,
+        }
+
+    def __repr__(self):
+        etat = f"entraîné, précision {self.precision:.2%}" if self.entraine else "non entraîné"
+        return f"<reseau_neuronal {self.architecture} {self.activation} {self.type_poids}, {etat}>"
+
+def entrees(np, donnees, nb_entrees, type_poids='float64'):
+    """Matrice (exemples × entrées) ; un nombre par exemple si le réseau a une seule entrée."""
+    try:
+        x = np.array(donnees, dtype=type_poids)
+    except (TypeError, ValueError):
+        raise RuntimeError("Les exemples doivent être des listes de nombres de même longueur")
+    if x.ndim == 1 and nb_entrees == 1:
+        x = x.reshape(-1, 1)
+    if x.ndim != 2 or x.shape[1] != nb_entrees or not len(x):
+        raise RuntimeError(f"Chaque exemple doit avoir {nb_entrees} valeur(s) d'entrée")
+    return x
+
+def cibles(np, donnees, nb_sorties, type_poids='float64'):
+    """Matrice (exemples × sorties) des résultats attendus.
+
+    Un neurone de sortie : valeurs entre 0 et 1. Plusieurs : indices de classe,
+    ou listes de `nb_sorties` probabilités.
+    """
+    try:
+        y = np.array(donnees, dtype=type_poids)
+    except (TypeError, ValueError):
+        raise RuntimeError("Les sorties attendues doivent être des nombres ou des listes de nombres")
+    if nb_sorties == 1:
+        y = y.reshape(-1, 1) if y.ndim == 1 else y
+    elif y.ndim == 1:
+        if not np.all((y == np.round(y)) & (y >= 0) & (y < nb_sorties)):
+            raise RuntimeError(f"Les classes attendues doivent être des entiers de 0 à {nb_sorties - 1}")
+        y = np.eye(nb_sorties, dtype=type_poids)[y.astype(int)]
+    if y.ndim != 2 or y.shape[1] != nb_sorties:
+        raise RuntimeError(f"Chaque sortie attendue doit correspondre aux {nb_sorties} neurone(s) de sortie")
+    return y
+
+def passe_avant(np, poids, biais, activation, x):
+    """Sorties de chaque couche (entrées comprises) pour un lot d'exemples."""
+    fonction = ACTIVATIONS[activation][0]
+    sorties = [x]
+    derniere = len(poids) - 1
+    for i, (w, b) in enumerate(zip(poids, biais)):
+        z = sorties[-1] @ w + b
+        if i < derniere:
+            sorties.append(fonction(np, z))
+        else:
+            sorties.append(_sigmoide(np, z) if w.shape[1] == 1 else _softmax(np, z))
+    return sorties
+
+def perte(np, probabilites, y):
+    """Entropie croisée moyenne par exemple (calculée en float64)."""
+    p = np.clip(probabilites.astype(np.float64), 1e-12, 1 - 1e-12)
+    if y.shape[1] == 1:
+        return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+    return float(-np.mean(np.sum(y * np.log(p), axis=1)))
+
+def classes(np, probabilites):
+    """Classe de chaque exemple : 0/1 au seuil de 0,5 pour un neurone de sortie, sinon l'indice le plus probable."""
+    if probabilites.shape[1] == 1:
+        return (probabilites[:, 0] >= 0.5).astype(int)
+    return probabilites.argmax(axis=1)
+
+def entrainer(np, poids, biais, activation, x, y, epoques, taux, taille_lot, journal=None, frequence=1):
+    """Descente de gradient par mini-lots, en place sur `poids` et `biais`.
+
+    Les exemples sont mélangés à chaque époque ; toutes les `frequence` époques,
+    `journal(epoque, erreur)` reçoit l'erreur sur l'ensemble des exemples.
+    """
+    derivee = ACTIVATIONS[activation][1]
+    # Graine tirée du module random : le même état random donne le même entraînement
+    generateur = np.random.default_rng(random.getrandbits(64))
+    for epoque in range(epoques):
+        ordre = generateur.permutation(len(x))
+        for debut in range(0, len(x), taille_lot):
+            lot = ordre[debut:debut + taille_lot]
+            sorties = passe_avant(np, poids, biais, activation, x[lot])
+            # Sigmoïde ou softmax + entropie croisée : gradient (prédiction - attendu)
+            delta = (sorties[-1] - y[lot]) / len(lot)
+            for i in reversed(range(len(poids))):
+                gradient_poids = sorties[i].T @ delta
+                gradient_biais = delta.sum(axis=0)
+                if i:
+                    delta = (delta @ poids[i].T) * derivee(np, sorties[i])
+                poids[i] -= taux * gradient_poids
+                biais[i] -= taux * gradient_biais
+        if journal is not None and epoque % frequence == 0:
+            journal(epoque, perte(np, passe_avant(np, poids, biais, activation, x)[-1], y))
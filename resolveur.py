@@ -0,0 +1,234 @@
+# resolveur.py
+# Résolution statique des portées : chaque variable locale reçoit une adresse
+# (niveau, slot) dans un cadre de taille fixe.
+#
+# La forme de la pile de contextes est connue statiquement en chaque point du
+# programme :
+#   contextes[0]   contexte global, un dictionnaire (noms dynamiques : REPL...)
+#   contextes[1]   bloc de niveau global (fusionné dans le global en sortie),
+#                  ou cadre de fonction
+#   contextes[2+]  boucles pour...dans (cadre jeté en sortie de boucle)
+# Les cadres non globaux sont des listes : [portee, valeur_slot_1, ...], les
+# slots jamais affectés valent INDEFINI.
+from errors import RuntimeError
+from fia_ast import (
+    Noeud, DeclarationVariable, Assignation, AssignationComposee, Identifiant,
+    Condition, BoucleTantQue, BouclePour, BouclePourDans, Bloc, Fonction,
+)
+
+class _Indefini:
+    """Valeur d'un slot dont la variable n'a pas encore été affectée."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'INDEFINI'
+
+INDEFINI = _Indefini()
+
+class Portee:
+    """Description d'un cadre : nom de variable -> slot (le slot 0 contient la portée)."""
+    __slots__ = ('noms', 'slots_parametres')
+
+    def __init__(self, parametres=()):
+        self.noms = {}
+        for nom in parametres:
+            self.slot(nom)
+        self.slots_parametres = [self.noms[nom] for nom in parametres]
+
+    def slot(self, nom):
+        slot = self.noms.get(nom)
+        if slot is None:
+            slot = self.noms[nom] = len(self.noms) + 1
+        return slot
+
+    def nouveau_cadre(self):
+        return [self] + [INDEFINI] * len(self.noms)
+
+    def cadre_appel(self, args):
+        """Cadre d'une fonction dont les paramètres reçoivent `args`."""
+        cadre = [self] + [INDEFINI] * len(self.noms)
+        for slot, valeur in zip(self.slots_parametres, args):
+            cadre[slot] = valeur
+        return cadre
+
+    def __repr__(self):
+        return f"Portee({', '.join(self.noms)})"
+
+# ========== ACCÈS À L'EXÉCUTION ==========
+
+def lire_variable(contextes, adresses, nom):
+    """Lit une variable : slots candidats du plus local au plus global, puis le global."""
+    if adresses is None:
+        return lire_par_nom(contextes, nom)
+    for niveau, slot in adresses:
+        valeur = contextes[niveau][slot]
+        if valeur is not INDEFINI:
+            return valeur
+    globaux = contextes[0]
+    if nom in globaux:
+        return globaux[nom]
+    raise RuntimeError(f"Erreur d'exécution: Variable '{nom}' non définie")
+
+def variable_existe(contextes, adresses, nom):
+    if adresses is None:
+        return existe_par_nom(contextes, nom)
+    for niveau, slot in adresses:
+        if contextes[niveau][slot] is not INDEFINI:
+            return True
+    return nom in contextes[0]
+
+def ecrire_variable(contextes, adresse, nom, valeur):
+    """Écrit dans le cadre le plus local (adresse None : contexte global)."""
+    if adresse is None:
+        contextes[0][nom] = valeur
+    else:
+        contextes[adresse[0]][adresse[1]] = valeur
+
+def lire_par_nom(contextes, nom):
+    """Recherche dynamique par nom, pour les noeuds évalués hors de leur portée."""
+    for cadre in reversed(contextes):
+        if isinstance(cadre, dict):
+            if nom in cadre:
+                return cadre[nom]
+            continue
+        slot = cadre[0].noms.get(nom)
+        if slot is not None and cadre[slot] is not INDEFINI:
+            return cadre[slot]
+    raise RuntimeError(f"Erreur d'exécution: Variable '{nom}' non définie")
+
+def existe_par_nom(contextes, nom):
+    try:
+        lire_par_nom(contextes, nom)
+    except RuntimeError:
+        return False
+    return True
+
+def fusionner_bloc(cadre, globaux):
+    """Reporte les variables d'un bloc de niveau global dans le contexte global."""
+    for nom, slot in cadre[0].noms.items():
+        valeur = cadre[slot]
+        if valeur is not INDEFINI:
+            globaux[nom] = valeur
+
+def variables_cadre(cadre):
+    """Variables définies d'un cadre (dictionnaire ou liste de slots)."""
+    if isinstance(cadre, dict):
+        return dict(cadre)
+    return {nom: cadre[slot] for nom, slot in cadre[0].noms.items() if cadre[slot] is not INDEFINI}
+
+# ========== PASSE DE RÉSOLUTION ==========
+
+class Resolveur:
+    """Annote l'AST : adresses des identifiants, cibles d'écriture et portées des cadres."""
+
+    def __init__(self):
+        self.portees = [] # Cadres non globaux visibles, contextes[1:] à l'exécution
+
+    def resoudre(self, programme):
+        for instruction in programme.instructions:
+            self.visiter(instruction)
+        return programme
+
+    def visiter(self, noeud):
+        if isinstance(noeud, Noeud):
+            getattr(self, 'visiter_' + type(noeud).__name__, self.visiter_enfants)(noeud)
+
+    def visiter_enfants(self, noeud):
+        for attribut in type(noeud).__slots__:
+            valeur = getattr(noeud, attribut)
+            if isinstance(valeur, Noeud):
+                self.visiter(valeur)
+            elif isinstance(valeur, list):
+                for element in valeur:
+                    self.visiter(element)
+
+    # --- Portées ---
+
+    def _collecter_ecritures(self, portee, noeud):
+        """Enregistre dans `portee` les variables écrites sans changer de cadre."""
+        if isinstance(noeud, DeclarationVariable):
+            portee.slot(noeud.nom)
+        elif isinstance(noeud, (Assignation, AssignationComposee)):
+            if isinstance(noeud.cible, Identifiant):
+                portee.slot(noeud.cible.nom)
+        elif isinstance(noeud, Bloc):
+            for instruction in noeud.instructions:
+                self._collecter_ecritures(portee, instruction)
+        elif isinstance(noeud, Condition):
+            self._collecter_ecritures(portee, noeud.bloc_si)
+            if noeud.bloc_sinon:
+                self._collecter_ecritures(portee, noeud.bloc_sinon)
+        elif isinstance(noeud, BoucleTantQue):
+            self._collecter_ecritures(portee, noeud.corps)
+        elif isinstance(noeud, BouclePour):
+            self._collecter_ecritures(portee, noeud.init)
+            self._collecter_ecritures(portee, noeud.increment)
+            self._collecter_ecritures(portee, noeud.corps)
+        # BouclePourDans et Fonction ouvrent leur propre cadre
+
+    def _adresse_ecriture(self, nom):
+        if not self.portees:
+            return None
+        return (len(self.portees), self.portees[-1].noms[nom])
+
+    def visiter_Bloc(self, bloc):
+        if self.portees:
+            bloc.portee = None
+            for instruction in bloc.instructions:
+                self.visiter(instruction)
+            return
+        # Bloc de niveau global : cadre temporaire fusionné dans le global
+        bloc.portee = Portee()
+        self._collecter_ecritures(bloc.portee, bloc)
+        self.portees.append(bloc.portee)
+        try:
+            for instruction in bloc.instructions:
+                self.visiter(instruction)
+        finally:
+            self.portees.pop()
+
+    def visiter_BouclePourDans(self, boucle):
+        self.visiter(boucle.iterable)
+        boucle.portee = Portee((boucle.variable,))
+        self._collecter_ecritures(boucle.portee, boucle.corps)
+        self.portees.append(boucle.portee)
+        try:
+            self.visiter(boucle.corps)
+        finally:
+            self.portees.pop()
+
+    def visiter_Fonction(self, fonction):
+        # Le corps ne voit que le global et son propre cadre
+        fonction.portee = Portee(fonction.parametres)
+        self._collecter_ecritures(fonction.portee, fonction.corps)
+        portees_englobantes, self.portees = self.portees, [fonction.portee]
+        try:
+            for instruction in fonction.corps.instructions:
+                self.visiter(instruction)
+        finally:
+            self.portees = portees_englobantes
+
+    # --- Variables ---
+
+    def visiter_Identifiant(self, ident):
+        ident.adresses = tuple(
+            (niveau, portee.noms[ident.nom])
+            for niveau, portee in reversed(list(enumerate(self.portees, 1)))
+            if ident.nom in portee.noms
+        )
+
+    def visiter_DeclarationVariable(self, decl):
+        self.visiter(decl.valeur)
+        decl.adresse = self._adresse_ecriture(decl.nom)
+
+    def visiter_Assignation(self, assign):
+        self.visiter(assign.valeur)
+        self.visiter(assign.cible)
+        if isinstance(assign.cible, Identifiant):
+            assign.adresse = self._adresse_ecriture(assign.cible.nom)
+
+    visiter_AssignationComposee = visiter_Assignation
+
+def resoudre(programme):
+    """Résout les portées d'un Programme sortant du parser (idempotent)."""
+    return Resolveur().resoudre(programme)
@@ -0,0 +1,30 @@
+# sortie.py
+# Flux de sortie des programmes F-IA.
+#
+# Chaque exécution écrit dans le flux porté par son interpréteur, rendu
+# accessible aux fonctions intégrées par une variable de contexte : des
+# exécutions concurrentes (threads du service Flask) ne mélangent plus leurs
+# sorties, sans toucher au sys.stdout global du processus.
+import contextvars
+import sys
+from contextlib import contextmanager
+
+_flux_courant = contextvars.ContextVar('sortie_fia', default=None)
+
+def flux_courant():
+    """Flux de l'exécution en cours ; sys.stdout hors de toute redirection."""
+    flux = _flux_courant.get()
+    return flux if flux is not None else sys.stdout
+
+def imprimer(*args, sep=' ', end='\n'):
+    """print() vers le flux de l'exécution en cours."""
+    print(*args, sep=sep, end=end, file=flux_courant())
+
+@contextmanager
+def rediriger(flux):
+    """Dirige la sortie vers `flux` dans le contexte courant (None = sys.stdout)."""
+    jeton = _flux_courant.set(flux)
+    try:
+        yield flux
+    finally:
+        _flux_courant.reset(jeton)
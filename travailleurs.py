@@ -0,0 +1,295 @@
+# travailleurs.py
+# Pool de processus pré-lancés exécutant les programmes F-IA du service Flask.
+#
+# Chaque travailleur charge l'interpréteur une seule fois (builtin, ia_module
+# et ai_integration compris) puis exécute les programmes déjà analysés qu'il
+# reçoit par un tube. Un script qui dépasse le délai est tué avec son
+# processus, qui est aussitôt remplacé ; un travailleur est aussi recyclé
+# après `max_taches` exécutions pour borner les fuites de mémoire.
+#
+# En mode flux, la sortie remonte ligne par ligne dans le tube ; le tube (et
+# la file du mode local) étant bornés, un client lent ralentit le programme
+# au lieu de faire grossir un tampon côté serveur.
+import io
+import multiprocessing
+import threading
+import queue
+import time
+from io import StringIO
+from budget import BudgetExecution
+from builtin import _ArretProgramme, charger_fonctions_ia
+from errors import FIAError
+from interpreter import VisiteurInterpretation
+
+# Le service charge le module IA dès le démarrage (il est sinon chargé au premier
+# appel d'une fonction IA) : le serveur de fork le précharge pour les travailleurs
+charger_fonctions_ia()
+
+# Interpréteur initialisé une fois au chargement (aussi dans le serveur de fork) ;
+# chaque exécution en dérive un interpréteur vierge, sans bannière
+_prototype = VisiteurInterpretation(banniere=False)
+
+def _executer(ast, moteur, limites, sortie):
+    """Exécute un Programme vers `sortie` ; retourne le message d'erreur, ou None."""
+    try:
+        interpreter = _prototype.deriver(BudgetExecution(**limites), sortie)
+        interpreter.executer_programme(ast, moteur)
+        return None
+    except FIAError as e:
+        return str(e)
+    except Exception as e:
+        return f"Erreur inattendue: {str(e)}"
+
+def executer_capture(ast, moteur, limites):
+    """Exécute un Programme et retourne sa sortie, ou le message d'erreur.
+
+    La sortie est propre à l'exécution (sys.stdout n'est pas touché) : plusieurs
+    threads peuvent appeler cette fonction en même temps.
+    """
+    sortie = StringIO()
+    erreur = _executer(ast, moteur, limites, sortie)
+    return sortie.getvalue() if erreur is None else erreur
+
+class SortieLignes(io.TextIOBase):
+    """Flux qui transmet à `envoyer` chaque ligne complète dès qu'elle est écrite."""
+
+    def __init__(self, envoyer):
+        self.envoyer = envoyer
+        self._tampon = [] # Début de ligne pas encore terminée
+
+    def writable(self):
+        return True
+
+    def write(self, texte):
+        self._tampon.append(texte)
+        if '\n' in texte:
+            contenu = ''.join(self._tampon)
+            coupure = contenu.rfind('\n') + 1
+            self._tampon = [contenu[coupure:]] if coupure < len(contenu) else []
+            self.envoyer(contenu[:coupure])
+        return len(texte)
+
+    def flush(self):
+        if self._tampon:
+            contenu, self._tampon = ''.join(self._tampon), []
+            self.envoyer(contenu)
+
+def executer_flux(ast, moteur, limites, envoyer):
+    """Exécute un Programme en transmettant sa sortie au fil de l'eau ; retourne l'erreur ou None."""
+    sortie = SortieLignes(envoyer)
+    erreur = _executer(ast, moteur, limites, sortie)
+    sortie.flush()
+    return erreur
+
+def flux_local(ast, moteur, limites, taille_file=64):
+    """Générateur de ('sortie', texte) puis éventuellement ('erreur', message).
+
+    Le programme tourne dans un thread du processus courant ; il attend quand
+    `taille_file` morceaux n'ont pas encore été lus. Si le lecteur abandonne,
+    le programme est arrêté à sa prochaine écriture.
+    """
+    file = queue.Queue(maxsize=taille_file)
+    abandon = threading.Event()
+
+    def envoyer(texte):
+        if abandon.is_set():
+            raise _ArretProgramme()
+        file.put(('sortie', texte))
+
+    def executer():
+        erreur = executer_flux(ast, moteur, limites, envoyer) if not abandon.is_set() else None
+        file.put(('fin', erreur))
+
+    threading.Thread(target=executer, daemon=True).start()
+    try:
+        while True:
+            genre, contenu = file.get()
+            if genre == 'fin':
+                if contenu is not None:
+                    yield ('erreur', contenu)
+                return
+            yield (genre, contenu)
+    finally:
+        abandon.set()
+        # Débloquer le programme s'il attend de la place dans la file
+        while not file.empty():
+            file.get_nowait()
+
+def _boucle_travailleur(connexion, max_taches):
+    """Corps d'un processus travailleur : une tâche à la fois jusqu'au recyclage."""
+    taches = 0
+    while not max_taches or taches < max_taches:
+        try:
+            tache = connexion.recv()
+        except (EOFError, OSError):
+            break
+        if tache is None:
+            break
+        mode, ast, moteur, limites = tache
+        if mode == 'flux':
+            erreur = executer_flux(ast, moteur, limites, lambda texte: connexion.send(('sortie', texte)))
+            connexion.send(('fin', erreur))
+        else:
+            connexion.send(executer_capture(ast, moteur, limites))
+        taches += 1
+    connexion.close()
+
+def contexte_travailleurs():
+    """Contexte multiprocessing des travailleurs.
+
+    Le pool démarre et remplace ses travailleurs depuis les threads des requêtes
+    (gunicorn --threads, répartiteur des lots) : forker ce processus copierait
+    des verrous tenus par d'autres threads. Avec 'forkserver', les travailleurs
+    sont forkés par un serveur mono-thread qui a déjà chargé ce module
+    (interpréteur, builtin, ia_module et ai_integration compris).
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    contexte = multiprocessing.get_context('forkserver')
+    contexte.set_forkserver_preload([__name__])
+    return contexte
+
+class Travailleur:
+    """Processus travailleur et extrémité parente de son tube."""
+
+    def __init__(self, contexte, max_taches):
+        self.connexion, connexion_enfant = contexte.Pipe()
+        self.processus = contexte.Process(target=_boucle_travailleur,
+                                          args=(connexion_enfant, max_taches), daemon=True)
+        self.processus.start()
+        connexion_enfant.close()
+        self.taches = 0
+
+    def arreter(self, forcer=False):
+        if forcer:
+            self.processus.kill()
+        else:
+            try:
+                self.connexion.send(None)
+            except OSError:
+                pass
+        self.processus.join(timeout=1)
+        if self.processus.is_alive():
+            self.processus.kill()
+            self.processus.join()
+        self.connexion.close()
+
+class PoolTravailleurs:
+    """Pool de `taille` travailleurs ; `executer` bloque jusqu'à en obtenir un libre.
+
+    `delai` borne la durée d'une tâche (en secondes, None = sans limite), en
+    plus du budget d'exécution appliqué dans le travailleur. Utilisable depuis
+    plusieurs threads.
+    """
+
+    def __init__(self, taille, delai=None, max_taches=0):
+        self.taille = taille
+        self.delai = delai
+        self.max_taches = max_taches
+        self._contexte = contexte_travailleurs()
+        self._libres = queue.Queue()
+        self._verrou = threading.Lock()
+        self._travailleurs = []
+        self.taches = 0
+        self.delais_depasses = 0
+        self.recyclages = 0
+        for _ in range(taille):
+            self._ajouter_travailleur()
+
+    def _ajouter_travailleur(self):
+        travailleur = Travailleur(self._contexte, self.max_taches)
+        with self._verrou:
+            self._travailleurs.append(travailleur)
+        self._libres.put(travailleur)
+
+    def _remplacer(self, travailleur, forcer):
+        with self._verrou:
+            self._travailleurs.remove(travailleur)
+        travailleur.arreter(forcer)
+        self._ajouter_travailleur()
+
+    def executer(self, ast, moteur, limites):
+        """Exécute un Programme dans un travailleur et retourne sa sortie."""
+        travailleur = self._libres.get()
+        try:
+            travailleur.connexion.send(('executer', ast, moteur, limites))
+            if not travailleur.connexion.poll(self.delai):
+                # Script bloqué (ou dans une fonction intégrée) : le processus est tué
+                with self._verrou:
+                    self.delais_depasses += 1
+                self._remplacer(travailleur, forcer=True)
+                return f"Erreur d'exécution: délai de {self.delai} s dépassé"
+            resultat = travailleur.connexion.recv()
+        except (EOFError, OSError):
+            # Travailleur mort pendant la tâche (mémoire épuisée, signal...)
+            self._remplacer(travailleur, forcer=True)
+            return "Erreur inattendue: le processus d'exécution s'est arrêté"
+        except Exception:
+            self._remplacer(travailleur, forcer=True)
+            raise
+        self._liberer(travailleur)
+        return resultat
+
+    def executer_flux(self, ast, moteur, limites):
+        """Générateur de ('sortie', texte) puis éventuellement ('erreur', message).
+
+        Le travailleur reste attribué jusqu'à la fin du flux ; si le lecteur
+        abandonne avant, il est tué et remplacé.
+        """
+        travailleur = self._libres.get()
+        termine = False
+        try:
+            travailleur.connexion.send(('flux', ast, moteur, limites))
+            echeance = None if self.delai is None else time.monotonic() + self.delai
+            while True:
+                restant = None if echeance is None else max(0, echeance - time.monotonic())
+                if not travailleur.connexion.poll(restant):
+                    with self._verrou:
+                        self.delais_depasses += 1
+                    yield ('erreur', f"Erreur d'exécution: délai de {self.delai} s dépassé")
+                    return
+                genre, contenu = travailleur.connexion.recv()
+                if genre == 'fin':
+                    termine = True
+                    if contenu is not None:
+                        yield ('erreur', contenu)
+                    return
+                yield (genre, contenu)
+        except (EOFError, OSError):
+            yield ('erreur', "Erreur inattendue: le processus d'exécution s'est arrêté")
+        finally:
+            if termine:
+                self._liberer(travailleur)
+            else:
+                self._remplacer(travailleur, forcer=True)
+
+    def _liberer(self, travailleur):
+        """Rend un travailleur au pool après une tâche, ou le recycle."""
+        travailleur.taches += 1
+        with self._verrou:
+            self.taches += 1
+        if self.max_taches and travailleur.taches >= self.max_taches:
+            # Le travailleur s'est terminé de lui-même après sa dernière tâche
+            with self._verrou:
+                self.recyclages += 1
+            self._remplacer(travailleur, forcer=False)
+        else:
+            self._libres.put(travailleur)
+
+    def fermer(self):
+        with self._verrou:
+            travailleurs, self._travailleurs = self._travailleurs, []
+        for travailleur in travailleurs:
+            travailleur.arreter()
+
+    def stats(self):
+        with self._verrou:
+            return {
+                'taille': self.taille,
+                'libres': self._libres.qsize(),
+                'delai': self.delai,
+                'max_taches': self.max_taches,
+                'taches': self.taches,
+                'delais_depasses': self.delais_depasses,
+                'recyclages': self.recyclages,
+            }
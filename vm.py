@@ -0,0 +1,315 @@
+# vm.py
+# Machine virtuelle à pile exécutant le bytecode produit par bytecode.py.
+#
+# Les appels de fonctions utilisateur empilent un cadre dans une liste
+# Python au lieu de récurser : pas de limite de profondeur liée à la pile
+# Python, et 'retourner' est un simple saut de retour (pas d'exception).
+from errors import RuntimeError, ReturnException
+from builtin import _ArretProgramme
+from bytecode import (
+    CompilateurBytecode,
+    CHARGER_LOCAL, CHARGER_GLOBAL, CONSTANTE, BINAIRE, BINAIRE_CONSTANTE, SAUT_SI_FAUX, SAUT, CONSOMMER,
+    STOCKER_LOCAL, STOCKER_GLOBAL, VERIFIER_EXISTE, APPELER, APPELER_INTEGREE, RETOURNER, DEPILER,
+    INDEX, CLE, UNAIRE, CHARGER_NOM, CHARGER_FONCTION_OU_NOM, STOCKER_INDEX, STOCKER_CLE,
+    PREPARER_INDEX_COMPOSE, PREPARER_CLE_COMPOSE, STOCKER_COMPOSE, ENTRER_BLOC, SORTIR_BLOC, POUR_DANS_DEBUT,
+    POUR_DANS_SUIVANT, POUR_DANS_FIN, DEFINIR_FONCTION, ERREUR, FIN, CONSTANTE_CONTENEUR,
+    CONSTRUIRE_LISTE, CONSTRUIRE_DICTIONNAIRE,
+)
+from operations import (
+    copier_litteral, construire_dictionnaire, appeler_fonction_integree, iterer_pour_dans,
+    lire_index, lire_cle, ecrire_index, ecrire_cle,
+)
+from resolveur import INDEFINI, lire_variable, variable_existe, fusionner_bloc
+
+class Cadre:
+    """Cadre d'appel sauvegardé pendant l'exécution d'une fonction utilisateur."""
+    __slots__ = ('code', 'pc', 'base_pile', 'contextes')
+
+    def __init__(self, code, pc, base_pile, contextes):
+        self.code = code
+        self.pc = pc
+        self.base_pile = base_pile
+        self.contextes = contextes
+
+class MachineVirtuelle:
+    """Exécute un Programme compilé en bytecode sur l'état d'un VisiteurInterpretation."""
+
+    def __init__(self, interpreteur):
+        self.interpreteur = interpreteur
+        self._bloc_global = None # Cadre temporaire ouvert par ENTRER_BLOC
+
+    def executer_programme(self, programme):
+        code = CompilateurBytecode(self.interpreteur).compiler_programme(programme)
+        return self.executer(code)
+
+    def _code_fonction(self, nom, corps):
+        codes = self.interpreteur.codes_bytecode
+        code = codes.get(corps)
+        if code is None:
+            # Fonction définie par un autre moteur (REPL)
+            code = codes[corps] = CompilateurBytecode(self.interpreteur).compiler_fonction(nom, corps)
+        return code
+
+    def executer(self, code):
+        interp = self.interpreteur
+        contextes_programme = interp.contextes
+        cadres = []
+        try:
+            return self._boucle(code, cadres)
+        except _ArretProgramme:
+            # Arrêt contrôlé du programme (arreter())
+            return None
+        finally:
+            # Restaurer l'état global comme le ferait le parcours d'arbre
+            if cadres:
+                contextes_programme = cadres[0].contextes
+            self._nettoyer_contextes(contextes_programme)
+            interp.contextes = contextes_programme
+
+    def _nettoyer_contextes(self, contextes):
+        """Ferme les cadres ouverts au niveau global après une interruption."""
+        while len(contextes) > 1:
+            cadre = contextes.pop()
+            if cadre is self._bloc_global:
+                fusionner_bloc(cadre, contextes[0])
+        self._bloc_global = None
+
+    def _boucle(self, code, cadres):
+        interp = self.interpreteur
+        fonctions_definies = interp.fonctions_definies
+        budget = interp.budget
+        pile = []
+        empiler = pile.append
+        depiler = pile.pop
+        instructions = code.instructions
+        pc = 0
+        base_pile = 0
+
+        try:
+            while True:
+                opcode, argument = instructions[pc]
+                pc += 1
+
+                if opcode == CHARGER_LOCAL:
+                    niveau, slot, nom = argument
+                    contextes = interp.contextes
+                    valeur = contextes[niveau][slot]
+                    if valeur is INDEFINI:
+                        # Slot pas encore affecté : la variable globale du même nom
+                        globaux = contextes[0]
+                        if nom not in globaux:
+                            raise RuntimeError(f"Erreur d'exécution: Variable '{nom}' non définie")
+                        valeur = globaux[nom]
+                    empiler(valeur)
+
+                elif opcode == CHARGER_GLOBAL:
+                    globaux = interp.contextes[0]
+                    if argument not in globaux:
+                        raise RuntimeError(f"Erreur d'exécution: Variable '{argument}' non définie")
+                    empiler(globaux[argument])
+
+                elif opcode == CONSTANTE:
+                    empiler(argument)
+
+                elif opcode == CONSTANTE_CONTENEUR:
+                    empiler(copier_litteral(argument))
+
+                elif opcode == CONSTRUIRE_LISTE:
+                    if argument:
+                        elements = pile[len(pile) - argument:]
+                        del pile[len(pile) - argument:]
+                    else:
+                        elements = []
+                    empiler(elements)
+
+                elif opcode == CONSTRUIRE_DICTIONNAIRE:
+                    elements = pile[len(pile) - 2 * argument:]
+                    del pile[len(pile) - 2 * argument:]
+                    empiler(construire_dictionnaire(elements[0::2], elements[1::2]))
+
+                elif opcode == BINAIRE:
+                    d = depiler()
+                    g = pile[-1]
+                    operation, rapide = argument
+                    if rapide is not None and type(g) is not str and type(d) is not str:
+                        pile[-1] = rapide(g, d)
+                    else:
+                        pile[-1] = operation(g, d)
+
+                elif opcode == BINAIRE_CONSTANTE:
+                    g = pile[-1]
+                    operation, rapide, d = argument
+                    if type(g) is not str:
+                        pile[-1] = rapide(g, d)
+                    else:
+                        pile[-1] = operation(g, d)
+
+                elif opcode == SAUT_SI_FAUX:
+                    if not depiler():
+                        pc = argument
+
+                elif opcode == SAUT:
+                    pc = argument
+
+                elif opcode == CONSOMMER:
+                    budget.restant -= argument
+                    if budget.restant <= 0:
+                        budget.verifier()
+
+                elif opcode == STOCKER_LOCAL:
+                    interp.contextes[argument[0]][argument[1]] = depiler()
+
+                elif opcode == STOCKER_GLOBAL:
+                    interp.contextes[0][argument] = depiler()
+
+                elif opcode == VERIFIER_EXISTE:
+                    adresses, nom, message = argument
+                    if not variable_existe(interp.contextes, adresses, nom):
+                        raise RuntimeError(message)
+
+                elif opcode == APPELER:
+                    nom_fonction, nb_args = argument
+                    args = pile[len(pile) - nb_args:]
+                    del pile[len(pile) - nb_args:]
+                    func_def = fonctions_definies.get(nom_fonction)
+                    if func_def is None:
+                        raise RuntimeError(f"Erreur d'exécution: fonction '{nom_fonction}' non définie")
+                    params = func_def['params']
+                    if nb_args != len(params):
+                        raise RuntimeError(f"Erreur d'exécution: la fonction '{nom_fonction}' attend {len(params)} arguments, {nb_args} fournis.")
+                    cadres.append(Cadre(code, pc, base_pile, interp.contextes))
+                    # Le corps n'écrit que dans son cadre : le global est partagé sans copie
+                    interp.contextes = [interp.contextes[0], func_def['portee'].cadre_appel(args)]
+                    code = self._code_fonction(nom_fonction, func_def['corps'])
+                    instructions = code.instructions
+                    pc = 0
+                    base_pile = len(pile)
+
+                elif opcode == APPELER_INTEGREE:
+                    nom_fonction, fonction, nb_args = argument
+                    if nb_args:
+                        # Arguments passés sans conversion ni copie
+                        args = pile[len(pile) - nb_args:]
+                        del pile[len(pile) - nb_args:]
+                    else:
+                        args = []
+                    empiler(appeler_fonction_integree(nom_fonction, fonction, args))
+
+                elif opcode == RETOURNER:
+                    valeur = depiler()
+                    if not cadres:
+                        # 'retourner' hors de toute fonction
+                        raise ReturnException(valeur)
+                    cadre = cadres.pop()
+                    del pile[base_pile:]
+                    empiler(valeur)
+                    code = cadre.code
+                    instructions = code.instructions
+                    pc = cadre.pc
+                    base_pile = cadre.base_pile
+                    interp.contextes = cadre.contextes
+
+                elif opcode == DEPILER:
+                    depiler()
+
+                elif opcode == INDEX:
+                    index_value = depiler()
+                    pile[-1] = lire_index(pile[-1], index_value)
+
+                elif opcode == CLE:
+                    cle_value = depiler()
+                    pile[-1] = lire_cle(pile[-1], cle_value)
+
+                elif opcode == UNAIRE:
+                    pile[-1] = argument(pile[-1])
+
+                elif opcode == CHARGER_NOM:
+                    adresses, nom = argument
+                    empiler(lire_variable(interp.contextes, adresses, nom))
+
+                elif opcode == CHARGER_FONCTION_OU_NOM:
+                    adresses, nom = argument
+                    func_def = fonctions_definies.get(nom)
+                    if func_def is not None:
+                        empiler(func_def)
+                    else:
+                        empiler(lire_variable(interp.contextes, adresses, nom))
+
+                elif opcode == STOCKER_INDEX:
+                    index_value = depiler()
+                    base_list = depiler()
+                    ecrire_index(base_list, index_value, depiler())
+
+                elif opcode == STOCKER_CLE:
+                    cle_value = depiler()
+                    base_dict = depiler()
+                    ecrire_cle(base_dict, cle_value, depiler())
+
+                elif opcode == PREPARER_INDEX_COMPOSE:
+                    base_list, index_value = pile[-2], pile[-1]
+                    if not isinstance(base_list, list):
+                        raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'assignation composée par index doit être une liste")
+                    if not isinstance(index_value, int):
+                        raise RuntimeError("Erreur d'exécution: L'index doit être un entier")
+                    if index_value < 0 or index_value >= len(base_list):
+                        raise RuntimeError("Erreur d'exécution: Index de liste hors limites")
+                    empiler(base_list[index_value])
+
+                elif opcode == PREPARER_CLE_COMPOSE:
+                    base_dict, cle_value = pile[-2], pile[-1]
+                    if not isinstance(base_dict, dict):
+                        raise RuntimeError("Erreur d'exécution: L'opérande gauche de l'assignation composée par clé doit être un dictionnaire")
+                    if cle_value not in base_dict:
+                        raise RuntimeError(f"Erreur d'exécution: Clé '{cle_value}' non trouvée dans le dictionnaire")
+                    empiler(base_dict[cle_value])
+
+                elif opcode == STOCKER_COMPOSE:
+                    resultat = depiler()
+                    index_value = depiler()
+                    depiler()[index_value] = resultat
+
+                elif opcode == ENTRER_BLOC:
+                    self._bloc_global = argument.nouveau_cadre()
+                    interp.contextes.append(self._bloc_global)
+
+                elif opcode == SORTIR_BLOC:
+                    contextes = interp.contextes
+                    fusionner_bloc(contextes.pop(), contextes[0])
+                    self._bloc_global = None
+
+                elif opcode == POUR_DANS_DEBUT:
+                    elements = iterer_pour_dans(depiler())
+                    interp.contextes.append(argument.nouveau_cadre())
+                    # L'itérateur reste sur la pile jusqu'à POUR_DANS_FIN
+                    empiler(elements)
+
+                elif opcode == POUR_DANS_SUIVANT:
+                    for element in pile[-1]:
+                        # La variable de boucle occupe le slot 1 du cadre
+                        interp.contextes[-1][1] = element
+                        break
+                    else:
+                        pc = argument
+
+                elif opcode == POUR_DANS_FIN:
+                    depiler()
+                    contextes = interp.contextes
+                    if len(contextes) > 1:
+                        contextes.pop()
+
+                elif opcode == DEFINIR_FONCTION:
+                    nom, params, corps, portee = argument
+                    fonctions_definies[nom] = {'params': params, 'corps': corps, 'portee': portee}
+
+                elif opcode == ERREUR:
+                    raise RuntimeError(argument)
+
+                elif opcode == FIN:
+                    return depiler()
+
+                else:
+                    raise RuntimeError(f"Erreur interne: opcode inconnu {opcode}")
+        except RuntimeError as erreur:
+            # Position source de l'instruction en cours (cadre le plus profond)
+            erreur.localiser(*code.positions[pc - 1])
+            raise